@@ -0,0 +1,297 @@
+# MADE BY SKELETON3595
+import os
+import sys
+import glob
+import time
+import logging
+import argparse
+
+import TDSaveProfile
+from TDSaveCore import TeardownSaveHandler, setup_logging
+from TDSaveCache import SaveCache
+from TDSaveDiff import diff_files, write_patch, read_patch, apply_patch
+from TDSaveExpr import ExprError, compile_program, apply_program
+from TDSaveProfile import span
+from TDSaveRegistry import CompactSaveHandler
+from TDSaveSnapshots import SnapshotStore
+
+# --- HEADLESS BATCH MODE ---
+# Usage: python TDSaveEditor.py batch "profiles/*/savegame.xml" --reset-tools --set tool.rifle.ammo=500
+
+def parse_set(text):
+    """'tool.rifle.ammo=500' -> ('tool', 'rifle', 'ammo', '500'), 'valuable.x=1' -> ('valuable', 'x', 'self', '1')"""
+    path, sep, value = text.partition('=')
+    parts = path.strip().split('.', 2)
+    if not sep or len(parts) < 2 or not all(parts):
+        raise argparse.ArgumentTypeError(f"expected SECTION.ITEM[.ATTR]=VALUE, got '{text}'")
+    if len(parts) == 2:
+        parts.append('self')
+    return ('set', parts[0], parts[1], parts[2], value.strip())
+
+def parse_expr(text):
+    """Checks an expression up front; workers compile it again, as code objects cannot be pickled."""
+    try:
+        compile_program(text)
+    except ExprError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return ('expr', text)
+
+def expand_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches and os.path.exists(pattern):
+            matches = [pattern]
+        if not matches:
+            logging.warning(f"No save files match: {pattern}")
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+def apply_operation(handler, op):
+    kind = op[0]
+    if kind == 'reset_tools':
+        handler.reset_all_tools()
+    elif kind == 'unlock':
+        handler.unlock_all(op[1])
+    elif kind == 'set':
+        handler.update_value(*op[1:])
+    elif kind == 'patch':
+        apply_patch(handler, op[1])
+    elif kind == 'expr':
+        apply_program(handler, compile_program(op[1]))
+
+def process_save(path, operations, new_version=None, dry_run=False, use_cache=False, profile=False, compact=False):
+    """Worker: load one save, apply the operations, save it. Runs in a pool process.
+
+    With profile set the spans are recorded by a profiler of its own and
+    returned in result["spans"] for the parent process to merge. With
+    compact the save is held as a CompactRegistry, which takes a fraction
+    of the memory but can only change existing values.
+    """
+    result = {"path": path, "ok": False, "size": 0, "edits": 0,
+              "load": 0.0, "edit": 0.0, "save": 0.0, "error": None, "spans": None}
+    if profile:
+        TDSaveProfile.start()
+    try:
+        result["size"] = os.path.getsize(path)
+        if compact:
+            handler = CompactSaveHandler()
+        else:
+            handler = TeardownSaveHandler(cache=SaveCache() if use_cache else None)
+
+        t0 = time.perf_counter()
+        if not handler.load_file(path):
+            result["error"] = f"failed to parse XML: {handler.last_error}"
+            return result
+        t1 = time.perf_counter()
+        with span("edit", operations=len(operations)):
+            for op in operations:
+                apply_operation(handler, op)
+        result["edits"] = handler.pending_edits
+        t2 = time.perf_counter()
+        if not dry_run:
+            success, info = handler.save_file(new_version)
+            if not success:
+                result["error"] = info
+                return result
+        t3 = time.perf_counter()
+
+        result.update(ok=True, load=t1 - t0, edit=t2 - t1, save=t3 - t2)
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        if profile:
+            result["spans"] = TDSaveProfile.stop().events
+    return result
+
+def _init_worker(level):
+    setup_logging(level)
+
+def run_batch(args):
+    operations = []
+    if args.reset_tools:
+        operations.append(('reset_tools',))
+    for section in args.unlock:
+        operations.append(('unlock', section))
+    operations.extend(args.set)
+    operations.extend(args.expr)
+    if not operations and not args.version:
+        print("Nothing to do: give at least one edit operation (see --help).")
+        return 1
+    if args.compact and args.expr:
+        print("--expr needs the full registry model and cannot be combined with --compact.")
+        return 1
+    return run_operations(args, operations)
+
+def run_operations(args, operations):
+    """Runs the operations on every save matching args.paths, in parallel; shared by batch and apply."""
+    paths = expand_paths(args.paths)
+    if not paths:
+        print("No save files found.")
+        return 1
+
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(paths)))
+    profiler = TDSaveProfile.active()
+    if profiler is not None and profiler.deep and jobs > 1:
+        print("--profile-deep only sees this process, running with 1 worker.")
+        jobs = 1
+    level = logging.getLogger().level
+    start = time.perf_counter()
+    if jobs == 1:
+        results = [process_save(path, operations, args.version, args.dry_run, args.cache, False, args.compact)
+                   for path in paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        n = len(paths)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(level,)) as pool:
+            results = list(pool.map(process_save, paths, [operations] * n, [args.version] * n,
+                                    [args.dry_run] * n, [args.cache] * n, [profiler is not None] * n,
+                                    [args.compact] * n))
+        for r in results:
+            if r["spans"]:
+                profiler.merge(r["spans"])
+    wall = time.perf_counter() - start
+
+    for r in results:
+        mb = r["size"] / (1024 * 1024)
+        if r["ok"]:
+            print(f"OK    {r['path']}  {mb:8.2f} MB  load {r['load']:.3f}s  edit {r['edit']:.3f}s  "
+                  f"save {r['save']:.3f}s  ({r['edits']} values changed)")
+        else:
+            print(f"FAIL  {r['path']}  {mb:8.2f} MB  {r['error']}")
+
+    done = [r for r in results if r["ok"]]
+    total_mb = sum(r["size"] for r in done) / (1024 * 1024)
+    print("-" * 70)
+    print(f"{len(done)}/{len(results)} files in {wall:.2f}s with {jobs} worker(s): "
+          f"{len(done) / wall:.1f} files/s, {total_mb / wall:.1f} MB/s"
+          + (" (dry run, nothing written)" if args.dry_run else ""))
+    return 0 if len(done) == len(results) else 1
+
+def run_diff(args):
+    start = time.perf_counter()
+    diff = diff_files(args.old, args.new)
+    elapsed = time.perf_counter() - start
+
+    marks = {"changed": "~", "added": "+", "removed": "-"}
+    shown = diff.changes if args.limit <= 0 else diff.changes[:args.limit]
+    for change in shown:
+        if change.kind == "changed":
+            print(f"~ {change.path}: {change.old} -> {change.new}")
+        else:
+            print(f"{marks[change.kind]} {change.path} = {change.new if change.kind == 'added' else change.old}")
+    if len(shown) < len(diff.changes):
+        print(f"... and {len(diff.changes) - len(shown)} more")
+
+    counts = diff.counts()
+    stats = diff.stats
+    print(f"{counts['changed']} changed, {counts['added']} added, {counts['removed']} removed "
+          f"in {elapsed:.2f}s ({stats['elements']} elements compared, {stats['hashed_bytes'] / 1048576:.1f} MB hashed)")
+    if args.patch:
+        write_patch(diff, args.patch)
+        print(f"Patch with {len(diff.ops)} operation(s) written to {args.patch}")
+    return 0 if not diff.changes or not args.exit_code else 1
+
+def run_apply(args):
+    patch = read_patch(args.patch)
+    args.version = None
+    print(f"Applying {len(patch['ops'])} patch operation(s)")
+    return run_operations(args, [('patch', patch)])
+
+def run_snapshots(args):
+    store = SnapshotStore.for_save(args.path)
+    if args.restore:
+        ids = [h["id"] for h in store.list()]
+        matches = [i for i in ids if i.startswith(args.restore)]
+        if len(matches) != 1:
+            print(f"No single snapshot matches '{args.restore}'.")
+            return 1
+        store.restore(matches[0], args.path)
+        print(f"Restored {matches[0]} to {args.path}")
+        return 0
+    if args.keep is not None:
+        snapshots, chunks = store.prune(args.keep)
+        print(f"Removed {snapshots} snapshot(s) and {chunks} unused chunk(s).")
+
+    snapshots = store.list()
+    if not snapshots:
+        print(f"No snapshots for {args.path}")
+        return 0
+    print(f"{'id':<23} {'label':<12} {'size':>10} {'chunks':>7} {'new':>5} {'stored':>10}")
+    for h in snapshots:
+        print(f"{h['id']:<23} {h['label']:<12} {h['size'] / 1048576:>7.2f} MB {h['chunks']:>7} "
+              f"{h['new_chunks']:>5} {h['stored'] / 1024:>7.1f} KB")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="TDSaveEditor.py", description="Teardown Save Editor, headless mode")
+    parser.add_argument('-v', '--verbose', action='store_true', help="show handler log output")
+    parser.add_argument('--profile', metavar='TRACE.json',
+                        help="time every load/save phase, print a summary and write a Chrome trace")
+    parser.add_argument('--profile-deep', action='store_true',
+                        help="with --profile: also run cProfile and tracemalloc (slow)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help="apply the same edits to many save files")
+    batch.add_argument('paths', nargs='+', help="save files or glob patterns")
+    batch.add_argument('--reset-tools', action='store_true', help="reset every tool to TOOL_DEFAULTS")
+    batch.add_argument('--unlock', action='append', default=[], metavar='SECTION',
+                       help="unlock every item of a section (valuable, characters, reward)")
+    batch.add_argument('--set', action='append', default=[], type=parse_set, metavar='SECTION.ITEM[.ATTR]=VALUE',
+                       help="set one value, e.g. tool.rifle.ammo=500")
+    batch.add_argument('--expr', action='append', default=[], type=parse_expr, metavar='PATH=EXPRESSION',
+                       help="bulk edit, e.g. 'tool.*.ammo = max(ammo * 2, 500)' (see TDSaveExpr.py)")
+    batch.add_argument('--version', help="write this registry version")
+    batch.add_argument('-j', '--jobs', type=int, default=0, help="worker processes (default: CPU count)")
+    batch.add_argument('--dry-run', action='store_true', help="load and edit but do not save")
+    batch.add_argument('--cache', action='store_true', help="reuse and update the parsed-save cache")
+    batch.add_argument('--compact', action='store_true',
+                       help="hold each save in the compact registry model: far less memory, values only")
+    batch.set_defaults(func=run_batch)
+
+    diff = commands.add_parser('diff', help="show which values differ between two save files")
+    diff.add_argument('old', help="the save to compare from, e.g. a backup")
+    diff.add_argument('new', help="the save to compare to")
+    diff.add_argument('--patch', metavar='PATCH.json', help="also write the differences as a patch for 'apply'")
+    diff.add_argument('--limit', type=int, default=200, help="list at most N entries, 0 for all (default 200)")
+    diff.add_argument('--exit-code', action='store_true', help="exit with 1 if the saves differ")
+    diff.set_defaults(func=run_diff)
+
+    apply = commands.add_parser('apply', help="apply a patch written by 'diff --patch' to save files")
+    apply.add_argument('patch', help="the patch file")
+    apply.add_argument('paths', nargs='+', help="save files or glob patterns")
+    apply.add_argument('-j', '--jobs', type=int, default=0, help="worker processes (default: CPU count)")
+    apply.add_argument('--dry-run', action='store_true', help="load and patch but do not save")
+    apply.add_argument('--cache', action='store_true', help="reuse and update the parsed-save cache")
+    apply.add_argument('--compact', action='store_true',
+                       help="hold each save in the compact registry model (patches that add or remove elements fail)")
+    apply.set_defaults(func=run_apply)
+
+    snaps = commands.add_parser('snapshots', help="list, restore or prune the backups of a save file")
+    snaps.add_argument('path', help="the save file")
+    snaps.add_argument('--restore', metavar='ID', help="write this snapshot (or a unique id prefix) back to the save")
+    snaps.add_argument('--keep', type=int, metavar='N', help="delete all but the newest N snapshots")
+    snaps.set_defaults(func=run_snapshots)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    if not args.profile:
+        return args.func(args)
+
+    TDSaveProfile.start(deep=args.profile_deep)
+    try:
+        return args.func(args)
+    finally:
+        profiler = TDSaveProfile.stop()
+        print()
+        print(profiler.summary())
+        profiler.write_chrome_trace(args.profile)
+        print(f"Trace written to {args.profile} (open it in chrome://tracing or ui.perfetto.dev)")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# MADE BY SKELETON3595
+# On-disk cache of parsed saves, so reopening an unchanged savegame.xml skips parsing.
+import os
+import zlib
+import pickle
+import hashlib
+import logging
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_FORMAT = 2
+
+# Bytes hashed per file: head, tail and a few evenly spaced samples in between
+HASH_EDGE = 1024 * 1024
+HASH_SAMPLE = 64 * 1024
+HASH_SAMPLES = 16
+
+def default_cache_dir():
+    base = os.getenv('LOCALAPPDATA') or os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, "TeardownSaveEditor", "cache")
+
+class SaveCache:
+    """Keyed by path + size + mtime + a sampled content hash, evicted LRU by total size."""
+
+    def __init__(self, directory=None, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def fingerprint(self, path, stat=None):
+        st = stat or os.stat(path)
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            if st.st_size <= 2 * HASH_EDGE + HASH_SAMPLES * HASH_SAMPLE:
+                digest.update(f.read())
+            else:
+                digest.update(f.read(HASH_EDGE))
+                step = (st.st_size - 2 * HASH_EDGE) // (HASH_SAMPLES + 1)
+                for i in range(1, HASH_SAMPLES + 1):
+                    f.seek(HASH_EDGE + i * step)
+                    digest.update(f.read(HASH_SAMPLE))
+                f.seek(st.st_size - HASH_EDGE)
+                digest.update(f.read(HASH_EDGE))
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns, digest.hexdigest())
+
+    def _entry_path(self, path):
+        name = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + ".cache")
+
+    def get(self, path, fingerprint):
+        entry = self._entry_path(path)
+        try:
+            with open(entry, 'rb') as f:
+                data = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable cache entry {entry}: {e}")
+            return None
+        if data.get("format") != CACHE_FORMAT or data.get("key") != fingerprint:
+            return None
+        try:
+            os.utime(entry)  # mark as recently used
+        except OSError:
+            pass
+        return data["payload"]
+
+    def put(self, path, fingerprint, payload):
+        entry = self._entry_path(path)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            blob = zlib.compress(pickle.dumps({"format": CACHE_FORMAT, "key": fingerprint, "payload": payload},
+                                              protocol=pickle.HIGHEST_PROTOCOL), 1)
+            tmp = entry + ".tmp"
+            with open(tmp, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp, entry)
+            self.evict()
+        except OSError as e:
+            logging.warning(f"Could not write cache entry {entry}: {e}")
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith(".cache"):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".cache"):
+                    os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,1492 @@
+# MADE BY SKELETON3595
+# Save-file handling without any GUI dependency. Safe to import headless.
+import os
+import re
+import sys
+import functools
+import bisect
+import mmap
+import collections
+import logging
+import threading
+import contextlib
+import xml.etree.ElementTree as ET
+
+from TDSaveProfile import span, timed_iter
+from TDSaveSnapshots import SnapshotStore, DEFAULT_KEEP
+from TDSaveHistory import EditHistory
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+def setup_logging(level=logging.INFO):
+    logging.basicConfig(level=level, format=LOG_FORMAT, datefmt='%H:%M:%S')
+
+# --- DEFAULT VALUES ---
+TOOL_DEFAULTS = {
+    "sledge":       {"enabled": 1},
+    "spraycan":     {"enabled": 1},
+    "extinguisher": {"enabled": 1},
+    "blowtorch":    {"enabled": 1, "ammo": 60},
+    "shotgun":      {"enabled": 1, "ammo": 96, "range": 60, "damage": 5},
+    "plank":        {"enabled": 1, "ammo": 64, "width": 5, "length": 64},
+    "pipebomb":     {"enabled": 1, "ammo": 36, "damage": 4},
+    "gun":          {"enabled": 1, "ammo": 36, "range": 100, "damage": 3},
+    "bomb":         {"enabled": 1, "ammo": 36, "damage": 6},
+    "wire":         {"enabled": 1, "ammo": 24, "stretch": 5},
+    "rocket":       {"enabled": 1, "damage": 5, "ammo": 24},
+    "leafblower":   {"enabled": 1, "power": 50},
+    "booster":      {"enabled": 1, "ammo": 24, "power": 400, "time": 8},
+    "turbo":        {"enabled": 1, "ammo": 24, "power": 400},
+    "explosive":    {"enabled": 1, "damage": 8, "ammo": 16},
+    "rifle":        {"enabled": 1, "ammo": 18},
+    "steroid":      {"enabled": 1, "ammo": 4, "time": 6}
+}
+
+# Tool parameters in display order, with the largest value the editor offers for each
+TOOL_LIMITS = {
+    "ammo": 2000, "damage": 500, "range": 500, "power": 500,
+    "time": 100, "stretch": 100, "length": 100, "width": 100, "enabled": 1,
+}
+
+# --- LAZY LOADING ---
+# Only these savegame sections are turned into elements. Every other subtree
+# stays an opaque byte span of the original file and is written back as-is.
+UI_SECTIONS = ("tool", "valuable", "characters", "reward")
+
+# Registry paths are dotted keys as the game names them, e.g. savegame.tool.rifle.ammo;
+# this one stands for the version attribute of the registry itself
+ROOT_VERSION_PATH = "@version"
+
+# --- SCANNER ---
+# MARKUP_RE, VALUE_ATTR_RE, VERSION_ATTR_RE, find_close, public_tag, hash_span,
+# escape_attr and write_spliced are shared with TDSaveDiff, TDSaveSearch,
+# TDSaveRegistry and TDSaveExpr; keep their signatures stable. The other
+# underscore helpers here are private to this module.
+MARKUP_RE = re.compile(
+    rb'<(?:!--.*?-->|\?.*?\?>|![^>]*>|(/?)([^\s/>!?][^\s/>]*)((?:[^>"\'/]|/(?!>)|"[^"]*"|\'[^\']*\')*)(/?)>)',
+    re.S
+)
+
+VALUE_ATTR_RE = re.compile(rb'\svalue\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+# One name="value" pair of a start tag; stepping through these never mistakes text inside a quoted value for an attribute
+_ATTR_RE = re.compile(rb'([^\s=]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+VERSION_ATTR_RE = re.compile(rb'\sversion\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+_SANITIZE_RE = re.compile(r'<(/?)(\d)')
+_SANITIZE_BYTES_RE = re.compile(rb'<(/?)(\d)')
+_DESANITIZE_RE = re.compile(r'<(/?)_(\d)')
+
+COPY_CHUNK_SIZE = 1024 * 1024
+# Blocks of COPY_CHUNK_SIZE that may wait between the serializing and the writing thread
+WRITE_QUEUE_DEPTH = 8
+# Full saves rewriting less than this are serialized in one process; starting workers would cost more
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+# Parts per worker a full save is cut into, so a slow part does not leave the other workers idle
+PARTS_PER_WORKER = 4
+# Incremental saves whose offset moves may wait before every value span is moved at once
+SPAN_MOVES_PENDING = 16
+
+_CLOSE_TAIL_RE = re.compile(rb'\s*>')
+
+@functools.lru_cache(maxsize=1024)
+def _named_tag_re(tag):
+    return re.compile(rb'<(/?)' + re.escape(tag) + rb'(?=[\s/>])(?:[^>"\'/]|/(?!>)|"[^"]*"|\'[^\']*\')*(/?)>')
+
+def find_close(buf, tag, pos, end):
+    """Offset just past the end tag closing the tag element opened before pos; ValueError if buf[pos:end] lacks it."""
+    # Usually nothing with the same name is nested inside, and two substring
+    # searches find the end without compiling a pattern for every distinct tag.
+    close = buf.find(b'</' + tag, pos, end)
+    if close != -1 and buf.find(b'<' + tag, pos, close) == -1:
+        m = _CLOSE_TAIL_RE.match(buf, close + 2 + len(tag), end)
+        if m is not None:
+            return m.end()
+    # Otherwise jump between tags with the same name only; everything else is skipped in C.
+    depth = 1
+    for m in _named_tag_re(tag).finditer(buf, pos, end):
+        if m.group(1):
+            depth -= 1
+            if depth == 0:
+                return m.end()
+        elif not m.group(2):
+            depth += 1
+    raise ValueError(f"Unclosed tag <{tag.decode('utf-8', 'replace')}> at byte {pos}")
+
+def _next_element(buf, pos, end):
+    """Returns (tag, start, open_end, end) of the next element in buf[pos:end], or None."""
+    while True:
+        m = MARKUP_RE.search(buf, pos, end)
+        if m is None or m.group(1):
+            return None
+        if m.group(2) is None:
+            pos = m.end()
+            continue
+        tag = m.group(2)
+        if m.group(4):
+            return tag, m.start(), m.end(), m.end()
+        return tag, m.start(), m.end(), find_close(buf, tag, m.end(), end)
+
+def _iter_children(buf, open_end, end):
+    close_start = buf.rfind(b'</', open_end, end)
+    pos = open_end
+    while True:
+        child = _next_element(buf, pos, close_start)
+        if child is None:
+            return
+        yield child
+        pos = child[3]
+
+def public_tag(tag):
+    """The tag name as the game writes it, without the '_' sanitizing added before parsing."""
+    if tag.startswith('_') and tag[1:].isdigit():
+        return tag[1:]
+    return tag
+
+def _sanitized_tag(tag):
+    return '_' + tag if tag[:1].isdigit() else tag
+
+def _scan_layout(buf):
+    root = _next_element(buf, 0, len(buf))
+    if root is None:
+        raise ValueError("No root element found")
+    layout = {"root": root, "sections": []}
+    if root[2] == root[3]:
+        return layout
+    for child in _iter_children(buf, root[2], root[3]):
+        if child[0] == b'savegame':
+            if child[2] != child[3]:
+                layout["sections"] = [(tag.decode('utf-8'), start, stop)
+                                      for tag, start, _, stop in _iter_children(buf, child[2], child[3])]
+            break
+    return layout
+
+def hash_span(buf, start, stop):
+    """16-byte blake2b digest of buf[start:stop], taken without copying the span."""
+    import hashlib
+    with memoryview(buf) as view, view[start:stop] as part:
+        return hashlib.blake2b(part, digest_size=16).digest()
+
+def _root_element(buf, layout):
+    """A childless copy of the root element, parsed from its start tag."""
+    _, start, open_end, _ = layout["root"]
+    open_tag = buf[start:open_end]
+    if not open_tag.endswith(b'/>'):
+        open_tag = open_tag[:-1] + b'/>'
+    return ET.fromstring(open_tag.decode('utf-8'))
+
+def _element_paths(section, wanted):
+    """{element: path} for the elements of section in wanted, a path being ((tag, n), ...)
+    where n counts the earlier siblings with the same tag."""
+    paths = {}
+
+    def walk(el, path):
+        seen = {}
+        for child in el:
+            n = seen[child.tag] = seen.get(child.tag, -1) + 1
+            child_path = path + ((child.tag, n),)
+            if child in wanted:
+                paths[child] = child_path
+            if len(child):
+                walk(child, child_path)
+    walk(section, ())
+    return paths
+
+def _find_paths(section, paths):
+    """{path: element} for the paths (see _element_paths) that exist in section."""
+    prefixes = {path[:i] for path in paths for i in range(1, len(path))}
+    wanted = set(paths)
+    found = {}
+
+    def walk(el, path):
+        seen = {}
+        for child in el:
+            n = seen[child.tag] = seen.get(child.tag, -1) + 1
+            child_path = path + ((child.tag, n),)
+            if child_path in wanted:
+                found[child_path] = child
+            if child_path in prefixes:
+                walk(child, child_path)
+    walk(section, ())
+    return found
+
+def _record_value_spans(buf, start, stop, element, spans):
+    # The n-th value="..." in buf[start:stop] normally belongs to the n-th element
+    # with a value, both being in document order. Every pair is checked against the
+    # parsed value; a value= anywhere else (inside another attribute, a comment)
+    # breaks the pairing, and then every start tag is paired with its element.
+    import html
+    found = []
+    matches = VALUE_ATTR_RE.finditer(buf, start, stop)
+    for el in element.iter():
+        value = el.get('value')
+        if value is None:
+            continue
+        v = next(matches, None)
+        if v is None:
+            break
+        group = 1 if v.group(1) is not None else 2
+        raw = v.group(group)
+        if raw != value.encode('utf-8') and html.unescape(raw.decode('utf-8')) != value:
+            break
+        found.append((el, (v.start(group), v.end(group), '"' if group == 1 else "'")))
+    else:
+        if next(matches, None) is None:
+            spans.update(found)
+            return True
+    return _pair_value_spans(buf, start, stop, element, spans)
+
+def _pair_value_spans(buf, start, stop, element, spans):
+    # Pairs every start tag in buf[start:stop] with element.iter() (both are in
+    # document order) and remembers where each value="..." lives in the file.
+    elements = element.iter()
+    for m in MARKUP_RE.finditer(buf, start, stop):
+        if m.group(2) is None or m.group(1):
+            continue
+        el = next(elements, None)
+        if el is None or public_tag(el.tag).encode('utf-8') != m.group(2):
+            return False
+        v = next((a for a in _ATTR_RE.finditer(buf, m.start(3), m.end(3)) if a.group(1) == b'value'), None)
+        if v is not None:
+            group = 2 if v.group(2) is not None else 3
+            spans[el] = (v.start(group), v.end(group), '"' if group == 2 else "'")
+    return next(elements, None) is None
+
+def escape_attr(value, quote):
+    """value escaped for an attribute delimited by quote, the way ElementTree writes it."""
+    value = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    value = value.replace('\n', '&#10;').replace('\r', '&#13;').replace('\t', '&#09;')
+    return value.replace(quote, '&quot;' if quote == '"' else '&apos;')
+
+def _copy_range(fin, fout, start, stop, progress=None):
+    fin.seek(start)
+    remaining = stop - start
+    with span("copy", bytes=remaining):
+        while remaining > 0:
+            chunk = fin.read(min(COPY_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ValueError("Source file is shorter than expected")
+            fout.write(chunk)
+            remaining -= len(chunk)
+            if progress is not None:
+                progress(stop - remaining)
+
+def _sanitized_chunks(buf, start, stop):
+    """Yields buf[start:stop] with digit-leading tag names prefixed by '_', in one pass."""
+    carry = b''
+    pos = start
+    while pos < stop:
+        end = min(pos + COPY_CHUNK_SIZE, stop)
+        chunk = carry + buf[pos:end]
+        pos = end
+        # A '<' or '</' at the very end may belong to a digit tag in the next chunk
+        cut = chunk.rfind(b'<', max(len(chunk) - 2, 0))
+        if pos < stop and cut != -1:
+            chunk, carry = chunk[:cut], chunk[cut:]
+        else:
+            carry = b''
+        yield _SANITIZE_BYTES_RE.sub(rb'<\1_\2', chunk)
+
+def _parse_section(buf, start, stop, on_chunk=None):
+    parser = ET.XMLParser()
+    pos = start
+    for chunk in timed_iter("sanitize", _sanitized_chunks(buf, start, stop)):
+        with span("parse", bytes=len(chunk)):
+            parser.feed(chunk)
+        if on_chunk is not None:
+            pos = min(pos + COPY_CHUNK_SIZE, stop)
+            on_chunk(pos)
+    return parser.close()
+
+class _DesanitizingWriter:
+    """Text sink for ElementTree.write that undoes the sanitizing and passes the encoded bytes on."""
+    def __init__(self, out):
+        self.out = out
+        self.parts = []
+        self.size = 0
+        self.carry = ''
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= COPY_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self, final=False):
+        text = self.carry + ''.join(self.parts)
+        self.parts = []
+        self.size = 0
+        self.carry = ''
+        cut = text.rfind('<', max(len(text) - 3, 0))
+        if not final and cut != -1:
+            text, self.carry = text[:cut], text[cut:]
+        with span("desanitize", bytes=len(text)):
+            data = _DESANITIZE_RE.sub(r'<\1\2', text).encode('utf-8')
+        self.out.write(data)
+
+    def close(self):
+        self.flush(final=True)
+
+class _PipeAborted(Exception):
+    pass
+
+_PIPE_DONE = object()
+
+class _ChunkPipe:
+    """Bounded hand-off of output blocks from the serializing thread to the writing one.
+
+    The producer side is a file-like write(); small pieces are gathered into
+    blocks of about COPY_CHUNK_SIZE, and at most WRITE_QUEUE_DEPTH blocks wait
+    in the queue, so memory stays flat however large the save is.
+    """
+    def __init__(self):
+        import queue
+        self.queue = queue.Queue(WRITE_QUEUE_DEPTH)
+        self.full = queue.Full
+        self.aborted = threading.Event()
+        self.parts = []
+        self.size = 0
+        self.total = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+        self.total += len(data)
+        if self.size >= COPY_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            block = b''.join(self.parts)
+            self.parts = []
+            self.size = 0
+            self._put(block)
+
+    def _put(self, item):
+        while True:
+            if self.aborted.is_set():
+                raise _PipeAborted()
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except self.full:
+                pass
+
+    def run(self, produce, *args):
+        """Producer thread body: produce(self, *args), then signal the end or the error."""
+        try:
+            produce(self, *args)
+            self.flush()
+            self._put(_PIPE_DONE)
+        except _PipeAborted:
+            pass
+        except BaseException as e:
+            try:
+                self._put(e)
+            except _PipeAborted:
+                pass
+
+    def __iter__(self):
+        while True:
+            item = self.queue.get()
+            if item is _PIPE_DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+def _produce_spliced(out, src_path, splices, lengths, progress=None):
+    with open(src_path, 'rb') as fin:
+        size = os.fstat(fin.fileno()).st_size
+        pos = 0
+        for start, end, data in splices:
+            _copy_range(fin, out, pos, start, progress)
+            before = out.total
+            if isinstance(data, bytes):
+                out.write(data)
+            elif isinstance(data, _SectionParts):
+                with span("serialize", section=public_tag(data.section.tag), bytes=end - start, parallel=True):
+                    for block in data:
+                        out.write(block)
+            else:
+                with span("serialize", section=public_tag(data.tag), bytes=end - start) as s:
+                    writer = _DesanitizingWriter(out)
+                    ET.ElementTree(data).write(writer, encoding='unicode')
+                    writer.close()
+                    s.count(data)
+            lengths.append(out.total - before)
+            pos = end
+            if progress is not None:
+                progress(pos)
+        _copy_range(fin, out, pos, size, progress)
+
+# The sections being saved, for the forked workers of _ParallelSerializer to read
+_FORK_SECTIONS = None
+
+def _serialize_part(k, i, j):
+    """Worker: children i..j of section k, serialized and desanitized exactly as ElementTree.write would."""
+    text = ''.join(ET.tostring(child, encoding='unicode') for child in _FORK_SECTIONS[k][i:j])
+    return _DESANITIZE_RE.sub(r'<\1\2', text).encode('utf-8')
+
+class _SectionParts:
+    """Splice data for one section serialized by a _ParallelSerializer; iterating yields its bytes in order."""
+    def __init__(self, serializer, k, section):
+        self.serializer = serializer
+        self.k = k
+        self.section = section
+
+    def __iter__(self):
+        section = self.section
+        shell = ET.Element(section.tag, section.attrib)
+        shell.text = section.text
+        shell = ET.tostring(shell, encoding='unicode', short_empty_elements=False)
+        close = f"</{section.tag}>"
+        yield _DESANITIZE_RE.sub(r'<\1\2', shell[:-len(close)]).encode('utf-8')
+        for _ in self.serializer.parts[self.k]:
+            yield self.serializer.next_result()
+        yield _DESANITIZE_RE.sub(r'<\1\2', close).encode('utf-8')
+
+class _ParallelSerializer:
+    """Serializes the sections of a full save in a pool of forked processes.
+
+    Each section is cut into ranges of its children, which the workers read
+    from the parent's memory as it was at the fork; only the finished bytes
+    travel back. Results are taken in file order, with at most two parts per
+    worker in flight, so the writer streams them out as they arrive.
+
+    Linux only: the editor forks with its Tk and I/O threads alive, which
+    Linux handles as long as the workers stay away from what those threads
+    hold (they only serialize). Elsewhere fork is missing (Windows) or unsafe
+    with threads (macOS), and spawned workers would need the sections pickled
+    over, which takes as long as serializing them; saves there stay serial.
+    """
+
+    @classmethod
+    def for_splices(cls, splices, workers=None):
+        """Swaps the section splices for parallel ones; returns the serializer, or None when it would not pay off."""
+        sections = [(i, data, end - start) for i, (start, end, data) in enumerate(splices)
+                    if isinstance(data, ET.Element) and not data.tail and len(data)]
+        workers = workers or os.cpu_count() or 1
+        if workers < 2 or not sections or sum(size for _, _, size in sections) < PARALLEL_MIN_BYTES:
+            return None
+        if not sys.platform.startswith('linux'):
+            return None
+        serializer = cls([section for _, section, _ in sections], [size for _, _, size in sections], workers)
+        for k, (i, section, _) in enumerate(sections):
+            start, end, _ = splices[i]
+            splices[i] = (start, end, _SectionParts(serializer, k, section))
+        return serializer
+
+    def __init__(self, sections, sizes, workers):
+        global _FORK_SECTIONS
+        total = sum(sizes)
+        self.parts = []
+        for section, size in zip(sections, sizes):
+            n = min(len(section), max(1, round(workers * PARTS_PER_WORKER * size / total)))
+            bounds = [len(section) * p // n for p in range(n + 1)]
+            self.parts.append([(bounds[p], bounds[p + 1]) for p in range(n)])
+        self.tasks = [(k, i, j) for k, ranges in enumerate(self.parts) for i, j in ranges]
+        self.window = workers * 2
+        self.pending = collections.deque()
+        self.submitted = 0
+        # Imported here, they would cost every start of the editor more than half of its import budget
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        _FORK_SECTIONS = sections
+        self.pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+        # The pool forks all its workers on the first submit; doing that here, on the saving thread,
+        # keeps the fork ahead of the writer threads of this save and outside of their locks
+        self._submit()
+
+    def _submit(self):
+        while self.submitted < len(self.tasks) and len(self.pending) < self.window:
+            self.pending.append(self.pool.submit(_serialize_part, *self.tasks[self.submitted]))
+            self.submitted += 1
+
+    def next_result(self):
+        self._submit()
+        data = self.pending.popleft().result()
+        self._submit()
+        return data
+
+    def close(self):
+        global _FORK_SECTIONS
+        for future in self.pending:
+            future.cancel()
+        self.pool.shutdown(wait=True)
+        _FORK_SECTIONS = None
+
+def _fsync_dir(directory):
+    # Makes the rename itself durable; only possible (and needed) on POSIX
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _remove_stale_temps(directory, name):
+    # Left behind only if a save was killed mid-write; the save file itself was never touched
+    for entry in os.listdir(directory):
+        if entry.startswith(name + ".") and entry.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(directory, entry))
+                logging.info(f"Removed unfinished save {entry}")
+            except OSError:
+                pass
+
+def write_spliced(src_path, dst_path, splices, progress=None):
+    """Writes src with each (start, end) byte range replaced by new data over dst, atomically.
+
+    The data of a splice is either bytes or a parsed section, which is
+    serialized and desanitized on a producer thread while this thread writes
+    the blocks to a temp file next to dst. The temp file is fsynced and then
+    renamed over dst, so dst is either the old file or the complete new one,
+    whatever happens. src and dst may be the same file. progress, if given,
+    is called with the number of source bytes consumed so far.
+    Returns the number of bytes written in place of each splice.
+    """
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(dst_path))
+    _remove_stale_temps(directory, os.path.basename(dst_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(dst_path) + ".", suffix=".tmp", dir=directory)
+    pipe = _ChunkPipe()
+    lengths = []
+    producer = threading.Thread(target=pipe.run, args=(_produce_spliced, src_path, splices, lengths, progress),
+                                name="save-serializer", daemon=True)
+    try:
+        with open(fd, 'wb', buffering=COPY_CHUNK_SIZE) as fout:
+            producer.start()
+            for block in pipe:
+                with span("write", bytes=len(block)):
+                    fout.write(block)
+            fout.flush()
+            with span("fsync"):
+                os.fsync(fout.fileno())
+        if os.path.exists(dst_path):
+            os.chmod(tmp_path, os.stat(dst_path).st_mode & 0o7777)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        pipe.aborted.set()
+        if producer.is_alive():
+            producer.join()
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+    return lengths
+
+def _offset_mapper(splices):
+    """Maps offsets of the old file to the file written with these splices."""
+    ends = [end for _, end, _ in splices]
+    starts = [start for start, _, _ in splices]
+    deltas = [0]
+    for start, end, data in splices:
+        deltas.append(deltas[-1] + len(data) - (end - start))
+
+    def move(pos, is_end=False):
+        if is_end:
+            return pos + deltas[bisect.bisect_right(ends, pos)]
+        i = bisect.bisect_left(ends, pos)
+        # A splice ending exactly here still comes before pos unless it starts here too
+        while i < len(ends) and ends[i] == pos and starts[i] < pos:
+            i += 1
+        return pos + deltas[i]
+    return move
+
+def _moved_spans(spans, splices, move):
+    """{key: (start, end, quote)} with the offsets moved by move = _offset_mapper(splices).
+
+    Value spans never straddle a splice, so without insertions (empty splices,
+    which move() places after a span starting there) one bisect per offset does.
+    """
+    if any(start == end for start, end, _ in splices):
+        return {key: (move(start), move(end, True), quote) for key, (start, end, quote) in spans.items()}
+    deltas = [0]
+    for start, end, data in splices:
+        deltas.append(deltas[-1] + len(data) - (end - start))
+    if not any(deltas):
+        return spans
+    ends = [end for _, end, _ in splices]
+    after = bisect.bisect_right
+    return {key: (start + deltas[after(ends, start)], end + deltas[after(ends, end)], quote)
+            for key, (start, end, quote) in spans.items()}
+
+class LoadCancelled(Exception):
+    pass
+
+class TeardownSaveHandler:
+    def __init__(self, cache=None, keep_snapshots=DEFAULT_KEEP, prepare_backup=False):
+        # Optional TDSaveCache.SaveCache; parsed sections are reused when the file is unchanged
+        self.cache = cache
+        # How many generations of the save the snapshot store keeps (see TDSaveSnapshots)
+        self.keep_snapshots = keep_snapshots
+        # Snapshot loaded and saved files in the background (see _start_backup); for the editor, where
+        # time passes between load and save, not for one-shot scripts
+        self.prepare_backup = prepare_backup
+        self.tree = None
+        self.root = None
+        self.filepath = None
+        self.version = "Unknown"
+        self.last_error = None
+        self.lazy_sections = {}
+        self._layout = None
+        self._root_attrib = None
+        self._source_stat = None
+        # section -> {item: (element, {param: element})}, rebuilt whenever a section is parsed
+        self._index = {}
+        self._sections = {}
+        # element -> (start, end, quote) of its value="..." in the file on disk
+        self._value_spans = {}
+        # (splices, move) of incremental saves not yet applied to _value_spans, see _spans()
+        self._span_moves = []
+        # Parsed sections whose value spans are not recorded yet; that happens on their first edit
+        self._unmapped = set()
+        self._version_span = None
+        # section -> hash of its bytes on disk, to tell which sections the game rewrote
+        self._section_hashes = {}
+        self._dirty = {}
+        # Elements added or removed since the last save; any such change makes the next save a full one
+        self._structure_changes = 0
+        # Sections those changes were made in
+        self._reshaped = set()
+        # Processes serializing a full save; None for one per CPU, 1 to stay in this process
+        self.save_workers = None
+        # Undo/redo of value edits; kept across saves, cleared when another save is loaded
+        self.history = EditHistory()
+        # The file as loaded, chunked into the snapshot store in the background
+        self._backup_thread = None
+        self._backup = None
+
+    def find_default_path(self):
+        local_app_data = os.getenv('LOCALAPPDATA')
+        if local_app_data:
+            possible_path = os.path.join(local_app_data, "Teardown", "savegame.xml")
+            if os.path.exists(possible_path):
+                logging.info(f"Found default save file: {possible_path}")
+                return possible_path
+        logging.info("Default save file not found.")
+        return None
+
+    def _sanitize_xml(self, content):
+        return _SANITIZE_RE.sub(r'<\1_\2', content)
+
+    def _desanitize_xml(self, content):
+        return _DESANITIZE_RE.sub(r'<\1\2', content)
+
+    def _stat_source(self, path):
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+
+    def _record_version_span(self, buf, layout):
+        _, start, open_end, _ = layout["root"]
+        v = VERSION_ATTR_RE.search(buf, start, open_end)
+        if v is None:
+            return None
+        group = 1 if v.group(1) is not None else 2
+        return v.start(group), v.end(group), '"' if group == 1 else "'"
+
+    def _read_save(self, path, lazy, step):
+        # The file is only mapped while loading; raw sections are read back from disk on save
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as raw_content:
+            with span("read", bytes=len(raw_content)):
+                layout = _scan_layout(raw_content)
+            root = _root_element(raw_content, layout)
+            savegame = ET.SubElement(root, 'savegame')
+
+            lazy_sections = {}
+            value_spans = {}
+            unmapped = set()
+            section_hashes = {}
+            for name, start, stop in layout["sections"]:
+                step(start)
+                with span("hash", section=name, bytes=stop - start):
+                    section_hashes[name] = hash_span(raw_content, start, stop)
+                if lazy and name not in UI_SECTIONS:
+                    lazy_sections[name] = (start, stop)
+                    continue
+                with span("parse_section", section=name, bytes=stop - start) as s:
+                    section = _parse_section(raw_content, start, stop, step)
+                    s.count(section)
+                savegame.append(section)
+                # The editor's pages edit the UI sections right away; any other is mapped on its first edit
+                if name not in UI_SECTIONS:
+                    unmapped.add(name)
+                    continue
+                with span("index", section=name, kind="values"):
+                    mapped = _record_value_spans(raw_content, start, stop, section, value_spans)
+                if not mapped:
+                    logging.warning(f"Could not map values of section '{name}', saves will rewrite it fully")
+            version_span = self._record_version_span(raw_content, layout)
+        return root, layout, lazy_sections, value_spans, unmapped, version_span, section_hashes
+
+    def _cache_payload(self):
+        """Compact, picklable form of the parsed sections and their value offsets."""
+        def pack(el):
+            return (el.tag, el.attrib, el.text, el.tail, [pack(child) for child in el])
+
+        sections = []
+        for name, section in self._sections.items():
+            spans = [self._spans().get(el) for el in section.iter()]
+            sections.append((name, pack(section), spans))
+        return {"lazy_sections": self.lazy_sections, "layout": self._layout, "root": (self.root.tag, self.root.attrib),
+                "version_span": self._version_span, "section_hashes": self._section_hashes, "sections": sections,
+                "unmapped": sorted(self._unmapped)}
+
+    def _state_from_cache(self, payload):
+        def unpack(packed):
+            tag, attrib, text, tail, children = packed
+            el = ET.Element(tag, attrib)
+            el.text, el.tail = text, tail
+            el.extend(unpack(child) for child in children)
+            return el
+
+        tag, attrib = payload["root"]
+        root = ET.Element(tag, attrib)
+        savegame = ET.SubElement(root, 'savegame')
+        value_spans = {}
+        for name, packed, spans in payload["sections"]:
+            section = unpack(packed)
+            savegame.append(section)
+            for el, value_span in zip(section.iter(), spans):
+                if value_span is not None:
+                    value_spans[el] = value_span
+        return (root, payload["layout"], payload["lazy_sections"], value_spans, set(payload.get("unmapped", ())),
+                payload["version_span"], payload["section_hashes"])
+
+    def _cache_store(self):
+        if self.cache is None:
+            return
+        try:
+            with span("cache_store"):
+                fingerprint = self.cache.fingerprint(self.filepath)
+                self.cache.put(self.filepath, fingerprint, {"lazy": bool(self.lazy_sections), **self._cache_payload()})
+        except Exception as e:
+            logging.warning(f"Could not cache parsed save: {e}")
+
+    def load_file(self, path, lazy=True, progress=None, cancel=None):
+        """Loads path; returns False and sets last_error on failure.
+
+        progress(bytes_done, bytes_total) is called as the file is parsed and
+        setting the cancel event (anything with is_set()) aborts the load.
+        Either way the previously loaded save stays untouched until the new
+        one is complete, so both may be driven from a worker thread.
+        """
+        logging.info(f"Attempting to load file: {path}")
+        with span("load", file=os.path.basename(path)):
+            try:
+                st = os.stat(path)
+                source_stat = (st.st_size, st.st_mtime_ns)
+                total = st.st_size
+
+                def step(done):
+                    if cancel is not None and cancel.is_set():
+                        raise LoadCancelled()
+                    if progress is not None:
+                        progress(done, total)
+
+                state = None
+                if self.cache is not None:
+                    fingerprint = self.cache.fingerprint(path, st)
+                    payload = self.cache.get(path, fingerprint)
+                    # A lazily loaded entry cannot serve a full load
+                    if payload is not None and (lazy or not payload["lazy"]):
+                        with span("cache_restore"):
+                            state = self._state_from_cache(payload)
+                        logging.info("Parsed save restored from cache")
+                cached = state is not None
+                if state is None:
+                    state = self._read_save(path, lazy, step)
+                step(total)
+                root, layout, lazy_sections, value_spans, unmapped, version_span, section_hashes = state
+                sections = {public_tag(section.tag): section for section in root.find('savegame')}
+
+                self.root = root
+                self.tree = ET.ElementTree(self.root)
+                self.filepath = path
+                self.lazy_sections = lazy_sections
+                self._sections = sections
+                with span("index", sections=len(sections)):
+                    self._index = {name: self._index_section(section) for name, section in sections.items()}
+                self._value_spans = value_spans
+                self._span_moves = []
+                self._unmapped = unmapped
+                self._version_span = version_span
+                self._section_hashes = section_hashes
+                self._dirty = {}
+                self._structure_changes = 0
+                self._reshaped = set()
+                self._layout = layout
+                self._root_attrib = dict(root.attrib)
+                self._source_stat = source_stat
+                self.history.clear()
+
+                if 'version' in self.root.attrib:
+                    self.version = self.root.attrib['version']
+                else:
+                    self.version = "Unknown"
+
+                if not cached:
+                    self._cache_store()
+                self._start_backup()
+                logging.info(f"File loaded successfully. Registry Version: {self.version} "
+                             f"({len(sections)} sections parsed, {len(lazy_sections)} kept raw)")
+                return True
+            except LoadCancelled:
+                logging.info("Load cancelled")
+                self.last_error = "Load cancelled"
+                return False
+            except Exception as e:
+                logging.error(f"Failed to load file: {e}")
+                self.last_error = str(e)
+                return False
+
+    @property
+    def pending_edits(self):
+        return len(self._dirty) + self._structure_changes
+
+    def _write_value(self, element, value):
+        # Remembers the value as on disk, which reload_changed compares against; None removes the value
+        disk = self._dirty.setdefault(element, element.get('value'))
+        if value is None:
+            element.attrib.pop('value', None)
+        else:
+            element.set('value', value)
+        if value == disk:
+            del self._dirty[element]
+
+    def _map_values(self, names):
+        """Records where the values of the named sections live on disk, if that is not known yet."""
+        names = [name for name, _, _ in self._layout["sections"] if name in self._unmapped and name in names]
+        if not names:
+            return
+        # Offsets are only valid for the file as loaded; after an outside change the save waits for a reload anyway
+        if self._stat_source(self.filepath) != self._source_stat:
+            return
+        starts = {name: (start, stop) for name, start, stop in self._layout["sections"]}
+        with open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for name in names:
+                start, stop = starts[name]
+                with span("index", section=name, kind="values"):
+                    mapped = _record_value_spans(buf, start, stop, self._sections[name], self._spans())
+                if not mapped:
+                    logging.warning(f"Could not map values of section '{name}', saves will rewrite it fully")
+                self._unmapped.discard(name)
+
+    def _spans(self):
+        """_value_spans with the moves of the incremental saves since it was last brought up to date."""
+        for splices, move in self._span_moves:
+            self._value_spans = _moved_spans(self._value_spans, splices, move)
+        self._span_moves = []
+        return self._value_spans
+
+    def set_element_value(self, element, value, section):
+        """Sets the value of an element of section (None removes it), recorded in the undo history.
+
+        Returns whether it changed; element comes from path_element() or section_items().
+        """
+        old = element.get('value')
+        if old == value:
+            return False
+        if section in self._unmapped:
+            self._map_values((section,))
+        # _write_value, inlined: this runs once per value of every batch edit
+        disk = self._dirty.setdefault(element, old)
+        if value is None:
+            element.attrib.pop('value', None)
+        else:
+            element.set('value', value)
+        if value == disk:
+            del self._dirty[element]
+        self.history.record(element, old, value, section)
+        return True
+
+    @contextlib.contextmanager
+    def transaction(self, label):
+        """Groups every edit made inside into one undo step."""
+        self.history.begin(label)
+        try:
+            yield
+        finally:
+            self.history.end()
+
+    def undo(self):
+        """Reverts the newest step of edits; returns (label, sections touched) or None if there is none."""
+        group = self.history.pop_undo()
+        if group is None:
+            return None
+        self._map_values(group.sections)
+        for element, old, _ in reversed(group.edits()):
+            self._write_value(element, old)
+        logging.info(f"Undone: {group.label} ({len(group)} value(s))")
+        return group.label, group.sections
+
+    def redo(self):
+        """Makes the newest undone step again; returns (label, sections touched) or None."""
+        group = self.history.pop_redo()
+        if group is None:
+            return None
+        self._map_values(group.sections)
+        for element, _, new in group.edits():
+            self._write_value(element, new)
+        logging.info(f"Redone: {group.label} ({len(group)} value(s))")
+        return group.label, group.sections
+
+    def _value_splices(self):
+        """Splices for an incremental save, or None if a value cannot be patched in place."""
+        if self._structure_changes:
+            return None
+        if self._unmapped and any(el not in self._value_spans for el in self._dirty):
+            # An edit made while the file was changed on disk could not be mapped then
+            self._map_values(self._unmapped)
+        splices = []
+        for el in self._dirty:
+            span = self._value_spans.get(el)
+            value = el.get('value')
+            if span is None or value is None:
+                return None
+            start, end, quote = span
+            for _, move in self._span_moves:
+                start, end = move(start), move(end, True)
+            splices.append((start, end, escape_attr(value, quote).encode('utf-8')))
+
+        if self.root.attrib != self._root_attrib:
+            changed = {k for k in self.root.attrib.keys() | self._root_attrib.keys()
+                       if self.root.get(k) != self._root_attrib.get(k)}
+            if changed != {'version'} or self._version_span is None or self.root.get('version') is None:
+                return None
+            start, end, quote = self._version_span
+            splices.append((start, end, escape_attr(self.root.get('version'), quote).encode('utf-8')))
+
+        splices.sort(key=lambda s: s[0])
+        return splices
+
+    def _changed_sections(self):
+        """Parsed sections with pending edits; the others still match their bytes on disk."""
+        dirty = self._dirty
+        return {name for name, section in self._sections.items()
+                if name in self._reshaped or (dirty and any(el in dirty for el in section.iter()))}
+
+    def _section_splices(self, only=None):
+        """Splices that re-serialize the root tag and every parsed section, or only those named in only."""
+        _, start, open_end, _ = self._layout["root"]
+        splices = []
+        if self.root.attrib != self._root_attrib:
+            head = ET.Element(self.root.tag, self.root.attrib)
+            head = ET.tostring(head, encoding='unicode', short_empty_elements=False)
+            head = head[:-len(f"</{self.root.tag}>")]
+            splices.append((start, open_end, head.encode('utf-8')))
+
+        for name, start, stop in self._layout["sections"]:
+            section = self._sections.get(name)
+            if section is None or (only is not None and name not in only):
+                continue
+            splices.append((start, stop, section))
+        return splices
+
+    def _after_save(self, splices, incremental):
+        # The file on disk is now the spliced one, so every remembered offset moves.
+        if incremental:
+            move = _offset_mapper(splices)
+            tag, start, open_end, end = self._layout["root"]
+            self._layout = {
+                "root": (tag, move(start), move(open_end, True), move(end, True)),
+                "sections": [(name, move(start), move(stop, True)) for name, start, stop in self._layout["sections"]],
+            }
+            # Only the spans of the next edits are needed, so the others move when next read in full
+            self._span_moves.append((splices, move))
+            if len(self._span_moves) >= SPAN_MOVES_PENDING:
+                self._spans()
+            if self._version_span is not None:
+                start, end, quote = self._version_span
+                self._version_span = (move(start), move(end, True), quote)
+            moved = [move(start) for start, _, _ in splices]  # sorted, as the splices are
+
+            def touched(start, stop):
+                i = bisect.bisect_left(moved, start)
+                return i < len(moved) and moved[i] < stop
+            rehash = [(name, start, stop) for name, start, stop in self._layout["sections"] if touched(start, stop)]
+            with open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                for name, start, stop in rehash:
+                    self._section_hashes[name] = hash_span(buf, start, stop)
+        else:
+            # Re-serialized sections have new inner offsets; their values are mapped again on the next edit
+            with open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                self._layout = _scan_layout(buf)
+                for name, start, stop in self._layout["sections"]:
+                    self._section_hashes[name] = hash_span(buf, start, stop)
+                self._version_span = self._record_version_span(buf, self._layout)
+            self._value_spans = {}
+            self._span_moves = []
+            self._unmapped = set(self._sections)
+
+        self.lazy_sections = {name: (start, stop) for name, start, stop in self._layout["sections"]
+                              if name in self.lazy_sections}
+        self._dirty = {}
+        self._structure_changes = 0
+        self._reshaped = set()
+        self._root_attrib = dict(self.root.attrib)
+        self._source_stat = self._stat_source(self.filepath)
+
+    def reload_changed(self):
+        """Pulls in the sections that changed on disk since the save was loaded or last saved.
+
+        Only sections whose bytes hash differently are parsed again; unchanged
+        ones keep their elements. Pending edits are carried over onto the new
+        elements. Returns None if the file is unchanged, else a dict with the
+        reloaded and removed section names and the conflicts: edits whose value
+        on disk changed too, as (path, loaded value, disk value, pending value).
+        A pending edit always wins; conflicts are only reported. history_dropped
+        counts the undo/redo steps dropped because they touched a replaced section.
+        """
+        if self.root is None:
+            return None
+        if self._stat_source(self.filepath) == self._source_stat:
+            return None
+
+        with span("reload", file=os.path.basename(self.filepath)), \
+                open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            st = os.fstat(f.fileno())
+            stat = (st.st_size, st.st_mtime_ns)
+            layout = _scan_layout(buf)
+            root = _root_element(buf, layout)
+            old_starts = {name: start for name, start, _ in self._layout["sections"]}
+            lazy = bool(self.lazy_sections)
+
+            sections, lazy_sections, value_spans, hashes, reloaded = {}, {}, {}, {}, []
+            for name, start, stop in layout["sections"]:
+                hashes[name] = hash_span(buf, start, stop)
+                old = self._sections.get(name)
+                if name in old_starts and hashes[name] == self._section_hashes.get(name):
+                    if old is None:
+                        lazy_sections[name] = (start, stop)
+                        continue
+                    # Same bytes at a new offset: every value moved by the same amount
+                    delta = start - old_starts[name]
+                    for el in old.iter():
+                        value_span = self._spans().get(el)
+                        if value_span is not None:
+                            value_spans[el] = (value_span[0] + delta, value_span[1] + delta, value_span[2])
+                    sections[name] = old
+                    continue
+                if old is None and lazy and name not in UI_SECTIONS:
+                    lazy_sections[name] = (start, stop)
+                    continue
+                with span("parse_section", section=name, bytes=stop - start) as s:
+                    section = _parse_section(buf, start, stop)
+                    s.count(section)
+                sections[name] = section
+                reloaded.append(name)
+            version_span = self._record_version_span(buf, layout)
+
+        removed = [name for name in self._sections if name not in sections]
+        history_dropped = self.history.forget_sections(reloaded + removed)
+        if history_dropped:
+            logging.info(f"Dropped {history_dropped} undo/redo steps: the game replaced sections they refer to")
+
+        # Pending edits in unchanged sections stay as they are; the others are re-applied by path
+        pending = dict(self._dirty)
+        carried = {}
+        for name, old in self._sections.items():
+            if sections.get(name) is not old:
+                for el, path in _element_paths(old, pending).items():
+                    carried.setdefault(name, []).append((path, el.get('value'), pending.pop(el)))
+
+        savegame = self.root.find('savegame')
+        savegame[:] = [sections[name] for name, _, _ in layout["sections"] if name in sections]
+        self.root.attrib.clear()
+        self.root.attrib.update(root.attrib)
+        self._root_attrib = dict(root.attrib)
+        self.version = root.get('version', "Unknown")
+        self._index = {name: self._index[name] if name in self._index and name not in reloaded
+                       else self._index_section(section) for name, section in sections.items()}
+        self._sections = sections
+        self._value_spans = value_spans
+        self._span_moves = []
+        self._unmapped = {name for name in sections if name in reloaded or name in self._unmapped}
+        self._version_span = version_span
+        self._section_hashes = hashes
+        self.lazy_sections = lazy_sections
+        self._layout = layout
+        self._source_stat = stat
+        self._dirty = pending
+
+        self._map_values(carried)
+        conflicts = []
+        for name, edits in carried.items():
+            found = _find_paths(sections[name], [path for path, _, _ in edits]) if name in sections else {}
+            for path, mine, original in edits:
+                el = found.get(path)
+                disk = None if el is None else el.get('value')
+                if disk != original and disk != mine:
+                    dotted = ".".join([name] + [public_tag(tag) for tag, _ in path])
+                    conflicts.append((dotted, original, disk, mine))
+                if el is not None and mine is not None:
+                    self._write_value(el, mine)
+
+        logging.info(f"Reloaded changed sections {reloaded or 'none'} from disk "
+                     f"({len(removed)} removed, {len(self._dirty)} edits pending, {len(conflicts)} conflicts)")
+        self._start_backup()
+        return {"reloaded": reloaded, "removed": removed, "conflicts": conflicts,
+                "history_dropped": history_dropped}
+
+    def snapshots(self):
+        """The snapshot store of the loaded save, or None."""
+        if not self.filepath:
+            return None
+        return SnapshotStore.for_save(self.filepath, self.keep_snapshots)
+
+    def _start_backup(self, before=None, splices=None):
+        # A file new to the snapshot store has to be chunked whole once, and a saved one snapshotted again;
+        # doing both while the user edits keeps them off the save. With before (the snapshot of the file
+        # before the save) and the save's splices, the saved file is snapshotted; otherwise it is prepared.
+        self.wait_backup()  # one writer per store at a time
+        self._backup = None
+        if not self.prepare_backup:
+            return
+        store, path = self.snapshots(), self.filepath
+
+        def run():
+            try:
+                with span("backup", kind="prepare" if before is None else "snapshot"):
+                    if before is None:
+                        prepared = store.prepare(path)
+                    else:
+                        store.take(path, "saved", before, splices, copy=True)
+                        prepared = None
+                self._backup = prepared
+            except Exception as e:
+                logging.warning(f"Could not snapshot {os.path.basename(path)} in the background: {e}")
+
+        self._backup_thread = threading.Thread(target=run, name="snapshot-backup", daemon=True)
+        self._backup_thread.start()
+
+    def wait_backup(self):
+        """Waits until the background snapshot work started by the last load or save is done."""
+        thread = self._backup_thread
+        if thread is not None:
+            thread.join()
+
+    def save_file(self, new_version=None, incremental=True, progress=None):
+        """Saves the edits; returns (success, id of the snapshot holding the previous file, or error message).
+
+        progress(bytes_done, bytes_total) is called while the file is written.
+        """
+        if not self.filepath or not self.root:
+            return False, "No file loaded"
+
+        with span("save", file=os.path.basename(self.filepath)):
+            try:
+                logging.info("Starting save process...")
+                if self._stat_source(self.filepath) != self._source_stat:
+                    return False, "The save file was changed on disk after it was loaded. Reload it before saving."
+
+                if new_version:
+                    logging.info(f"Updating version to: {new_version}")
+                    self.root.set('version', new_version)
+
+                # Usually the snapshot taken after the previous save or the one prepared since the load
+                store = self.snapshots()
+                with span("backup", bytes=self._source_stat[0]):
+                    self.wait_backup()
+                    before = store.ensure(self.filepath, prepared=self._backup)
+                logging.info(f"Backup snapshot: {before['id']}")
+
+                splices = self._value_splices() if incremental else None
+                if splices is None:
+                    # A requested full save rewrites every parsed section; a fallback only the changed ones
+                    splices = self._section_splices(self._changed_sections() if incremental else None)
+                    incremental = False
+
+                total = self._source_stat[0]
+                report = None if progress is None else (lambda done: progress(done, total))
+                serializer = None if incremental else _ParallelSerializer.for_splices(splices, self.save_workers)
+                try:
+                    lengths = write_spliced(self.filepath, self.filepath, splices, report)
+                finally:
+                    if serializer is not None:
+                        serializer.close()
+                with span("index", kind="remap" if incremental else "rescan"):
+                    self._after_save(splices, incremental)
+                saved = [(start, end, n) for (start, end, _), n in zip(splices, lengths)]
+                if self.prepare_backup:
+                    self._start_backup(before, saved)
+                else:
+                    try:
+                        with span("backup", kind="snapshot"):
+                            store.take(self.filepath, "saved", before, saved)
+                    except Exception as e:
+                        logging.warning(f"Saved, but could not snapshot the new file: {e}")
+                self._cache_store()
+
+                mode = "incremental" if incremental else "full"
+                logging.info(f"File saved successfully to: {self.filepath} ({mode}, {len(splices)} spans rewritten)")
+                return True, before['id']
+            except Exception as e:
+                logging.error(f"Save failed: {e}")
+                return False, str(e)
+
+    def _index_section(self, section):
+        items = {}
+        for item in section:
+            params = {}
+            for param in item:
+                params.setdefault(public_tag(param.tag), param)
+            items.setdefault(public_tag(item.tag), (item, params))
+        return items
+
+    def get_node_dict(self, parent_tag):
+        if self.root is None: return {}
+        items = self._index.get(parent_tag)
+        if items is None: return {}
+        return {name: item.get('value') for name, (item, _) in items.items()}
+
+    def get_table(self, section='tool', columns=None):
+        """The numeric values of a section as a TDSaveTable.SectionTable; needs NumPy."""
+        from TDSaveTable import SectionTable
+        return SectionTable.from_handler(self, section, columns)
+
+    def get_tools_data(self):
+        if self.root is None: return {}
+        tools = self._index.get('tool')
+        if tools is None: return {}
+        return {name: {key: param.get('value') for key, param in params.items()}
+                for name, (_, params) in tools.items()}
+
+    def sections(self):
+        """[(name, start, stop, hash), ...] of the sections in the file on disk, in file order."""
+        if self.root is None: return []
+        return [(name, start, stop, self._section_hashes.get(name)) for name, start, stop in self._layout["sections"]]
+
+    def section_items(self, name):
+        """{item: (element, {param: element})} of a section, parsing it first if it was kept raw; KeyError if there is none."""
+        self.path_element(f"savegame.{name}")
+        return self._index[name]
+
+    def source_changed(self):
+        """The (size, mtime) of the file on disk if it changed since it was loaded or saved, else None."""
+        if self._source_stat is None:
+            return None
+        stat = self._stat_source(self.filepath)
+        return None if stat == self._source_stat else stat
+
+    def update_value(self, section_tag, item_tag, attr_name, new_value):
+        if self.root is None: return False
+
+        items = self._index.get(section_tag)
+        entry = None if items is None else items.get(item_tag)
+        if entry is None: return False
+
+        item, params = entry
+        if attr_name == "self":
+            target = item
+        else:
+            target = params.get(attr_name)
+            if target is None: return False
+        # Called per slider frame and per item in batch edits, so keep it to DEBUG and format lazily
+        if not self.set_element_value(target, str(new_value), section_tag):
+            return False
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug("UPDATE %s %s: %s -> %s", section_tag, item_tag, attr_name, new_value)
+        return True
+
+    def update_values(self, section_tag, edits, quiet=False):
+        """Applies [(item, attr, value), ...] in one go, as one undo step; returns how many values actually changed.
+
+        quiet logs the summary at DEBUG, for callers that apply a stream of small batches and log once at the end.
+        """
+        with self.transaction(f"edit {section_tag}"):
+            changed = sum(1 for item_tag, attr_name, new_value in edits
+                          if self.update_value(section_tag, item_tag, attr_name, new_value))
+        if changed:
+            logging.log(logging.DEBUG if quiet else logging.INFO, "UPDATE %s: %d value(s) changed", section_tag, changed)
+        return changed
+
+    def reset_tool(self, tool_name):
+        if tool_name not in TOOL_DEFAULTS:
+            return False
+        with self.transaction(f"reset {tool_name}"):
+            self.update_values('tool', [(tool_name, key, val) for key, val in TOOL_DEFAULTS[tool_name].items()])
+        return True
+
+    def reset_all_tools(self):
+        with self.transaction("reset all tools"):
+            for tool_name in TOOL_DEFAULTS:
+                self.reset_tool(tool_name)
+
+    def unlock_all(self, section):
+        items = self.get_node_dict(section)
+        with self.transaction(f"unlock all {section}"):
+            self.update_values(section, [(item, 'self', 1) for item in items])
+        return len(items)
+
+    def _materialize(self, name):
+        """Parses a section that was kept raw, so its values can be edited."""
+        if self._stat_source(self.filepath) != self._source_stat:
+            raise ValueError("The save file was changed on disk after it was loaded. Reload it first.")
+        start, stop = self.lazy_sections[name]
+        with open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            with span("parse_section", section=name, bytes=stop - start) as s:
+                section = _parse_section(buf, start, stop)
+                s.count(section)
+
+        names = [n for n, _, _ in self._layout["sections"]]
+        position = sum(1 for n in names[:names.index(name)] if n in self._sections)
+        self.root.find('savegame').insert(position, section)
+        del self.lazy_sections[name]
+        self._unmapped.add(name)
+        self._sections[name] = section
+        self._sections = {n: self._sections[n] for n in names if n in self._sections}
+        self._index[name] = self._index_section(section)
+        logging.info(f"Parsed section '{name}' for editing")
+        return section
+
+    def _new_child(self, parent, tag, section):
+        # Takes over the indentation of the last sibling so the file stays readable
+        child = ET.Element(_sanitized_tag(tag))
+        if len(parent):
+            child.tail = parent[-1].tail
+            parent[-1].tail = parent[-2].tail if len(parent) > 1 else parent.text
+        parent.append(child)
+        self._structure_changes += 1
+        self._reshaped.add(section)
+        return child
+
+    def path_element(self, path, create=False):
+        """The element at a registry path below savegame, parsing its section first if it was kept raw.
+
+        With create, missing elements below the section are added. KeyError if
+        it (or, with create, its section) is missing.
+        """
+        parts = path.split('.')
+        if len(parts) < 2 or parts[0] != 'savegame':
+            raise KeyError(path)
+        name = parts[1]
+        if name in self.lazy_sections:
+            self._materialize(name)
+        section = self._sections.get(name)
+        if section is None:
+            raise KeyError(path)
+        if len(parts) == 2:
+            return section
+
+        items = self._index[name]
+        entry = items.get(parts[2])
+        if entry is None:
+            if not create:
+                raise KeyError(path)
+            entry = items[parts[2]] = (self._new_child(section, parts[2], name), {})
+        el, params = entry
+        if len(parts) == 3:
+            return el
+        param = params.get(parts[3])
+        if param is None:
+            if not create:
+                raise KeyError(path)
+            param = params[parts[3]] = self._new_child(el, parts[3], name)
+        el = param
+        for tag in parts[4:]:
+            tag = _sanitized_tag(tag)
+            child = next((c for c in el if c.tag == tag), None)
+            if child is None:
+                if not create:
+                    raise KeyError(path)
+                child = self._new_child(el, tag, name)
+            el = child
+        return el
+
+    def set_path_value(self, path, value):
+        """Sets the value at a registry path such as 'savegame.mod.mymod.active', or ROOT_VERSION_PATH.
+
+        Missing elements along the path are created (the section must exist)
+        and sections kept raw are parsed first; None removes the value.
+        Returns whether anything changed; KeyError if the path cannot be reached.
+        """
+        if self.root is None:
+            return False
+        if path == ROOT_VERSION_PATH:
+            if value is None or self.root.get('version') == str(value):
+                return False
+            self.root.set('version', str(value))
+            self.version = str(value)
+            return True
+        structure = self._structure_changes
+        el = self.path_element(path, create=True)
+        with self.transaction(f"set {path}"):
+            changed = self.set_element_value(el, None if value is None else str(value), path.split('.')[1])
+        return changed or self._structure_changes != structure
+
+    def remove_path(self, path):
+        """Removes the element at a registry path with everything below it; sections themselves cannot be removed."""
+        if self.root is None:
+            return False
+        parts = path.split('.')
+        if len(parts) < 3:
+            raise KeyError(path)
+        el = self.path_element(path)
+        parent = self.path_element('.'.join(parts[:-1]))
+        siblings = list(parent)
+        i = siblings.index(el)
+        if i == len(siblings) - 1 and i > 0:
+            siblings[i - 1].tail = el.tail
+        parent.remove(el)
+
+        items = self._index[parts[1]]
+        if len(parts) == 3:
+            items.pop(parts[2], None)
+        elif len(parts) == 4:
+            items[parts[2]][1].pop(parts[3], None)
+        for child in el.iter():
+            self._dirty.pop(child, None)
+            self._value_spans.pop(child, None)
+        self._structure_changes += 1
+        self._reshaped.add(parts[1])
+        # Removals are not journaled, and earlier steps may refer to what was removed
+        self.history.clear()
+        return True
+
+    def get_children(self, path):
+        """[(tag, value, has_children), ...] of the element at a registry path, in file order.
+
+        Sections kept raw are read from the file without being parsed, so
+        browsing them costs a scan of the browsed element only.
+        """
+        if self.root is None:
+            return []
+        parts = path.split('.')
+        if parts == ['savegame']:
+            return [(name, self._sections[name].get('value'), len(self._sections[name]) > 0)
+                    if name in self._sections else (name, None, True)
+                    for name, _, _ in self._layout["sections"]]
+        if len(parts) < 2 or parts[0] != 'savegame':
+            raise KeyError(path)
+        if parts[1] not in self.lazy_sections:
+            return [(public_tag(child.tag), child.get('value'), len(child) > 0) for child in self.path_element(path)]
+
+        if self._stat_source(self.filepath) != self._source_stat:
+            raise ValueError("The save file was changed on disk after it was loaded. Reload it first.")
+        import html
+        start, stop = self.lazy_sections[parts[1]]
+        with open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            el = _next_element(buf, start, stop)
+            for tag in parts[2:]:
+                tag = tag.encode('utf-8')
+                el = next((child for child in _iter_children(buf, el[2], el[3]) if child[0] == tag), None)
+                if el is None:
+                    raise KeyError(path)
+            children = []
+            if el[2] == el[3]:
+                return children
+            for tag, start, open_end, end in _iter_children(buf, el[2], el[3]):
+                v = VALUE_ATTR_RE.search(buf, start, open_end)
+                value = None if v is None else html.unescape((v.group(1) if v.group(1) is not None else v.group(2)).decode('utf-8'))
+                has_children = open_end != end and buf.find(b'<', open_end, end) != buf.rfind(b'</', open_end, end)
+                children.append((tag.decode('utf-8'), value, has_children))
+        return children
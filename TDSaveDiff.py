@@ -0,0 +1,465 @@
+# MADE BY SKELETON3595
+# Structural diff of two save files, worked out from their bytes without parsing them.
+#
+# Both files are mapped and walked side by side, one level of the registry at a
+# time, with children paired by tag (registry keys are unique among siblings).
+# Before reading children the walk asks a galloping memcmp how far both files
+# stay byte-identical from the current position. Every child inside that stretch
+# is the same subtree in both: a long stretch is jumped over by counting tags,
+# a short one is stepped through on one side only, and neither is hashed or
+# descended into. An element's end is only looked for within that stretch, so
+# the elements holding a difference are entered without first scanning to where
+# they close. Pairs met out of order (after an insertion or a reorder) are
+# compared by subtree hash instead, so an identical subtree is still skipped
+# whole. The bytes both files end with are found once up front, and a level is
+# left as soon as the rest of it falls into that common tail.
+import os
+import mmap
+import html
+import logging
+from collections import namedtuple
+
+from TDSaveCore import ROOT_VERSION_PATH, find_close, hash_span, MARKUP_RE, VALUE_ATTR_RE, VERSION_ATTR_RE
+from TDSaveProfile import span
+
+PATCH_FORMAT = 1
+FIRST_BLOCK = 256
+COMPARE_BLOCK = 1024 * 1024
+XOR_BLOCK = 4096
+# Identical stretches longer than this are jumped over instead of walked child by child
+JUMP_MIN = 64 * 1024
+# How many tags a jump may step back to reach the start of the child it lands in
+MAX_BACKSTEPS = 256
+# Everything but these is dropped before tags are counted
+_MARK_CHARS = b'<>/"\'!?'
+_NOT_MARKS = bytes(c for c in range(256) if c not in _MARK_CHARS)
+
+# kind is "added", "removed" or "changed"; old/new are None where there is no value
+Change = namedtuple("Change", "kind path old new")
+
+def _common_length(a, pos_a, b, pos_b):
+    """How many bytes a[pos_a:] and b[pos_b:] start with in common.
+
+    Blocks grow from FIRST_BLOCK, so a difference right at the start costs
+    next to nothing; a differing block is halved down to XOR_BLOCK, where
+    one xor of the two blocks as integers finds the byte.
+    """
+    limit = min(len(a) - pos_a, len(b) - pos_b)
+    n = 0
+    step = FIRST_BLOCK
+    while n < limit:
+        size = min(step, limit - n)
+        x, y = a[pos_a + n:pos_a + n + size], b[pos_b + n:pos_b + n + size]
+        if x != y:
+            while size > XOR_BLOCK:
+                size //= 2
+                if x[:size] == y[:size]:
+                    n += size
+                    x, y = x[size:], y[size:]
+                else:
+                    x, y = x[:size], y[:size]
+            # The highest differing bit of the two blocks read as big-endian numbers is in the first differing byte
+            diff = int.from_bytes(x, 'big') ^ int.from_bytes(y, 'big')
+            return n + len(x) - (diff.bit_length() + 7) // 8
+        n += size
+        step = min(step * 2, COMPARE_BLOCK)
+    return limit
+
+def _common_suffix(a, b, limit):
+    """How many bytes a and b end with in common, at most limit."""
+    la, lb = len(a), len(b)
+    n = 0
+    step = FIRST_BLOCK
+    while n < limit:
+        size = min(step, limit - n)
+        x, y = a[la - n - size:la - n], b[lb - n - size:lb - n]
+        if x != y:
+            while size > XOR_BLOCK:
+                size //= 2
+                if x[-size:] == y[-size:]:
+                    n += size
+                    x, y = x[:-size], y[:-size]
+                else:
+                    x, y = x[-size:], y[-size:]
+            diff = int.from_bytes(x, 'little') ^ int.from_bytes(y, 'little')
+            return n + len(x) - (diff.bit_length() + 7) // 8
+        n += size
+        step = min(step * 2, COMPARE_BLOCK)
+    return limit
+
+def _depth_change(buf, start, stop):
+    """How many more elements are open at stop than at start (both outside tags), or None
+    if buf[start:stop] has comments, CDATA or a '>' outside a tag end, where counting is unsafe.
+
+    Runs at memcpy-like speed: per block, end tags are counted in the raw
+    bytes and the rest in a copy reduced to markup characters only.
+    """
+    depth = 0
+    pos = start
+    while pos < stop:
+        end = min(pos + COMPARE_BLOCK, stop)
+        if end < stop:
+            cut = buf.rfind(b'<', pos + 1, end)
+            if cut != -1:
+                end = cut
+        block = buf[pos:end]
+        marks = block.translate(None, _NOT_MARKS)
+        tags = marks.count(b'<')
+        if tags != marks.count(b'>') or b'<!' in marks or b'<?' in marks:
+            return None
+        # Every end tag reduces to "</>", as does a self-closing tag without attributes
+        ends = block.count(b'</')
+        self_closing = marks.count(b'/>') - ends
+        depth += tags - 2 * ends - self_closing
+        pos = end
+    return depth
+
+def _boundary_before(buf, pos, x, parent_tag):
+    """Start of the last element at or before x on the level of pos, pos being where a child of
+    parent_tag starts (or the previous one ended); pos itself when that cannot be told cheaply.
+
+    The depth at x alone cannot tell whether the level was left and another
+    one entered on the way, so the parent's closing tag is looked for first.
+    """
+    y = buf.rfind(b'<', pos + 1, x + 1)
+    if y == -1:
+        return pos
+    # If the level ends before x, step back from the parent's closing tag instead
+    close = buf.find(b'</' + parent_tag, pos, y)
+    while close != -1:
+        m = MARKUP_RE.match(buf, close)
+        if m is not None and m.group(2) == parent_tag:
+            break
+        close = buf.find(b'</' + parent_tag, close + 2, y)
+    depth = _depth_change(buf, pos, y if close == -1 else close)
+    if depth is None or depth < 0 or (close != -1 and depth != 0):
+        return pos
+    if close != -1:
+        y = close
+    for _ in range(MAX_BACKSTEPS):
+        m = MARKUP_RE.match(buf, y)
+        if m is None or m.group(2) is None:
+            return pos
+        if depth == 0 and not m.group(1):
+            return y
+        # Step back over the previous tag
+        y = buf.rfind(b'<', pos, y)
+        m = MARKUP_RE.match(buf, y) if y != -1 else None
+        if m is None or m.group(2) is None:
+            return pos
+        if not m.group(4):
+            depth += 1 if m.group(1) else -1
+    return pos
+
+def _next_child(buf, pos, limit):
+    """(tag, start, open_end, end) of the next element from pos, end being None if the element
+    does not close before limit. The parent's closing tag comes back with tag None."""
+    while True:
+        m = MARKUP_RE.search(buf, pos)
+        if m is None:
+            raise ValueError(f"Unexpected end of file after byte {pos}")
+        if m.group(2) is not None:
+            break
+        pos = m.end()
+    if m.group(1) or m.group(4):
+        return None if m.group(1) else m.group(2), m.start(), m.end(), m.end()
+    tag = m.group(2)
+    end = None
+    # Cheap test first: without its closing tag in range there is no point matching nested ones
+    if buf.find(b'</' + tag, m.end(), limit) != -1:
+        try:
+            end = find_close(buf, tag, m.end(), limit)
+        except ValueError:
+            pass
+    return tag, m.start(), m.end(), end
+
+def _with_end(buf, el):
+    if el[3] is not None:
+        return el
+    return el[0], el[1], el[2], find_close(buf, el[0], el[2], len(buf))
+
+def _attr_value(buf, el, attr_re=VALUE_ATTR_RE):
+    m = attr_re.search(buf, el[1], el[2])
+    if m is None:
+        return None
+    raw = m.group(1) if m.group(1) is not None else m.group(2)
+    return html.unescape(raw.decode('utf-8'))
+
+def _join(path, tag):
+    tag = tag.decode('utf-8')
+    return path + "." + tag if path else tag
+
+def _subtree_values(buf, el, parent):
+    """(path, value) of every element in el's subtree that has a value or is an empty leaf, in file order."""
+    stack = []
+    prefix = parent + "." if parent else ""
+    for m in MARKUP_RE.finditer(buf, el[1], el[3]):
+        closing, tag, attrs, self_closing = m.groups()
+        if tag is None:
+            continue
+        if closing:
+            path, value, has_children = stack.pop()
+            if value is None and not has_children:
+                yield path, None
+            prefix = stack[-1][0] + "." if stack else (parent + "." if parent else "")
+            continue
+        if stack:
+            stack[-1][2] = True
+        path = prefix + tag.decode('utf-8')
+        value = None
+        if b'value' in attrs:
+            v = VALUE_ATTR_RE.search(attrs)
+            if v is not None:
+                raw = (v.group(1) if v.group(1) is not None else v.group(2)).decode('utf-8')
+                value = html.unescape(raw) if '&' in raw else raw
+        if self_closing:
+            yield path, value
+        else:
+            if value is not None:
+                yield path, value
+            stack.append([path, value, False])
+            prefix = path + "."
+
+class SaveDiff:
+    """Differences between save a and save b.
+
+    changes lists every value entry that was added, removed or changed, as
+    Change(kind, path, old, new), paths being registry keys such as
+    'savegame.tool.rifle.ammo'. ops is the same difference as edits that turn
+    a into b: ('set', path, value) and ('remove', path), where a removed
+    subtree is one remove. patch() wraps ops for apply_patch.
+    """
+
+    def __init__(self, path_a, path_b):
+        self.path_a = path_a
+        self.path_b = path_b
+        self.changes = []
+        self.ops = []
+        self.stats = {"elements": 0, "hashed_bytes": 0, "jumped_bytes": 0, "common_head": 0, "common_tail": 0}
+
+    def counts(self):
+        counts = {"added": 0, "removed": 0, "changed": 0}
+        for change in self.changes:
+            counts[change.kind] += 1
+        return counts
+
+    def patch(self):
+        return {"format": PATCH_FORMAT, "from": os.path.abspath(self.path_a), "to": os.path.abspath(self.path_b),
+                "ops": [list(op) for op in self.ops]}
+
+    # --- WALKING ---
+
+    def _run(self, a, b):
+        self.a, self.b = a, b
+        head = _common_length(a, 0, b, 0)
+        tail = _common_suffix(a, b, min(len(a), len(b)) - head)
+        self.tail_a, self.tail_b = len(a) - tail, len(b) - tail
+        self.stats["common_head"], self.stats["common_tail"] = head, tail
+        if head == len(a) == len(b):
+            return
+
+        root_a = _next_child(a, 0, head)
+        root_b = _next_child(b, 0, head)
+        if root_a[0] is None or root_b[0] is None:
+            raise ValueError("No root element found")
+        old = _attr_value(a, root_a, VERSION_ATTR_RE)
+        new = _attr_value(b, root_b, VERSION_ATTR_RE)
+        if old != new:
+            self.changes.append(Change("changed", ROOT_VERSION_PATH, old, new))
+            self.ops.append(("set", ROOT_VERSION_PATH, new))
+        self._walk(root_a, root_b, "", head - root_a[2] if head > root_a[2] == root_b[2] else 0)
+
+    def _walk(self, el_a, el_b, path, same=0):
+        """Pairs up the children of el_a and el_b and compares each pair.
+
+        same is how many bytes after both start tags are known to be equal.
+        Returns where the walk stopped: (close_a, close_b, True) at the two
+        closing tags, or (pos_a, pos_b, False) once the rest is common tail.
+        """
+        a, b = self.a, self.b
+        pos_a, pos_b = el_a[2], el_b[2]
+        leaf_a, leaf_b = el_a[2] == el_a[3], el_b[2] == el_b[3]
+        # Equal stretches only say something about children when both sides have them
+        aligned = not (leaf_a or leaf_b)
+        # a[pos_a:equal_to] is known to equal b from pos_b on
+        equal_to = pos_a + same if aligned else pos_a
+        tried_jump = None
+        pending_a, pending_b = {}, {}
+        # Children already paired, skipped when a side is walked again from an earlier point
+        paired_a, paired_b = set(), set()
+        while True:
+            if pos_a >= self.tail_a and pos_b - self.tail_b == pos_a - self.tail_a:
+                stop = (pos_a, pos_b, False)
+                break
+            if aligned and pos_a >= equal_to:
+                equal_to = pos_a + _common_length(a, pos_a, b, pos_b)
+            if aligned and equal_to - pos_a > JUMP_MIN and equal_to != tried_jump:
+                # Land on the child holding the difference without stepping through the ones before it
+                tried_jump = equal_to
+                jump = _boundary_before(a, pos_a, equal_to, el_a[0])
+                self.stats["jumped_bytes"] += jump - pos_a
+                pos_b += jump - pos_a
+                pos_a = jump
+
+            child_a = (None, pos_a, pos_a, pos_a) if leaf_a else _next_child(a, pos_a, equal_to)
+            if child_a[1] in paired_a:
+                pos_a = _with_end(a, child_a)[3]
+                continue
+            if aligned and child_a[3] is not None and child_a[3] <= equal_to:
+                # The same bytes follow in b, so the same subtree (or closing tag) is there too
+                if child_a[0] is None:
+                    stop = (child_a[1], pos_b + child_a[1] - pos_a, True)
+                    break
+                self.stats["elements"] += 1
+                pos_b += child_a[3] - pos_a
+                pos_a = child_a[3]
+                continue
+            child_b = (None, pos_b, pos_b, pos_b) if leaf_b else _next_child(b, pos_b, equal_to + pos_b - pos_a)
+            if child_b[1] in paired_b:
+                pos_b = _with_end(b, child_b)[3]
+                continue
+            open_a, open_b = child_a[0] is not None, child_b[0] is not None
+            if not open_a and not open_b:
+                stop = (child_a[1], child_b[1], True)
+                break
+
+            if open_a and open_b and child_a[0] == child_b[0]:
+                # In step, and usually the pair holding the first differing byte
+                if pending_a or pending_b:
+                    paired_a.add(child_a[1])
+                    paired_b.add(child_b[1])
+                if child_a[1] - pos_a == child_b[1] - pos_b and child_a[1] <= equal_to:
+                    same = equal_to - child_a[1]
+                else:
+                    same = _common_length(a, child_a[1], b, child_b[1])
+                pos_a, pos_b = self._compare(child_a, child_b, path, same)
+            elif open_a and child_a[0] in pending_b:
+                # b had this one earlier; walk b again from just after it
+                match = pending_b.pop(child_a[0])
+                child_a = _with_end(a, child_a)
+                paired_a.add(child_a[1])
+                paired_b.add(match[1])
+                self._compare(child_a, match, path)
+                pos_a, pos_b = child_a[3], match[3]
+                pending_b = {tag: c for tag, c in pending_b.items() if c[1] < match[3]}
+            elif open_b and child_b[0] in pending_a:
+                match = pending_a.pop(child_b[0])
+                child_b = _with_end(b, child_b)
+                paired_a.add(match[1])
+                paired_b.add(child_b[1])
+                self._compare(match, child_b, path)
+                pos_a, pos_b = match[3], child_b[3]
+                pending_a = {tag: c for tag, c in pending_a.items() if c[1] < match[3]}
+            else:
+                if open_a:
+                    child_a = _with_end(a, child_a)
+                    pending_a.setdefault(child_a[0], child_a)
+                    pos_a = child_a[3]
+                if open_b:
+                    child_b = _with_end(b, child_b)
+                    pending_b.setdefault(child_b[0], child_b)
+                    pos_b = child_b[3]
+            equal_to = pos_a
+
+        for child in pending_a.values():
+            self._removed(child, path)
+        for child in pending_b.values():
+            self._added(child, path)
+        return stop
+
+    def _compare(self, el_a, el_b, path, same=None):
+        """Reports the differences inside a pair of elements with the same tag.
+
+        same is how many leading bytes of the pair are known to be equal; None
+        for a pair met out of step, which is hashed first and skipped if
+        identical. Returns where the pair ends in both files, or where the walk
+        stopped once the rest was common tail.
+        """
+        self.stats["elements"] += 1
+        a, b = self.a, self.b
+        if same is None:
+            el_a, el_b = _with_end(a, el_a), _with_end(b, el_b)
+            if el_a[3] - el_a[1] == el_b[3] - el_b[1]:
+                self.stats["hashed_bytes"] += 2 * (el_a[3] - el_a[1])
+                if hash_span(a, el_a[1], el_a[3]) == hash_span(b, el_b[1], el_b[3]):
+                    return el_a[3], el_b[3]
+            same = 0
+        elif el_a[3] is not None and same >= el_a[3] - el_a[1] and el_a[3] - el_a[1] == el_b[3] - el_b[1]:
+            return el_a[3], el_b[3]
+
+        child_path = _join(path, el_a[0])
+        old, new = _attr_value(a, el_a), _attr_value(b, el_b)
+        if old != new:
+            self.changes.append(Change("changed", child_path, old, new))
+            self.ops.append(("set", child_path, new))
+        leaf_a, leaf_b = el_a[2] == el_a[3], el_b[2] == el_b[3]
+        if leaf_a and leaf_b:
+            return el_a[3], el_b[3]
+        open_len = el_a[2] - el_a[1]
+        inner = same - open_len if same > open_len and open_len == el_b[2] - el_b[1] else 0
+        stop_a, stop_b, closed = self._walk(el_a, el_b, child_path, inner)
+        if not closed:
+            return stop_a, stop_b
+        end_a = el_a[3] if leaf_a else MARKUP_RE.match(a, stop_a).end()
+        end_b = el_b[3] if leaf_b else MARKUP_RE.match(b, stop_b).end()
+        return end_a, end_b
+
+    def _removed(self, el, path):
+        for entry_path, value in _subtree_values(self.a, el, path):
+            self.changes.append(Change("removed", entry_path, value, None))
+        self.ops.append(("remove", _join(path, el[0])))
+
+    def _added(self, el, path):
+        for entry_path, value in _subtree_values(self.b, el, path):
+            self.changes.append(Change("added", entry_path, None, value))
+            self.ops.append(("set", entry_path, value))
+
+def diff_files(path_a, path_b):
+    """Compares two save files; returns a SaveDiff describing how to get from a to b."""
+    result = SaveDiff(path_a, path_b)
+    with open(path_a, 'rb') as fa, open(path_b, 'rb') as fb:
+        size_a, size_b = os.fstat(fa.fileno()).st_size, os.fstat(fb.fileno()).st_size
+        if not size_a or not size_b:
+            raise ValueError("Cannot compare an empty file")
+        with mmap.mmap(fa.fileno(), 0, access=mmap.ACCESS_READ) as a, \
+                mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ) as b, \
+                span("diff", bytes=size_a + size_b) as s:
+            result._run(a, b)
+            s.set(elements=result.stats["elements"])
+    counts = result.counts()
+    logging.info(f"Diff {path_a} -> {path_b}: {counts['changed']} changed, {counts['added']} added, "
+                 f"{counts['removed']} removed ({result.stats['elements']} elements compared)")
+    return result
+
+# --- PATCHES ---
+
+def write_patch(diff, path):
+    import json
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(diff.patch(), f, indent=1)
+
+def read_patch(path):
+    import json
+    with open(path, encoding='utf-8') as f:
+        patch = json.load(f)
+    if patch.get("format") != PATCH_FORMAT:
+        raise ValueError(f"Unsupported patch format: {patch.get('format')}")
+    return patch
+
+def apply_patch(handler, patch):
+    """Applies a patch to the loaded save through the handler's edits; returns (values changed, paths not found)."""
+    changed = 0
+    missing = []
+    for op in patch["ops"]:
+        kind, path = op[0], op[1]
+        try:
+            if kind == "set":
+                changed += handler.set_path_value(path, op[2])
+            elif kind == "remove":
+                changed += handler.remove_path(path)
+            else:
+                raise ValueError(f"Unknown patch operation: {kind}")
+        except KeyError:
+            missing.append(path)
+    logging.info(f"Patch applied: {changed} value(s) changed, {len(missing)} path(s) not found")
+    return changed, missing
@@ -0,0 +1,204 @@
+# MADE BY SKELETON3595
+# Bulk edits as small expressions, e.g.
+#   tool.*.ammo = max(ammo * 2, 500)
+#   valuable.* = 1
+#   mod.*.unlocked = 1; tool.rifle.damage = damage + 1
+#
+# The left side is a registry path below savegame whose parts may use * and ? as
+# wildcards. The right side is a Python expression limited to numbers, strings,
+# arithmetic, comparisons, `a if c else b` and the functions in FUNCTIONS. A name
+# in it is the value of the element with that name next to the edited one, so
+# `ammo` above is each tool's own ammo and `value` is the edited value itself.
+# A result of None leaves the value alone, which makes conditions possible:
+#   tool.*.ammo = 9999 if ammo < 100 else None
+# Lines starting with # are comments.
+import re
+import ast
+import math
+import fnmatch
+import logging
+
+from TDSaveCore import public_tag
+
+def _clamp(x, lo, hi):
+    return max(lo, min(hi, x))
+
+FUNCTIONS = {"max": max, "min": min, "abs": abs, "round": round, "int": int, "float": float, "str": str,
+             "clamp": _clamp, "floor": math.floor, "ceil": math.ceil}
+
+_ALLOWED = (ast.Expression, ast.Constant, ast.Name, ast.Load, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare,
+            ast.IfExp, ast.Call, ast.Tuple, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+            ast.USub, ast.UAdd, ast.Not, ast.And, ast.Or, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_STATEMENT_RE = re.compile(r'^\s*([^\s=]+)\s*=(?!=)\s*(.+?)\s*$', re.S)
+# A statement ends at ; or a line end that is not inside quotes
+_SPLIT_RE = re.compile(r'(?:[^;\n"\']|"[^"]*"|\'[^\']*\')+')
+_INT_RE = re.compile(r'-?\d+$')
+
+class ExprError(ValueError):
+    pass
+
+def _number(text):
+    """A value as the expression sees it: int or float when it looks like one, else the string."""
+    if text is None:
+        return None
+    if _INT_RE.match(text):
+        return int(text)
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+def _format(result):
+    if isinstance(result, bool):
+        return "1" if result else "0"
+    if isinstance(result, float):
+        if not math.isfinite(result):
+            raise ExprError(f"Result is not a number: {result}")
+        return str(int(result)) if result.is_integer() else repr(result)
+    return str(result)
+
+_GLOBALS = {"__builtins__": {}, **FUNCTIONS}
+
+class _Scope(dict):
+    """Names of an expression: the edited value and its siblings' values, read on first use.
+    Names that are neither fall through to FUNCTIONS."""
+    def __init__(self, value, siblings, read):
+        super().__init__(value=value)
+        self.siblings = siblings
+        self.read = read
+
+    def __missing__(self, key):
+        el = self.siblings(key)
+        if el is None:
+            raise KeyError(key)
+        value = self[key] = _number(self.read(el))
+        return value
+
+class Statement:
+    def __init__(self, source):
+        m = _STATEMENT_RE.match(source)
+        if m is None:
+            raise ExprError(f"Expected PATH = EXPRESSION, got '{source.strip()}'")
+        self.source = source.strip()
+        path, expr = m.groups()
+        parts = path.split('.')
+        if parts[0] == 'savegame':
+            parts = parts[1:]
+        if not parts or not all(parts):
+            raise ExprError(f"Bad path '{path}'")
+        # A part without wildcards is looked up directly instead of matched
+        self.parts = [re.compile(fnmatch.translate(part)).match if any(c in part for c in "*?[") else part
+                      for part in parts]
+        try:
+            tree = ast.parse(expr, mode='eval')
+        except SyntaxError as e:
+            raise ExprError(f"Bad expression '{expr}': {e.msg}") from None
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED):
+                raise ExprError(f"'{type(node).__name__}' is not allowed in '{expr}'")
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str, type(None))):
+                raise ExprError(f"Only numbers and strings can be written in '{expr}'")
+            if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS
+                                               or node.keywords):
+                raise ExprError(f"Only {', '.join(FUNCTIONS)} can be called, in '{expr}'")
+        self.code = compile(tree, f"<{self.source}>", 'eval')
+        # Without names the result is the same everywhere and computed once
+        self.constant = not any(isinstance(node, ast.Name) and node.id not in FUNCTIONS for node in ast.walk(tree))
+
+    def evaluate(self, scope):
+        try:
+            return eval(self.code, _GLOBALS, scope)
+        except NameError as e:
+            raise ExprError(f"{self.source}: no value named '{e.name}' here") from None
+        except Exception as e:
+            raise ExprError(f"{self.source}: {type(e).__name__}: {e}") from None
+
+    def _matching(self, part, names):
+        if isinstance(part, str):
+            return [part] if part in names else []
+        return [name for name in names if part(name)]
+
+    def targets(self, handler):
+        """(element, section, siblings by name) of every element the path matches, in file order."""
+        first, rest = self.parts[0], self.parts[1:]
+        for name in self._matching(first, [name for name, _, _, _ in handler.sections()]):
+            try:
+                section = handler.path_element(f"savegame.{name}")
+            except KeyError:
+                continue
+            if not rest:
+                yield section, name, lambda key: None
+                continue
+            items = handler.section_items(name)
+            for item_name in self._matching(rest[0], items):
+                item, params = items[item_name]
+                if len(rest) == 1:
+                    yield item, name, lambda key, items=items: items[key][0] if key in items else None
+                    continue
+                for param_name in self._matching(rest[1], params):
+                    if len(rest) == 2:
+                        yield params[param_name], name, params.get
+                    else:
+                        yield from self._below(params[param_name], rest[2:], name)
+
+    def _below(self, el, parts, section):
+        children = {}
+        for child in el:
+            children.setdefault(public_tag(child.tag), child)
+        for child_name in self._matching(parts[0], children):
+            if len(parts) == 1:
+                yield children[child_name], section, children.get
+            else:
+                yield from self._below(children[child_name], parts[1:], section)
+
+def compile_program(text):
+    """The statements of text, each checked and compiled once; ExprError if any is invalid."""
+    statements = []
+    for line in text.splitlines():
+        if line.lstrip().startswith('#'):
+            continue
+        statements.extend(Statement(part) for part in _SPLIT_RE.findall(line) if part.strip())
+    if not statements:
+        raise ExprError("Nothing to do")
+    return statements
+
+def apply_program(handler, program, label=None):
+    """Runs compiled statements against the loaded save as one undo step.
+
+    Statements run in order and each sees the results of the ones before.
+    Every value is computed before any is written, so an error leaves the
+    save untouched. Returns (values matched, values changed, sections changed).
+    """
+    if handler.root is None:
+        return 0, 0, set()
+    pending = {}
+
+    def read(el):
+        return pending[el][0] if el in pending else el.get('value')
+
+    matched = 0
+    for statement in program:
+        value = None
+        if statement.constant:
+            result = statement.evaluate({})
+            if result is None:
+                continue
+            value = _format(result)
+        for el, section, siblings in statement.targets(handler):
+            matched += 1
+            if not statement.constant:
+                result = statement.evaluate(_Scope(_number(read(el)), siblings, read))
+                if result is None:
+                    continue
+                value = _format(result)
+            pending[el] = (value, section)
+
+    changed = 0
+    sections = set()
+    with handler.transaction(label or "; ".join(statement.source for statement in program)):
+        for el, (value, section) in pending.items():
+            if handler.set_element_value(el, value, section):
+                changed += 1
+                sections.add(section)
+    logging.info(f"Expression applied: {matched} value(s) matched, {changed} changed")
+    return matched, changed, sections
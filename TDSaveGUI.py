@@ -0,0 +1,1146 @@
+# MADE BY SKELETON3595
+import os
+import logging
+import threading
+import webbrowser
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import customtkinter as ctk
+
+from TDSaveCore import TeardownSaveHandler, TOOL_DEFAULTS, TOOL_LIMITS
+from TDSaveCache import SaveCache
+from TDSaveWatcher import SaveWatcher, WATCH_POLL_MS
+from TDSaveSearch import SearchIndex
+from TDSaveExpr import ExprError, compile_program, apply_program
+
+# --- DESIGN CONFIGURATION ---
+THEME = {
+    "bg_main": "#141414",       
+    "bg_sidebar": "#2b2b2b",    
+    "accent": "#FDB813",
+    "accent_hover": "#e0a100",  
+    "text": "#ffffff",
+    "text_gray": "#aaaaaa",
+    "danger": "#cf352e",        
+    "danger_hover": "#ad2b25",
+    "success": "#4caf50",
+    "sidebar_width": 280
+}
+
+IO_POLL_MS = 50
+SLIDER_FLUSH_MS = 16  # one frame at 60 fps
+SEARCH_DELAY_MS = 150  # typing pause before the search runs
+INDEX_POLL_MS = 500
+# Children added to the explorer tree at a time; the rest wait behind a "more" row
+EXPLORER_BATCH = 500
+
+def is_on(value):
+    try:
+        return int(value) == 1
+    except (TypeError, ValueError):
+        return False
+
+class VirtualGrid(ctk.CTkFrame):
+    """Scrollable grid that only has widgets for the rows currently on screen.
+
+    make_cell(parent) creates one reusable cell and bind_cell(cell, key, value)
+    points it at an item. Scrolling rebinds the same cells to other items, so
+    a section with thousands of entries costs a screenful of widgets.
+    """
+    def __init__(self, master, make_cell, bind_cell, columns=1, row_height=36, stretch=False):
+        super().__init__(master, corner_radius=0, fg_color="transparent")
+        self.make_cell = make_cell
+        self.bind_cell = bind_cell
+        self.columns = columns
+        self.row_height = row_height
+        self.sticky = "ew" if stretch else "w"
+        self.keys = []
+        self.values = {}
+        self.first_row = 0
+        self.visible_rows = 0
+        self.rows = []
+
+        self.body = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.grid_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        for col in range(columns):
+            self.body.grid_columnconfigure(col, weight=1, uniform="cell")
+
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.body)
+
+    @property
+    def row_count(self):
+        return -(-len(self.keys) // self.columns)
+
+    def set_items(self, items):
+        if list(items) != self.keys:
+            self.keys = list(items)
+            self.first_row = 0
+        self.values = dict(items)
+        self.render()
+
+    def bind_wheel(self, widget):
+        # Plain Tk bindings on every inner widget; the CTk bind() wrappers would bind twice
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tk.Misc.bind(widget, sequence, self.on_wheel, "+")
+        for child in widget.winfo_children():
+            self.bind_wheel(child)
+
+    def on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first_row - 3)
+        else:
+            self.scroll_to(self.first_row + 3)
+
+    def on_resize(self, event):
+        visible = max(1, event.height // self.row_height)
+        if visible == self.visible_rows:
+            return
+        self.visible_rows = visible
+        while len(self.rows) < visible:
+            cells = [self.make_cell(self.body) for _ in range(self.columns)]
+            for cell in cells:
+                self.bind_wheel(cell)
+            self.rows.append(cells)
+        while len(self.rows) > visible:
+            for cell in self.rows.pop():
+                cell.destroy()
+        self.scroll_to(self.first_row)
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.visible_rows if args[2] == "pages" else 1)
+            self.scroll_to(self.first_row + step)
+
+    def scroll_to(self, row):
+        self.first_row = max(0, min(row, self.row_count - self.visible_rows))
+        self.render()
+
+    def render(self):
+        for r, cells in enumerate(self.rows):
+            self.body.grid_rowconfigure(r, minsize=self.row_height)
+            for c, cell in enumerate(cells):
+                i = (self.first_row + r) * self.columns + c
+                if i < len(self.keys):
+                    key = self.keys[i]
+                    self.bind_cell(cell, key, self.values[key])
+                    cell.grid(row=r, column=c, sticky=self.sticky, padx=10, pady=2)
+                else:
+                    cell.grid_remove()
+        total = max(self.row_count, 1)
+        self.scrollbar.set(self.first_row / total, min((self.first_row + self.visible_rows) / total, 1.0))
+
+# Set by the cold-start benchmark: close the window as soon as it has been drawn once
+STARTUP_PROBE = bool(os.environ.get("TDSE_STARTUP_PROBE"))
+
+class App(ctk.CTk):
+    def __init__(self):
+        ctk.set_appearance_mode("Dark")
+        ctk.set_default_color_theme("dark-blue")
+        super().__init__()
+        self.handler = TeardownSaveHandler(cache=SaveCache(), prepare_backup=True)
+        self.watcher = SaveWatcher(self.handler)
+        self.io_busy = False
+        self.io_cancel = threading.Event()
+        self.io_progress = (0, 0)
+        self.io_result = None
+        self.browse_btn = None
+        self.save_btn = None
+        # Pages built for the current save, reused across tab switches
+        self.pages = {}
+        # Slider motion is buffered here and handed to the handler at most once per frame
+        self.slider_pending = {}
+        self.slider_job = None
+        self.slider_moves = 0
+        self.slider_applied = 0
+        # (moves, edits) when the current drag started; a drag is logged once, on release
+        self.drag_mark = (0, 0)
+        # Built in the background after every load, save and reload; searchable while it grows
+        self.search_index = SearchIndex()
+        self.index_cancel = threading.Event()
+        self.index_thread = None
+        
+        self.title("Teardown Save Editor [BETA]")
+        self.geometry("1200x800")
+        self.configure(fg_color=THEME["bg_main"])
+        
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.create_sidebar()
+        self.create_main_area()
+        
+        if STARTUP_PROBE:
+            self.after_idle(self.destroy)
+        else:
+            self.after(200, self.initial_load)
+            self.after(WATCH_POLL_MS, self.poll_watcher)
+            self.after(INDEX_POLL_MS, self.poll_index)
+
+    def open_creator_site(self):
+        webbrowser.open("https://skeleton3595.fun/")
+
+    def create_sidebar(self):
+        self.sidebar = ctk.CTkFrame(self, width=THEME["sidebar_width"], corner_radius=0, fg_color=THEME["bg_sidebar"])
+        self.sidebar.grid(row=0, column=0, sticky="nsew")
+        self.sidebar.grid_propagate(False) 
+        
+        self.logo_label = ctk.CTkLabel(self.sidebar, text="TEARDOWN\nSAVE EDITOR", 
+                                     font=("Impact", 32), text_color=THEME["accent"])
+        self.logo_label.pack(pady=(40, 20), padx=20)
+        
+        self.credits_btn = ctk.CTkButton(self.sidebar, 
+                                         text="Created by: Skeleton3595", 
+                                         command=self.open_creator_site,
+                                         fg_color="transparent",
+                                         hover_color=THEME["bg_main"],
+                                         text_color=THEME["text_gray"],
+                                         font=("Arial", 12))
+        self.credits_btn.pack(pady=(0, 30))
+
+        self.nav_buttons = []
+        self.create_nav_btn("📂  FILE & INFO", self.show_home)
+        self.create_nav_btn("🔫  TOOLS & WEAPONS", self.show_tools)
+        self.create_nav_btn("💎  VALUABLES", self.show_valuables)
+        self.create_nav_btn("👤  CHARACTERS", self.show_chars)
+        self.create_nav_btn("🏆  REWARDS", self.show_rewards)
+        self.create_nav_btn("🗂  REGISTRY EXPLORER", self.show_explorer)
+        
+        self.status_label = ctk.CTkLabel(self.sidebar, text="Waiting...", text_color=THEME["text_gray"], wraplength=THEME["sidebar_width"]-20)
+        self.status_label.pack(side="bottom", pady=20, padx=10)
+        self.edits_label = ctk.CTkLabel(self.sidebar, text="", text_color=THEME["text_gray"], font=("Consolas", 11))
+        self.edits_label.pack(side="bottom", padx=10)
+
+        history_row = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        history_row.pack(side="bottom", fill="x", padx=20, pady=(0, 5))
+        for text, command in (("↶ UNDO", self.undo_edit), ("↷ REDO", self.redo_edit)):
+            ctk.CTkButton(history_row, text=text, command=command, height=28, corner_radius=0, fg_color="#333",
+                          hover_color="#444", font=("Arial", 11, "bold")).pack(side="left", expand=True, fill="x", padx=2)
+        for sequence, command in (("<Control-z>", self.undo_edit), ("<Control-Z>", self.undo_edit),
+                                  ("<Control-y>", self.redo_edit), ("<Control-Y>", self.redo_edit)):
+            self.bind_all(sequence, lambda e, c=command: None if isinstance(e.widget, tk.Entry) else c())
+
+        # Shown only while a load or save runs in the background
+        self.io_frame = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        self.io_bar = ctk.CTkProgressBar(self.io_frame, corner_radius=0, progress_color=THEME["accent"])
+        self.io_bar.pack(fill="x", padx=20, pady=(0, 5))
+        self.io_cancel_btn = ctk.CTkButton(self.io_frame, text="CANCEL", command=self.io_cancel.set,
+                                           height=28, corner_radius=0, fg_color=THEME["danger"],
+                                           hover_color=THEME["danger_hover"], font=("Arial", 11, "bold"))
+
+    def create_nav_btn(self, text, command):
+        btn = ctk.CTkButton(self.sidebar, text=text, command=command,
+                            corner_radius=0, height=50, fg_color="transparent", 
+                            text_color=THEME["text"], anchor="w", font=("Arial", 12, "bold"),
+                            hover_color=THEME["bg_main"])
+        btn.pack(fill="x", padx=0, pady=2)
+        self.nav_buttons.append(btn)
+
+    def create_main_area(self):
+        self.main_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
+        self.main_frame.grid(row=0, column=1, sticky="nsew", padx=30, pady=30)
+
+    def clear_main_area(self):
+        # Cached pages are only hidden; everything else is rebuilt on demand
+        cached = set(self.pages.values())
+        for widget in self.main_frame.winfo_children():
+            if widget in cached:
+                widget.pack_forget()
+            else:
+                widget.destroy()
+
+    def check_loaded(self):
+        if self.handler.root is None:
+            self.clear_main_area()
+            ctk.CTkLabel(self.main_frame, text="⚠ NO FILE LOADED", font=("Impact", 40), text_color=THEME["danger"]).pack(pady=50)
+            ctk.CTkLabel(self.main_frame, text="Please go to 'FILE & INFO' and load savegame.xml", font=("Arial", 16)).pack()
+            return False
+        return True
+
+    # --- PAGES ---
+
+    def show_home(self):
+        self.clear_main_area()
+        logging.info("Switched to Home Tab")
+        
+        title = ctk.CTkLabel(self.main_frame, text="FILE SETTINGS", font=("Impact", 30), text_color=THEME["accent"])
+        title.pack(anchor="w", pady=(0, 30))
+
+        path_group = ctk.CTkFrame(self.main_frame, fg_color=THEME["bg_sidebar"], corner_radius=0)
+        path_group.pack(fill="x", pady=10)
+        
+        ctk.CTkLabel(path_group, text="File Path:", font=("Arial", 12, "bold"), text_color=THEME["text_gray"]).pack(anchor="w", padx=15, pady=(10,0))
+        
+        input_frame = ctk.CTkFrame(path_group, fg_color="transparent")
+        input_frame.pack(fill="x", padx=10, pady=10)
+
+        self.path_entry = ctk.CTkEntry(input_frame, corner_radius=0, height=40, font=("Consolas", 12))
+        self.path_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        if self.handler.filepath:
+            self.path_entry.insert(0, self.handler.filepath)
+
+        self.browse_btn = ctk.CTkButton(input_frame, text="BROWSE", command=self.browse_file, width=100, height=40,
+                                        corner_radius=0, fg_color=THEME["accent"], text_color="black", hover_color=THEME["accent_hover"])
+        self.browse_btn.pack(side="right")
+
+        ver_group = ctk.CTkFrame(self.main_frame, fg_color=THEME["bg_sidebar"], corner_radius=0)
+        ver_group.pack(fill="x", pady=10)
+
+        ctk.CTkLabel(ver_group, text="Registry Version:", font=("Arial", 12, "bold"), text_color=THEME["text_gray"]).pack(anchor="w", padx=15, pady=(10,0))
+        
+        ver_input_frame = ctk.CTkFrame(ver_group, fg_color="transparent")
+        ver_input_frame.pack(fill="x", padx=10, pady=10)
+        
+        self.ver_entry = ctk.CTkEntry(ver_input_frame, width=150, height=40, corner_radius=0, font=("Consolas", 14))
+        self.ver_entry.pack(side="left")
+        if self.handler.version:
+            self.ver_entry.insert(0, self.handler.version)
+            
+        ctk.CTkLabel(ver_input_frame, text="* Only change this if you know what you are doing", text_color=THEME["text_gray"]).pack(side="left", padx=20)
+
+        store = self.handler.snapshots()
+        snapshots = store.list() if store else []
+        if snapshots:
+            snap_group = ctk.CTkFrame(self.main_frame, fg_color=THEME["bg_sidebar"], corner_radius=0)
+            snap_group.pack(fill="x", pady=10)
+            ctk.CTkLabel(snap_group, text="Backups:", font=("Arial", 12, "bold"), text_color=THEME["text_gray"]).pack(anchor="w", padx=15, pady=(10,0))
+
+            snap_frame = ctk.CTkFrame(snap_group, fg_color="transparent")
+            snap_frame.pack(fill="x", padx=10, pady=10)
+            choices = {f"{h['id']}  {h['label']}  ({h['size'] / 1048576:.1f} MB)": h["id"] for h in reversed(snapshots)}
+            snap_menu = ctk.CTkOptionMenu(snap_frame, values=list(choices), width=420, height=40, corner_radius=0,
+                                          font=("Consolas", 12), fg_color="#333", button_color="#444")
+            snap_menu.pack(side="left")
+            ctk.CTkButton(snap_frame, text="RESTORE", width=100, height=40, corner_radius=0,
+                          fg_color=THEME["danger"], hover_color=THEME["danger_hover"],
+                          command=lambda: self.restore_snapshot(choices[snap_menu.get()])).pack(side="left", padx=10)
+
+        btn_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        btn_frame.pack(side="bottom", fill="x", pady=20)
+
+        self.save_btn = ctk.CTkButton(btn_frame, text="💾 SAVE CHANGES", command=self.save_all,
+                                      height=60, corner_radius=0, font=("Impact", 20),
+                                      fg_color=THEME["accent"], text_color="black", hover_color=THEME["accent_hover"])
+        self.save_btn.pack(fill="x")
+
+    def show_page(self, page):
+        self.clear_main_area()
+        page.pack(fill="both", expand=True)
+
+    def drop_pages(self):
+        # Cached pages belong to the previously loaded save
+        for page in self.pages.values():
+            page.destroy()
+        self.pages = {}
+
+    def build_page_head(self, page, title, button_text, command, danger=False):
+        head = ctk.CTkFrame(page, fg_color="transparent")
+        head.pack(fill="x", pady=(0, 20 if danger else 10))
+        ctk.CTkLabel(head, text=title, font=("Impact", 30), text_color=THEME["accent"]).pack(side="left")
+        if danger:
+            colors = {"fg_color": THEME["danger"], "hover_color": THEME["danger_hover"], "text_color": "white"}
+        else:
+            colors = {"fg_color": THEME["accent"], "text_color": "black"}
+        ctk.CTkButton(head, text=button_text, command=command, corner_radius=0,
+                      font=("Arial", 12, "bold"), **colors).pack(side="right")
+
+    def show_tools(self):
+        if not self.check_loaded(): return
+        logging.info("Switched to Tools Tab")
+        page = self.pages.get('tool')
+        tools_data = self.handler.get_tools_data()
+        if page is None or list(page.shown_tools) != list(tools_data):
+            if page is not None:
+                page.destroy()
+            page = self.build_tools_page(tools_data)
+            self.pages['tool'] = page
+        else:
+            self.refresh_tools(tools_data)
+        self.show_page(page)
+
+    def build_tools_page(self, tools_data):
+        page = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        self.build_page_head(page, "TOOLS & WEAPONS", "RESET ALL TO DEFAULTS", self.reset_all_tools, danger=True)
+
+        bulk_row = ctk.CTkFrame(page, fg_color="transparent")
+        bulk_row.pack(fill="x", pady=(0, 10))
+        ctk.CTkLabel(bulk_row, text="Scale all values by", font=("Arial", 12)).pack(side="left", padx=(5, 10))
+        factor = ctk.CTkEntry(bulk_row, width=70, corner_radius=0, font=("Consolas", 12))
+        factor.insert(0, "2")
+        factor.pack(side="left")
+        ctk.CTkButton(bulk_row, text="SCALE", width=80, corner_radius=0, fg_color="#555", hover_color="#666",
+                      font=("Arial", 11, "bold"), command=lambda: self.scale_tools(factor.get())).pack(side="left", padx=10)
+        ctk.CTkButton(bulk_row, text="CLAMP TO SLIDER LIMITS", corner_radius=0, fg_color="#555", hover_color="#666",
+                      font=("Arial", 11, "bold"), command=lambda: self.transform_tools(lambda table: table.clamp())
+                      ).pack(side="left")
+
+        scroll = ctk.CTkScrollableFrame(page, corner_radius=0, fg_color="transparent")
+        scroll.pack(fill="both", expand=True)
+
+        # (tool, key) -> function that pushes a new value into the widgets
+        page.setters = {}
+        page.shown = {}
+        page.shown_tools = dict.fromkeys(tools_data)
+        
+        for tool_name, params in tools_data.items():
+            card = ctk.CTkFrame(scroll, fg_color=THEME["bg_sidebar"], corner_radius=0)
+            card.pack(fill="x", pady=5, padx=5)
+            
+            top = ctk.CTkFrame(card, fg_color="#333", corner_radius=0, height=40)
+            top.pack(fill="x")
+            
+            ctk.CTkLabel(top, text=tool_name, font=("Consolas", 14, "bold"), text_color="white").pack(side="left", padx=10)
+            
+            if tool_name in TOOL_DEFAULTS:
+                ctk.CTkButton(top, text="RESET DEFAULT", width=100, height=24, corner_radius=0,
+                              fg_color="#555", hover_color="#666", font=("Arial", 10),
+                              command=lambda t=tool_name: self.reset_tool_to_default(t)).pack(side="right", padx=10, pady=5)
+
+            if 'enabled' in params:
+                sw = ctk.CTkSwitch(top, text="ENABLED", progress_color=THEME["accent"], corner_radius=0, text_color="white", font=("Arial", 10, "bold"))
+                sw.configure(command=lambda t=tool_name, v=sw: self.toggle_tool(t, v))
+                sw.pack(side="right", padx=10, pady=5)
+                page.setters[(tool_name, 'enabled')] = lambda value, v=sw: v.select() if is_on(value) else v.deselect()
+
+            sliders_frame = ctk.CTkFrame(card, fg_color="transparent")
+            sliders_frame.pack(fill="x", padx=10, pady=10)
+            
+            grid_row = 0
+            for key, max_val in TOOL_LIMITS.items():
+                if key in params and key != 'enabled':
+                    
+                    lbl = ctk.CTkLabel(sliders_frame, text=key, width=120, anchor="w", font=("Consolas", 12))
+                    lbl.grid(row=grid_row, column=0, padx=5, pady=2)
+                    
+                    slider = ctk.CTkSlider(sliders_frame, from_=0, to=max_val, number_of_steps=max_val, 
+                                           progress_color=THEME["accent"], button_color="white", button_hover_color=THEME["accent"])
+                    slider.grid(row=grid_row, column=1, sticky="ew", padx=10, pady=2)
+                    
+                    slider.configure(command=lambda v, t=tool_name, k=key, l=lbl: self.on_slider_change(t, k, v, l))
+                    slider.bind("<ButtonRelease-1>", lambda e: self.end_slider_drag())
+                    page.setters[(tool_name, key)] = lambda value, s=slider, l=lbl, k=key: (
+                        s.set(int(value)), l.configure(text=f"{k}: {int(value)}"))
+                    grid_row += 1
+            
+            sliders_frame.grid_columnconfigure(1, weight=1)
+
+        self.refresh_tools(tools_data, page)
+        return page
+
+    def refresh_tools(self, tools_data=None, page=None):
+        """Pushes changed tool values into the cached tools page; untouched widgets are left alone."""
+        page = page or self.pages.get('tool')
+        if page is None:
+            return
+        if tools_data is None:
+            tools_data = self.handler.get_tools_data()
+        for tool_name, params in tools_data.items():
+            for key, value in params.items():
+                setter = page.setters.get((tool_name, key))
+                if setter is not None and page.shown.get((tool_name, key)) != value:
+                    setter(value)
+                    page.shown[(tool_name, key)] = value
+
+    def show_section_page(self, section, title, columns, label, switches=False):
+        if not self.check_loaded(): return
+        logging.info(f"Switched to {title.title()} Tab")
+        page = self.pages.get(section)
+        if page is None:
+            page = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+            self.build_page_head(page, title, "UNLOCK ALL", lambda: self.batch_unlock(section))
+
+            def toggle(cell):
+                if self.io_blocked():
+                    # The switch has already flipped; show the value the save still has
+                    bind_cell(cell, cell.key, page.grid_view.values[cell.key])
+                    return
+                value = cell.toggle.get()
+                self.handler.update_value(section, cell.key, 'self', value)
+                page.grid_view.values[cell.key] = str(value)
+
+            if switches:
+                def make_cell(parent):
+                    cell = ctk.CTkFrame(parent, fg_color=THEME["bg_sidebar"], corner_radius=0)
+                    cell.label = ctk.CTkLabel(cell, text="", font=("Consolas", 14))
+                    cell.label.pack(side="left", padx=15, pady=10)
+                    cell.toggle = ctk.CTkSwitch(cell, text="Unlocked", progress_color=THEME["accent"], corner_radius=0,
+                                                command=lambda: toggle(cell))
+                    cell.toggle.pack(side="right", padx=15)
+                    return cell
+            else:
+                def make_cell(parent):
+                    cell = ctk.CTkCheckBox(parent, text="", corner_radius=0, font=("Consolas", 12),
+                                           fg_color=THEME["accent"], hover_color=THEME["accent_hover"], checkmark_color="black",
+                                           command=lambda: toggle(cell))
+                    cell.label = cell.toggle = cell
+                    return cell
+
+            def bind_cell(cell, key, value):
+                cell.key = key
+                cell.label.configure(text=label(key))
+                if is_on(value):
+                    cell.toggle.select()
+                else:
+                    cell.toggle.deselect()
+
+            page.grid_view = VirtualGrid(page, make_cell, bind_cell, columns=columns,
+                                         row_height=48 if switches else 36, stretch=switches)
+            page.grid_view.pack(fill="both", expand=True)
+            self.pages[section] = page
+
+        page.grid_view.set_items(self.handler.get_node_dict(section))
+        self.show_page(page)
+
+    def show_valuables(self):
+        self.show_section_page('valuable', "VALUABLES", 3, lambda item: item)
+
+    def show_chars(self):
+        self.show_section_page('characters', "CHARACTERS", 1, lambda item: item, switches=True)
+
+    def show_rewards(self):
+        self.show_section_page('reward', "REWARDS", 4, lambda item: f"Rank {item}")
+
+    # --- REGISTRY EXPLORER ---
+
+    def show_explorer(self):
+        if not self.check_loaded(): return
+        logging.info("Switched to Explorer Tab")
+        page = self.pages.get('explorer')
+        if page is None:
+            page = self.build_explorer_page()
+            self.pages['explorer'] = page
+        self.show_page(page)
+
+    def build_explorer_page(self):
+        page = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        self.build_page_head(page, "REGISTRY EXPLORER", "COLLAPSE ALL", lambda: self.reset_explorer(page))
+        page.search_job = None
+        page.shown_size = None
+
+        search_row = ctk.CTkFrame(page, fg_color="transparent")
+        search_row.pack(fill="x", pady=(0, 10))
+        page.search_entry = ctk.CTkEntry(search_row, corner_radius=0, height=36, font=("Consolas", 12),
+                                         placeholder_text="Search keys and values, e.g. rifle.ammo or mod.steam.score")
+        page.search_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        page.search_entry.bind("<KeyRelease>", lambda e: self.schedule_search(page))
+        page.search_status = ctk.CTkLabel(search_row, text="", width=220, anchor="e", text_color=THEME["text_gray"])
+        page.search_status.pack(side="right")
+
+        bulk_row = ctk.CTkFrame(page, fg_color="transparent")
+        bulk_row.pack(fill="x", pady=(0, 10))
+        page.bulk_entry = ctk.CTkEntry(bulk_row, corner_radius=0, height=36, font=("Consolas", 12),
+                                       placeholder_text="Bulk edit, e.g. tool.*.ammo = max(ammo * 2, 500); valuable.* = 1")
+        page.bulk_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        page.bulk_entry.bind("<Return>", lambda e: self.run_bulk_edit(page))
+        ctk.CTkButton(bulk_row, text="APPLY TO ALL", width=220, height=36, corner_radius=0, fg_color=THEME["accent"],
+                      text_color="black", hover_color=THEME["accent_hover"], font=("Arial", 12, "bold"),
+                      command=lambda: self.run_bulk_edit(page)).pack(side="right")
+
+        style = ttk.Style(page)
+        style.configure("Explorer.Treeview", background=THEME["bg_sidebar"], fieldbackground=THEME["bg_sidebar"],
+                        foreground=THEME["text"], rowheight=24, font=("Consolas", 11), borderwidth=0)
+        style.configure("Explorer.Treeview.Heading", background="#333", foreground=THEME["text"],
+                        font=("Arial", 10, "bold"), relief="flat")
+        style.map("Explorer.Treeview", background=[("selected", THEME["accent"])], foreground=[("selected", "black")])
+
+        body = ctk.CTkFrame(page, fg_color="transparent")
+        body.pack(fill="both", expand=True)
+        page.tree = ttk.Treeview(body, style="Explorer.Treeview", columns=("value",))
+        page.tree.heading("#0", text="Key", anchor="w")
+        page.tree.heading("value", text="Value", anchor="w")
+        page.tree.column("value", width=260, stretch=False)
+        page.tree.bind("<<TreeviewOpen>>", lambda e: self.on_explorer_open(page))
+        page.tree.bind("<<TreeviewSelect>>", lambda e: self.on_explorer_select(page))
+        page.results = ttk.Treeview(body, style="Explorer.Treeview", columns=("value",), show="tree headings")
+        page.results.heading("#0", text="Path", anchor="w")
+        page.results.heading("value", text="Value", anchor="w")
+        page.results.column("value", width=260, stretch=False)
+        page.results.bind("<Double-1>", lambda e: self.reveal_result(page))
+        page.results.bind("<Return>", lambda e: self.reveal_result(page))
+        page.scrollbar = ctk.CTkScrollbar(body)
+        page.scrollbar.pack(side="right", fill="y")
+        for view in (page.tree, page.results):
+            view.configure(yscrollcommand=page.scrollbar.set)
+        self.show_explorer_view(page, page.tree)
+
+        edit_row = ctk.CTkFrame(page, fg_color=THEME["bg_sidebar"], corner_radius=0)
+        edit_row.pack(fill="x", pady=(10, 0))
+        page.edit_path = ctk.CTkLabel(edit_row, text="Select a key to edit its value", anchor="w",
+                                      font=("Consolas", 12), text_color=THEME["text_gray"])
+        page.edit_path.pack(side="left", fill="x", expand=True, padx=15, pady=10)
+        ctk.CTkButton(edit_row, text="SET", width=80, height=32, corner_radius=0, fg_color=THEME["accent"],
+                      text_color="black", hover_color=THEME["accent_hover"], font=("Arial", 12, "bold"),
+                      command=lambda: self.set_explorer_value(page)).pack(side="right", padx=10)
+        page.edit_value = ctk.CTkEntry(edit_row, width=260, height=32, corner_radius=0, font=("Consolas", 12))
+        page.edit_value.pack(side="right")
+        page.edit_value.bind("<Return>", lambda e: self.set_explorer_value(page))
+        page.selected = None
+
+        self.reset_explorer(page)
+        return page
+
+    def show_explorer_view(self, page, view):
+        other = page.results if view is page.tree else page.tree
+        other.pack_forget()
+        view.pack(side="left", fill="both", expand=True)
+        page.scrollbar.configure(command=view.yview)
+
+    def reset_explorer(self, page):
+        """Collapses the tree back to the sections, forgetting the children read so far."""
+        page.tree.delete(*page.tree.get_children())
+        page.children = {}
+        page.loaded = {}
+        self.load_explorer_children(page, "savegame")
+
+    def load_explorer_children(self, page, path, upto=0):
+        """Adds the next EXPLORER_BATCH children of path to the tree, or as many as needed to show child number upto."""
+        tree = page.tree
+        children = page.children.get(path)
+        if children is None:
+            try:
+                children = page.children[path] = self.handler.get_children(path)
+            except (KeyError, ValueError) as e:
+                page.search_status.configure(text=f"Cannot read {path}: {e}")
+                return False
+        parent = "" if path == "savegame" else path
+        more = path + "\tmore"
+        if tree.exists(more):
+            tree.delete(more)
+        start = page.loaded.get(path, 0)
+        stop = start + EXPLORER_BATCH
+        rows = children[start:stop]
+        if upto >= stop:
+            # Far down a long list: that one child is shown ahead of the batches before it
+            rows = [children[upto]]
+            stop = start
+        for name, value, has_children in rows:
+            iid = f"{path}.{name}"
+            if tree.exists(iid):
+                continue
+            tree.insert(parent, "end", iid=iid, text=name, values=("" if value is None else value,))
+            if has_children:
+                tree.insert(iid, "end", iid=iid + "\tload", text="...")
+        page.loaded[path] = min(stop, len(children))
+        if stop < len(children):
+            tree.insert(parent, "end", iid=more, text=f"... {len(children) - stop} more (select to show)")
+        return True
+
+    def on_explorer_open(self, page):
+        iid = page.tree.focus()
+        if page.tree.exists(iid + "\tload"):
+            if self.io_busy:
+                page.tree.item(iid, open=False)
+                return
+            page.tree.delete(iid + "\tload")
+            self.load_explorer_children(page, iid)
+
+    def on_explorer_select(self, page):
+        selection = page.tree.selection()
+        if not selection:
+            return
+        iid = selection[0]
+        if iid.endswith("\tmore"):
+            self.load_explorer_children(page, iid[:-len("\tmore")])
+            return
+        if iid.endswith("\tload"):
+            return
+        page.selected = iid
+        page.edit_path.configure(text=iid, text_color=THEME["text"])
+        page.edit_value.delete(0, "end")
+        page.edit_value.insert(0, page.tree.set(iid, "value"))
+
+    def reveal_path(self, page, path):
+        """Expands the tree down to path and selects it."""
+        parts = path.split('.')
+        for depth in range(1, len(parts)):
+            parent = ".".join(parts[:depth])
+            if parent != "savegame":
+                if page.tree.exists(parent + "\tload"):
+                    page.tree.delete(parent + "\tload")
+                page.tree.item(parent, open=True)
+            child = f"{parent}.{parts[depth]}"
+            if not page.tree.exists(child):
+                if parent not in page.children and not self.load_explorer_children(page, parent):
+                    return False
+            if not page.tree.exists(child):
+                names = [name for name, _, _ in page.children[parent]]
+                if parts[depth] not in names:
+                    page.search_status.configure(text=f"{path} is gone, the save changed since indexing")
+                    return False
+                self.load_explorer_children(page, parent, names.index(parts[depth]))
+        page.tree.selection_set(path)
+        page.tree.focus(path)
+        page.tree.see(path)
+        return True
+
+    def reveal_result(self, page):
+        selection = page.results.selection()
+        if not selection:
+            return
+        self.show_explorer_view(page, page.tree)
+        self.reveal_path(page, selection[0])
+
+    def schedule_search(self, page):
+        if page.search_job is not None:
+            self.after_cancel(page.search_job)
+        page.search_job = self.after(SEARCH_DELAY_MS, lambda: self.run_search(page))
+
+    def run_search(self, page):
+        page.search_job = None
+        query = page.search_entry.get().strip()
+        if not query:
+            self.show_explorer_view(page, page.tree)
+            page.shown_size = None
+            self.update_index_status(page)
+            return
+        results, more = self.search_index.search(query)
+        page.shown_size = self.search_index.size
+        page.results.delete(*page.results.get_children())
+        for path, value in results:
+            page.results.insert("", "end", iid=path, text=path, values=("" if value is None else value,))
+        self.show_explorer_view(page, page.results)
+        self.update_index_status(page, f"{len(results)}{'+' if more else ''} matches")
+
+    def set_explorer_value(self, page):
+        path = page.selected
+        if path is None or self.io_blocked():
+            return
+        value = page.edit_value.get()
+        try:
+            changed = self.handler.set_path_value(path, value)
+        except (KeyError, ValueError) as e:
+            messagebox.showerror("Edit Error", f"Could not set {path}:\n{e}")
+            return
+        if not changed:
+            return
+        if page.tree.exists(path):
+            page.tree.set(path, "value", value)
+        self.edits_label.configure(text=f"{self.handler.pending_edits} unsaved edits")
+        # The same value may be on one of the section pages
+        section = path.split('.')[1]
+        if section == 'tool':
+            self.refresh_tools()
+        elif hasattr(self.pages.get(section), "grid_view"):
+            self.pages[section].grid_view.set_items(self.handler.get_node_dict(section))
+
+    def run_bulk_edit(self, page):
+        text = page.bulk_entry.get().strip()
+        if not text or self.io_blocked():
+            return
+        try:
+            program = compile_program(text)
+        except ExprError as e:
+            messagebox.showerror("Bulk Edit Error", str(e))
+            return
+        self.flush_slider_edits()
+
+        def work(progress, cancel):
+            # Sections kept raw are parsed on the way, which is why this runs off the Tk thread
+            return apply_program(self.handler, program)
+
+        def done(result):
+            if isinstance(result, Exception):
+                messagebox.showerror("Bulk Edit Error", str(result))
+                self.status_label.configure(text="Bulk edit failed")
+                return
+            matched, changed, sections = result
+            self.refresh_sections(sections)
+            self.edits_label.configure(text=f"{self.handler.pending_edits} unsaved edits")
+            self.status_label.configure(text=f"Bulk edit: {changed} of {matched} values changed")
+
+        self.run_io("Editing", work, done)
+
+    # --- SEARCH INDEX ---
+
+    def start_indexing(self):
+        """Indexes the sections that changed since the last run, on a worker thread."""
+        if self.handler.root is None:
+            return
+        self.index_cancel.set()
+        cancel = self.index_cancel = threading.Event()
+        args = SearchIndex.sources(self.handler) + (cancel,)
+        self.index_thread = threading.Thread(target=self.search_index.refresh, args=args, daemon=True)
+        self.index_thread.start()
+
+    def update_index_status(self, page, prefix=""):
+        if self.index_thread is not None and self.index_thread.is_alive():
+            done, total = self.search_index.progress
+            state = f"indexing {done / total:.0%}" if total else "indexing"
+        else:
+            state = f"{self.search_index.size:,} keys"
+        page.search_status.configure(text=f"{prefix} ({state})" if prefix else state)
+
+    def poll_index(self):
+        page = self.pages.get('explorer')
+        if page is not None and page.winfo_exists():
+            if page.shown_size is not None and page.shown_size != self.search_index.size:
+                # More of the save became searchable since these results were shown
+                self.run_search(page)
+            elif page.search_job is None and page.shown_size is None:
+                self.update_index_status(page)
+        self.after(INDEX_POLL_MS, self.poll_index)
+
+    # --- BACKGROUND I/O ---
+
+    def run_io(self, title, work, on_done, cancellable=False):
+        """Runs work(progress, cancel) on a worker thread and passes its result to on_done on the Tk thread."""
+        self.io_busy = True
+        self.io_title = title
+        self.io_progress = (0, 0)
+        self.io_result = None
+        self.io_cancel.clear()
+        self.set_busy(True, cancellable)
+
+        def progress(done, total):
+            self.io_progress = (done, total)
+
+        def worker():
+            try:
+                result = work(progress, self.io_cancel)
+            except Exception as e:
+                logging.error(f"{title} failed: {e}")
+                result = e
+            self.io_result = (result,)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(IO_POLL_MS, self.poll_io, on_done)
+
+    def poll_io(self, on_done):
+        done, total = self.io_progress
+        if total:
+            self.io_bar.set(min(done / total, 1.0))
+            self.status_label.configure(text=f"{self.io_title}... {done / 1048576:.1f} / {total / 1048576:.1f} MB")
+        if self.io_result is None:
+            self.after(IO_POLL_MS, self.poll_io, on_done)
+            return
+
+        result = self.io_result[0]
+        self.io_busy = False
+        self.set_busy(False)
+        on_done(result)
+        # Slider moves made meanwhile were held back, not dropped
+        self.flush_slider_edits()
+
+    def io_blocked(self):
+        """True, with a note in the status bar, while a worker owns the handler; every edit and file action checks it."""
+        if not self.io_busy:
+            return False
+        self.status_label.configure(text=f"{self.io_title} in progress, try again when it is done")
+        return True
+
+    def set_busy(self, busy, cancellable=False):
+        # Nothing that reads or edits the tree may run while the worker owns it; the
+        # widgets of the pages stay live, so their callbacks check io_blocked() instead
+        state = "disabled" if busy else "normal"
+        for widget in self.nav_buttons + [self.browse_btn, self.save_btn]:
+            if widget is not None and widget.winfo_exists():
+                widget.configure(state=state)
+        if busy:
+            self.io_bar.set(0)
+            self.io_frame.pack(side="bottom", fill="x")
+            if cancellable:
+                self.io_cancel_btn.pack(padx=20, pady=(0, 5))
+        else:
+            self.io_cancel_btn.pack_forget()
+            self.io_frame.pack_forget()
+
+    def start_load(self, path, announce=False):
+        self.clear_main_area()
+        ctk.CTkLabel(self.main_frame, text="LOADING...", font=("Impact", 40), text_color=THEME["accent"]).pack(pady=50)
+        ctk.CTkLabel(self.main_frame, text=path, font=("Consolas", 12), text_color=THEME["text_gray"]).pack()
+
+        self.discard_slider_edits()
+
+        def work(progress, cancel):
+            return self.handler.load_file(path, progress=progress, cancel=cancel)
+
+        def done(ok):
+            if ok is True:
+                self.drop_pages()
+            self.show_home()
+            if ok is True:
+                self.start_indexing()
+                self.status_label.configure(text=f"Loaded: {os.path.basename(path)}")
+                if announce:
+                    messagebox.showinfo("Success", "Savegame loaded successfully!")
+            elif self.io_cancel.is_set():
+                self.status_label.configure(text="Load cancelled")
+            else:
+                self.status_label.configure(text="Load Error")
+                error = ok if isinstance(ok, Exception) else self.handler.last_error
+                messagebox.showerror("Load Error", f"Failed to parse XML.\nError: {error}")
+
+        self.run_io("Loading", work, done, cancellable=True)
+
+    # --- WATCHING THE SAVE ---
+
+    def poll_watcher(self):
+        # The game rewrites the save while it runs; pull that in instead of editing a stale copy.
+        # The poll is one stat on the Tk thread; only an actual change takes the handler to the worker.
+        self.after(WATCH_POLL_MS, self.poll_watcher)
+        if self.io_busy or not self.watcher.poll():
+            return
+        self.flush_slider_edits()
+
+        def work(progress, cancel):
+            return self.watcher.reload(progress)
+
+        def done(report):
+            if isinstance(report, dict):
+                self.apply_reload(report)
+
+        self.run_io("Reloading", work, done)
+
+    def apply_reload(self, report):
+        changed = report["reloaded"] + report["removed"]
+        self.start_indexing()
+        explorer = self.pages.get('explorer')
+        if explorer is not None:
+            self.reset_explorer(explorer)
+        for section in changed:
+            page = self.pages.get(section)
+            if page is None or section == 'explorer':
+                continue
+            if section == 'tool':
+                tools_data = self.handler.get_tools_data()
+                if list(page.shown_tools) == list(tools_data):
+                    self.refresh_tools(tools_data)
+                else:
+                    visible = page.winfo_ismapped()
+                    page.destroy()
+                    del self.pages['tool']
+                    if visible:
+                        self.show_tools()
+            else:
+                page.grid_view.set_items(self.handler.get_node_dict(section))
+
+        status = f"Game updated the save ({', '.join(changed) or 'other data'})"
+        if report["history_dropped"]:
+            status += f"; {report['history_dropped']} undo steps for those sections were discarded"
+        self.status_label.configure(text=status)
+        conflicts = report["conflicts"]
+        if conflicts:
+            lines = [f"{path}: game {disk if disk is not None else '(removed)'}, yours {mine}"
+                     for path, _, disk, mine in conflicts[:15]]
+            if len(conflicts) > 15:
+                lines.append(f"... and {len(conflicts) - 15} more")
+            messagebox.showwarning("Save Changed By The Game",
+                                   "Teardown changed values you have edited. Your values are kept and will "
+                                   "overwrite the game's when you save:\n\n" + "\n".join(lines))
+
+    # --- UNDO / REDO ---
+
+    def undo_edit(self):
+        self.step_history(self.handler.undo, "Undone", "Nothing to undo")
+
+    def redo_edit(self):
+        self.step_history(self.handler.redo, "Redone", "Nothing to redo")
+
+    def step_history(self, step, done_text, empty_text):
+        if self.handler.root is None or self.io_blocked():
+            return
+        self.flush_slider_edits()
+        result = step()
+        if result is None:
+            self.status_label.configure(text=empty_text)
+            return
+        label, sections = result
+        self.refresh_sections(sections)
+        self.status_label.configure(text=f"{done_text}: {label}")
+        self.edits_label.configure(text=f"{self.handler.pending_edits} unsaved edits")
+
+    def refresh_sections(self, sections):
+        """Shows the current values of sections on every page built for them."""
+        if 'tool' in sections:
+            self.refresh_tools()
+        for section in sections:
+            page = self.pages.get(section)
+            if hasattr(page, "grid_view"):
+                page.grid_view.set_items(self.handler.get_node_dict(section))
+        explorer = self.pages.get('explorer')
+        if explorer is None:
+            return
+        for path in list(explorer.children):
+            if path == "savegame" or path.split('.')[1] not in sections:
+                continue
+            children = explorer.children[path] = self.handler.get_children(path)
+            for name, value, _ in children[:explorer.loaded.get(path, 0)]:
+                iid = f"{path}.{name}"
+                if explorer.tree.exists(iid):
+                    explorer.tree.set(iid, "value", "" if value is None else value)
+        if explorer.selected is not None and explorer.tree.exists(explorer.selected):
+            explorer.edit_value.delete(0, "end")
+            explorer.edit_value.insert(0, explorer.tree.set(explorer.selected, "value"))
+
+    # --- LOGIC ---
+
+    def initial_load(self):
+        path = self.handler.find_default_path()
+        if path:
+            self.status_label.configure(text=f"Auto: {os.path.basename(path)}")
+            self.start_load(path)
+        else:
+            self.status_label.configure(text="File not found automatically")
+            self.show_home()
+
+    def browse_file(self):
+        if self.io_blocked(): return
+        filename = filedialog.askopenfilename(filetypes=[("XML Files", "*.xml"), ("All Files", "*.*")])
+        if filename:
+            self.start_load(filename, announce=True)
+
+    def on_slider_change(self, tool, key, value, label):
+        val = int(value)
+        label.configure(text=f"{key}: {val}")
+        self.pages['tool'].shown[(tool, key)] = str(val)
+        self.slider_pending[(tool, key)] = val
+        self.slider_moves += 1
+        if self.slider_job is None:
+            self.slider_job = self.after(SLIDER_FLUSH_MS, self.flush_slider_edits)
+
+    def flush_slider_edits(self):
+        """Applies the latest value of every slider moved since the last frame."""
+        if self.slider_job is not None:
+            self.after_cancel(self.slider_job)
+            self.slider_job = None
+        if not self.slider_pending or self.io_busy:
+            return
+        edits = [(tool, key, val) for (tool, key), val in self.slider_pending.items()]
+        self.slider_pending.clear()
+        # Up to one batch per frame while dragging, so only end_slider_drag logs at INFO
+        self.slider_applied += self.handler.update_values('tool', edits, quiet=True)
+        self.edits_label.configure(text=f"{self.slider_moves} moves -> {self.slider_applied} edits "
+                                        f"({self.handler.pending_edits} unsaved)")
+
+    def end_slider_drag(self):
+        self.flush_slider_edits()
+        moves, applied = self.slider_moves - self.drag_mark[0], self.slider_applied - self.drag_mark[1]
+        if moves:
+            logging.info("UPDATE tool: slider drag, %d move(s) -> %d value(s) changed", moves, applied)
+        self.drag_mark = (self.slider_moves, self.slider_applied)
+
+    def discard_slider_edits(self):
+        if self.slider_job is not None:
+            self.after_cancel(self.slider_job)
+            self.slider_job = None
+        self.slider_pending.clear()
+        self.slider_moves = self.slider_applied = 0
+        self.drag_mark = (0, 0)
+        self.edits_label.configure(text="")
+
+    def toggle_tool(self, tool_name, switch):
+        if self.io_blocked():
+            # The switch has already flipped; flip it back without calling this again
+            switch.deselect() if switch.get() else switch.select()
+            return
+        self.handler.update_value('tool', tool_name, 'enabled', switch.get())
+
+    def reset_tool_to_default(self, tool_name):
+        if self.io_blocked(): return
+        logging.info(f"Resetting {tool_name} to defaults")
+        self.flush_slider_edits()
+        if self.handler.reset_tool(tool_name):
+            self.refresh_tools()
+        else:
+            messagebox.showwarning("Unknown Tool", f"No default values known for '{tool_name}'")
+
+    def reset_all_tools(self):
+        if self.io_blocked(): return
+        if not messagebox.askyesno("Confirm Reset", "Are you sure you want to reset ALL tools to default values?"):
+            return
+
+        logging.warning("RESETTING ALL TOOLS TO DEFAULTS")
+        self.flush_slider_edits()
+        self.handler.reset_all_tools()
+
+        self.refresh_tools()
+        messagebox.showinfo("Reset Complete", "All tools have been reset to defaults.")
+
+    def scale_tools(self, factor_text):
+        if self.io_blocked(): return
+        try:
+            factor = float(factor_text)
+        except ValueError:
+            messagebox.showerror("Scale", f"'{factor_text}' is not a number")
+            return
+
+        def change(table):
+            table.scale(factor, columns=[name for name in table.columns if name != 'enabled'])
+            table.clamp()
+        self.transform_tools(change)
+
+    def transform_tools(self, change):
+        """Runs change(table) on the tool section as a SectionTable and writes back what it changed."""
+        if self.io_blocked(): return
+        self.flush_slider_edits()
+        try:
+            table = self.handler.get_table('tool')
+        except ImportError as e:
+            messagebox.showerror("NumPy Needed", str(e))
+            return
+        change(table)
+        changed = table.write_back(self.handler)
+        self.refresh_tools()
+        self.edits_label.configure(text=f"{self.handler.pending_edits} unsaved edits")
+        self.status_label.configure(text=f"{changed} tool values changed")
+
+    def batch_unlock(self, section):
+        if self.io_blocked(): return
+        logging.info(f"Batch unlock triggered for: {section}")
+        self.handler.unlock_all(section)
+        page = self.pages.get(section)
+        if page is not None:
+            page.grid_view.set_items(self.handler.get_node_dict(section))
+        messagebox.showinfo("Done", f"All items in {section} unlocked.")
+
+    def restore_snapshot(self, snapshot_id):
+        if self.io_blocked(): return
+        if not messagebox.askyesno("Restore Backup", f"Replace the save file with backup {snapshot_id}?\n"
+                                                     "Unsaved changes will be lost."):
+            return
+        path = self.handler.filepath
+        store = self.handler.snapshots()
+
+        def work(progress, cancel):
+            store.restore(snapshot_id, path)
+            return True
+
+        def done(result):
+            if isinstance(result, Exception):
+                messagebox.showerror("Restore Error", str(result))
+                self.status_label.configure(text="Restore Error")
+                return
+            self.start_load(path)
+
+        self.run_io("Restoring", work, done)
+
+    def save_all(self):
+        if self.io_blocked(): return
+        if not self.handler.root:
+            messagebox.showwarning("Warning", "No file loaded.")
+            return
+
+        new_ver = self.ver_entry.get()
+        self.flush_slider_edits()
+
+        def work(progress, cancel):
+            return self.handler.save_file(new_ver, progress=progress)
+
+        def done(result):
+            if isinstance(result, Exception):
+                result = (False, str(result))
+            success, info = result
+            if success:
+                self.start_indexing()
+                self.status_label.configure(text=f"Saved: {os.path.basename(self.handler.filepath)}")
+                messagebox.showinfo("Saved", f"Changes saved successfully!\nBackup: {info}")
+            else:
+                self.status_label.configure(text="Save Error")
+                messagebox.showerror("Save Error", info)
+
+        self.run_io("Saving", work, done)
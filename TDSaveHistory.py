@@ -0,0 +1,167 @@
+# MADE BY SKELETON3595
+# Undo/redo for the handler's value edits.
+#
+# The history is a journal: every change is kept as (element, old value, new value)
+# and the records of one user action (a slider drag, UNLOCK ALL, a patch) form one
+# group. Memory grows with the number of edits, never with the size of the save, and
+# undoing a group only writes its own values back.
+import time
+from collections import deque
+
+UNDO_LIMIT = 200
+# Single edits of the same value this close together are one step, so a slider drag undoes at once
+COALESCE_S = 1.0
+
+class _Group:
+    __slots__ = ("label", "sections", "records", "stamp")
+
+    def __init__(self, label):
+        self.label = label
+        self.sections = set()
+        # [element, old, new, element, old, new, ...] in the order they were made; None stands for no value.
+        # Flat: a tuple per value would give the garbage collector one more object to track per value edited
+        self.records = []
+        self.stamp = 0.0
+
+    def __len__(self):
+        return len(self.records) // 3
+
+    def edits(self):
+        """[(element, old, new), ...] in the order they were made."""
+        records = self.records
+        return list(zip(records[0::3], records[1::3], records[2::3]))
+
+def _as_group(step):
+    # A single edit made outside of begin()/end() is kept as a flat (element, old, new, section, stamp)
+    # tuple, as a burst of them would spend most of its time building groups; it becomes one when undone
+    if step.__class__ is not tuple:
+        return step
+    element, old, new, section, stamp = step
+    group = _Group(f"edit {section}")
+    group.records.extend((element, old, new))
+    group.sections.add(section)
+    group.stamp = stamp
+    return group
+
+class EditHistory:
+    """Undo and redo stacks of edit groups.
+
+    Edits are recorded into the group opened by begin(), or into a step
+    of their own outside of one. begin() may nest; only the outermost
+    end() closes the group.
+    """
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self.limit = limit
+        # Full stacks drop their oldest step by themselves
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+        self._open = None
+        self._depth = 0
+        # The element of the newest step if that is a single edit, which the next edit may merge into
+        self._last = None
+
+    def begin(self, label):
+        if self._depth == 0:
+            self._open = _Group(label)
+        self._depth += 1
+
+    def end(self):
+        self._depth -= 1
+        if self._depth:
+            return
+        group, self._open = self._open, None
+        if not group.records:
+            return
+        group.stamp = time.monotonic()
+        single = group.records[0] if len(group) == 1 else None
+        if single is not None and single is self._last and self._merge(single, group.records[2], group.stamp):
+            return
+        self._undo.append(group)
+        self._last = single
+        self._redo.clear()
+
+    def record(self, element, old, new, section):
+        group = self._open
+        if group is not None:
+            group.records.extend((element, old, new))
+            group.sections.add(section)
+            return
+        # Called once per value by batch scripts, so this path avoids _Group altogether
+        stamp = time.monotonic()
+        if element is self._last and self._merge(element, new, stamp):
+            return
+        self._undo.append((element, old, new, section, stamp))
+        self._last = element
+        if self._redo:
+            self._redo.clear()
+
+    def _merge(self, element, new, stamp):
+        """Folds an edit of element into the newest step, a single edit of the same element (see _last),
+        if that was made just before; returns whether it did."""
+        last = self._undo[-1]
+        if self._redo:
+            return False
+        if last.__class__ is tuple:
+            if stamp - last[4] >= COALESCE_S:
+                return False
+            self._undo[-1] = (element, last[1], new, last[3], stamp)
+        else:
+            if stamp - last.stamp >= COALESCE_S:
+                return False
+            last.records[2] = new
+            last.stamp = stamp
+        return True
+
+    @property
+    def undo_label(self):
+        return _as_group(self._undo[-1]).label if self._undo else None
+
+    @property
+    def redo_label(self):
+        return self._redo[-1].label if self._redo else None
+
+    def pop_undo(self):
+        """The newest group, moved to the redo stack; None if there is nothing to undo."""
+        if not self._undo:
+            return None
+        group = _as_group(self._undo.pop())
+        self._redo.append(group)
+        self._last = None
+        return group
+
+    def pop_redo(self):
+        if not self._redo:
+            return None
+        group = self._redo.pop()
+        # A redone step is never merged with the next edit
+        group.stamp = 0.0
+        self._undo.append(group)
+        self._last = None
+        return group
+
+    def forget_sections(self, names):
+        """Drops the steps that touch one of names, whose elements were replaced; returns how many.
+
+        Steps that only touch other sections are kept in order, as undoing them
+        writes to elements that are still in the tree.
+        """
+        names = set(names)
+
+        def touched(step):
+            return step[3] in names if step.__class__ is tuple else not step.sections.isdisjoint(names)
+
+        kept = [step for step in self._undo if not touched(step)]
+        redo = [step for step in self._redo if not touched(step)]
+        dropped = len(self._undo) + len(self._redo) - len(kept) - len(redo)
+        if dropped:
+            if not kept or kept[-1] is not self._undo[-1]:
+                self._last = None
+            self._undo = deque(kept, maxlen=self.limit)
+            self._redo = redo
+        return dropped
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._last = None
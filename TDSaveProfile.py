@@ -0,0 +1,166 @@
+# MADE BY SKELETON3595
+# Timing spans for the load/save phases. With no profiler running, span() hands
+# back a shared do-nothing object, so the instrumented code pays one call per span.
+import os
+import time
+import threading
+
+_profiler = None
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+    def count(self, element):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def count(self, element):
+        self.args["elements"] = sum(1 for _ in element.iter())
+
+class Profiler:
+    """Collects spans as (name, start_ns, duration_ns, pid, thread, args) tuples.
+
+    deep=True also runs cProfile on the starting thread and tracemalloc for
+    the whole process; every span then carries the traced memory at its end.
+    """
+
+    def __init__(self, deep=False):
+        self.deep = deep
+        self.pid = os.getpid()
+        self.events = []
+        self.origin = time.perf_counter_ns()
+        self.cprofile = None
+        self.tracemalloc = None
+        self.peak_memory = None
+
+    def record(self, name, start, duration, args):
+        if self.tracemalloc is not None:
+            args["mem_kb"] = self.tracemalloc.get_traced_memory()[0] // 1024
+        self.events.append((name, start, duration, self.pid, threading.get_ident(), args))
+
+    def _start_deep(self):
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        self.tracemalloc = tracemalloc
+        self.cprofile = cProfile.Profile()
+        self.cprofile.enable()
+
+    def _stop_deep(self):
+        self.cprofile.disable()
+        self.peak_memory = self.tracemalloc.get_traced_memory()[1]
+        self.tracemalloc.stop()
+        self.tracemalloc = None
+
+    def merge(self, events):
+        """Adds spans recorded by another profiler, e.g. in a batch worker process."""
+        self.events.extend(events)
+
+    def chrome_trace(self):
+        """Trace-event JSON for chrome://tracing or https://ui.perfetto.dev"""
+        events = []
+        for name, start, duration, pid, tid, args in self.events:
+            events.append({"name": name, "ph": "X", "pid": pid, "tid": tid,
+                           "ts": (start - self.origin) / 1000, "dur": duration / 1000, "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        import json
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary(self, top=25):
+        """Per-phase table; times are inclusive, so a span's children are counted in it too."""
+        phases = {}
+        for name, _, duration, _, _, args in self.events:
+            p = phases.setdefault(name, [0, 0, 0, 0, 0])
+            p[0] += 1
+            p[1] += duration
+            p[2] = max(p[2], duration)
+            p[3] += args.get("bytes", 0)
+            p[4] += args.get("elements", 0)
+
+        lines = [f"{'phase':<14} {'count':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'MB':>9} {'MB/s':>8} {'elements':>10}",
+                 "-" * 82]
+        for name, (n, total, longest, size, elements) in sorted(phases.items(), key=lambda p: -p[1][1]):
+            mb = size / 1048576
+            rate = f"{mb / (total / 1e9):8.1f}" if size and total else f"{'-':>8}"
+            lines.append(f"{name:<14} {n:>6} {total / 1e6:>10.1f} {total / n / 1e6:>9.2f} {longest / 1e6:>9.2f} "
+                         f"{mb:>9.1f} {rate} {elements or '-':>10}")
+        if self.peak_memory is not None:
+            lines.append(f"\nPeak traced memory: {self.peak_memory / 1048576:.1f} MB")
+        if self.cprofile is not None:
+            import io
+            import pstats
+            out = io.StringIO()
+            pstats.Stats(self.cprofile, stream=out).sort_stats("cumulative").print_stats(top)
+            lines.append(out.getvalue())
+        return "\n".join(lines)
+
+def start(deep=False):
+    global _profiler
+    _profiler = Profiler(deep)
+    if deep:
+        _profiler._start_deep()
+    return _profiler
+
+def stop():
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None and profiler.deep:
+        profiler._stop_deep()
+    return profiler
+
+def active():
+    """The running Profiler, or None."""
+    return _profiler
+
+def span(name, **args):
+    """with span("parse", bytes=n) as s: ... ; s.set(...) / s.count(element) add details at the end."""
+    if _profiler is None:
+        return _NULL_SPAN
+    return _Span(_profiler, name, args)
+
+def timed_iter(name, iterable):
+    """Records one span per item, around the work that produced it (e.g. a sanitized chunk)."""
+    if _profiler is None:
+        return iterable
+    return _timed_iter(_profiler, name, iterable)
+
+def _timed_iter(profiler, name, iterable):
+    it = iter(iterable)
+    while True:
+        start = time.perf_counter_ns()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        profiler.record(name, start, time.perf_counter_ns() - start, {"bytes": len(item)})
+        yield item
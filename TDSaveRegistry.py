@@ -0,0 +1,427 @@
+# MADE BY SKELETON3595
+# A compact in-memory form of a whole save, for saves too big to hold as ElementTree.
+#
+# Every element is one row of a few parallel arrays (tag id, parent, first child,
+# next sibling) instead of an Element with its own attrib dict, tag and whitespace
+# strings. Tag names are stored once each and values live in one byte pool, exactly
+# as they are written in the file, so a row costs about 40 bytes where an Element
+# costs several hundred. Only values can be edited; they are written back in place.
+import os
+import html
+import mmap
+import bisect
+import logging
+from array import array
+
+from TDSaveCore import (TOOL_DEFAULTS, ROOT_VERSION_PATH, MARKUP_RE, VALUE_ATTR_RE, VERSION_ATTR_RE,
+                        escape_attr, write_spliced)
+from TDSaveProfile import span
+from TDSaveSnapshots import SnapshotStore, DEFAULT_KEEP
+
+class CompactRegistry:
+    """The elements of a save file by node id, in document order; node 0 is the root element.
+
+    A node's value is pool[offset[n]:offset[n] + length[n]] (length -1: no
+    value) and position[n] is where that value starts in the file, or where a
+    value attribute would be inserted if it has none.
+    """
+
+    def __init__(self):
+        self.tags = []
+        self.tag = array('I')
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.pool = bytearray()
+        self.offset = array('q')
+        self.length = array('i')
+        self.position = array('q')
+        # Values written with single quotes, which are rare
+        self.apos = set()
+
+    def __len__(self):
+        return len(self.tag)
+
+    @classmethod
+    def scan(cls, buf):
+        reg = cls()
+        tags, tag, parent, first_child, next_sibling = reg.tags, reg.tag, reg.parent, reg.first_child, reg.next_sibling
+        pool, offset, length, position = reg.pool, reg.offset, reg.length, reg.position
+        tag_ids = {}
+        # (node, tag bytes, last child) of every open element
+        stack = []
+        for m in MARKUP_RE.finditer(buf):
+            closing, name, attrs, self_closing = m.groups()
+            if name is None:
+                continue
+            if closing:
+                if not stack or stack[-1][1] != name:
+                    raise ValueError(f"Mismatched closing tag </{name.decode('utf-8', 'replace')}> at byte {m.start()}")
+                stack.pop()
+                continue
+            if not stack and tag:
+                raise ValueError(f"Content after the root element at byte {m.start()}")
+            node = len(tag)
+            tag_id = tag_ids.get(name)
+            if tag_id is None:
+                tag_id = tag_ids[name] = len(tags)
+                tags.append(name.decode('utf-8'))
+            tag.append(tag_id)
+            first_child.append(-1)
+            next_sibling.append(-1)
+            if stack:
+                up = stack[-1]
+                parent.append(up[0])
+                if up[2] == -1:
+                    first_child[up[0]] = node
+                else:
+                    next_sibling[up[2]] = node
+                up[2] = node
+            else:
+                parent.append(-1)
+            offset.append(len(pool))
+            v = VALUE_ATTR_RE.search(attrs) if b'value' in attrs else None
+            if v is None:
+                length.append(-1)
+                position.append(m.start(3))
+            else:
+                group = 1 if v.group(1) is not None else 2
+                raw = v.group(group)
+                pool += raw
+                length.append(len(raw))
+                position.append(m.start(3) + v.start(group))
+                if group == 2:
+                    reg.apos.add(node)
+            if not self_closing:
+                stack.append([node, name, -1])
+        if stack:
+            raise ValueError(f"Unclosed tag <{stack[-1][1].decode('utf-8', 'replace')}>")
+        if not tag:
+            raise ValueError("No root element found")
+        return reg
+
+    def name(self, node):
+        return self.tags[self.tag[node]]
+
+    def value(self, node):
+        n = self.length[node]
+        if n < 0:
+            return None
+        start = self.offset[node]
+        raw = self.pool[start:start + n].decode('utf-8')
+        return html.unescape(raw) if '&' in raw else raw
+
+    def children(self, node):
+        child = self.first_child[node]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def child(self, node, name):
+        """The first child of node called name, or -1."""
+        for child in self.children(node):
+            if self.tags[self.tag[child]] == name:
+                return child
+        return -1
+
+    def store(self, node, raw, position):
+        """Makes raw (escaped bytes) the value of node, written at position in the file."""
+        self.offset[node] = len(self.pool)
+        self.pool += raw
+        self.length[node] = len(raw)
+        self.position[node] = position
+
+    def shift(self, splices, lengths):
+        """Moves every position after a splice by what it grew or shrank; splices sorted by start."""
+        delta = 0
+        bounds = []
+        for (start, end, _), n in zip(splices, lengths):
+            if n != end - start:
+                delta += n - (end - start)
+                bounds.append((bisect.bisect_right(self.position, start), delta))
+        for i, (first, delta) in enumerate(bounds):
+            last = bounds[i + 1][0] if i + 1 < len(bounds) else len(self.position)
+            self.position[first:last] = array('q', [p + delta for p in self.position[first:last]])
+
+    def nbytes(self):
+        """Bytes held by the arrays and the pool, not counting the tag names."""
+        arrays = (self.tag, self.parent, self.first_child, self.next_sibling, self.offset, self.length, self.position)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.pool)
+
+class CompactSaveHandler:
+    """TeardownSaveHandler's value-editing API over a CompactRegistry.
+
+    Meant for big saves and batch edits: memory stays a small multiple of
+    the file size, but elements cannot be added or removed and values cannot
+    be deleted. Every save patches the changed values in place.
+    """
+
+    def __init__(self, keep_snapshots=DEFAULT_KEEP):
+        self.keep_snapshots = keep_snapshots
+        self.registry = None
+        self.filepath = None
+        self.version = "Unknown"
+        self.last_error = None
+        self._savegame = -1
+        self._version_span = None
+        self._source_stat = None
+        # section -> {item: (node, {param: node})}, built when a section is first used
+        self._index = {}
+        # node -> value on disk, and node -> pending value
+        self._dirty = {}
+        self._edits = {}
+        self._new_version = None
+
+    def _stat_source(self, path):
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+
+    def load_file(self, path):
+        """Loads path; returns False and sets last_error on failure."""
+        logging.info(f"Attempting to load file (compact): {path}")
+        with span("load", file=os.path.basename(path), model="compact"):
+            try:
+                source_stat = self._stat_source(path)
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    with span("scan", bytes=len(buf)):
+                        registry = CompactRegistry.scan(buf)
+                    root_start = buf.rfind(b'<', 0, registry.position[0])
+                    v = VERSION_ATTR_RE.search(buf, root_start, buf.find(b'>', registry.position[0]))
+                    version_span = None
+                    if v is not None:
+                        group = 1 if v.group(1) is not None else 2
+                        version_span = (v.start(group), v.end(group), '"' if group == 1 else "'")
+                    version = "Unknown" if v is None else v.group(group).decode('utf-8')
+
+                self.registry = registry
+                self.filepath = path
+                self.version = version
+                self._savegame = registry.child(0, 'savegame')
+                self._version_span = version_span
+                self._source_stat = source_stat
+                self._index = {}
+                self._dirty = {}
+                self._edits = {}
+                self._new_version = None
+                logging.info(f"Save loaded: {len(registry)} elements in {registry.nbytes() / 1048576:.1f} MB")
+                return True
+            except Exception as e:
+                logging.error(f"Failed to load file: {e}")
+                self.last_error = str(e)
+                return False
+
+    @property
+    def pending_edits(self):
+        return len(self._dirty) + (self._new_version is not None)
+
+    def _value(self, node):
+        return self._edits[node] if node in self._edits else self.registry.value(node)
+
+    def _set_value(self, node, value):
+        old = self._value(node)
+        if old == value:
+            return False
+        self._dirty.setdefault(node, self.registry.value(node))
+        self._edits[node] = value
+        return True
+
+    def _items(self, section):
+        items = self._index.get(section)
+        if items is None:
+            reg = self.registry
+            node = -1 if self._savegame == -1 else reg.child(self._savegame, section)
+            if node == -1:
+                return None
+            items = {}
+            for item in reg.children(node):
+                params = {}
+                for param in reg.children(item):
+                    params.setdefault(reg.name(param), param)
+                items.setdefault(reg.name(item), (item, params))
+            items = self._index[section] = items
+        return items
+
+    def get_node_dict(self, parent_tag):
+        if self.registry is None: return {}
+        items = self._items(parent_tag)
+        if items is None: return {}
+        return {name: self._value(item) for name, (item, _) in items.items()}
+
+    def get_tools_data(self):
+        if self.registry is None: return {}
+        tools = self._items('tool')
+        if tools is None: return {}
+        return {name: {key: self._value(param) for key, param in params.items()}
+                for name, (_, params) in tools.items()}
+
+    def update_value(self, section_tag, item_tag, attr_name, new_value):
+        if self.registry is None: return False
+        items = self._items(section_tag)
+        entry = None if items is None else items.get(item_tag)
+        if entry is None: return False
+
+        item, params = entry
+        target = item if attr_name == "self" else params.get(attr_name)
+        if target is None: return False
+        if not self._set_value(target, str(new_value)):
+            return False
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug("UPDATE %s %s: %s -> %s", section_tag, item_tag, attr_name, new_value)
+        return True
+
+    def update_values(self, section_tag, edits, quiet=False):
+        """Applies [(item, attr, value), ...] in one go; returns how many values actually changed."""
+        changed = sum(1 for item_tag, attr_name, new_value in edits
+                      if self.update_value(section_tag, item_tag, attr_name, new_value))
+        if changed:
+            logging.log(logging.DEBUG if quiet else logging.INFO, "UPDATE %s: %d value(s) changed", section_tag, changed)
+        return changed
+
+    def reset_tool(self, tool_name):
+        if tool_name not in TOOL_DEFAULTS:
+            return False
+        self.update_values('tool', [(tool_name, key, val) for key, val in TOOL_DEFAULTS[tool_name].items()])
+        return True
+
+    def reset_all_tools(self):
+        for tool_name in TOOL_DEFAULTS:
+            self.reset_tool(tool_name)
+
+    def unlock_all(self, section):
+        items = self.get_node_dict(section)
+        self.update_values(section, [(item, 'self', 1) for item in items])
+        return len(items)
+
+    def _path_node(self, path):
+        """The node at a registry path below savegame; KeyError if there is none."""
+        parts = path.split('.')
+        if len(parts) < 2 or parts[0] != 'savegame' or self._savegame == -1:
+            raise KeyError(path)
+        if len(parts) == 2:
+            node = self.registry.child(self._savegame, parts[1])
+        else:
+            items = self._items(parts[1])
+            entry = None if items is None else items.get(parts[2])
+            node = -1 if entry is None else entry[0] if len(parts) == 3 else entry[1].get(parts[3], -1)
+        for name in parts[4:]:
+            if node == -1:
+                break
+            node = self.registry.child(node, name)
+        if node == -1:
+            raise KeyError(path)
+        return node
+
+    def set_path_value(self, path, value):
+        """Sets the value of an existing element at a registry path, or ROOT_VERSION_PATH.
+
+        Returns whether anything changed; KeyError if there is no such element,
+        which this model cannot create, and ValueError for value=None.
+        """
+        if self.registry is None:
+            return False
+        if value is None:
+            raise ValueError("The compact model cannot remove values")
+        if path == ROOT_VERSION_PATH:
+            if self.version == str(value):
+                return False
+            if self._version_span is None:
+                raise ValueError("The save has no version attribute to change")
+            self.version = self._new_version = str(value)
+            return True
+        return self._set_value(self._path_node(path), str(value))
+
+    def remove_path(self, path):
+        raise ValueError(f"The compact model cannot remove elements ({path})")
+
+    def get_children(self, path):
+        """[(tag, value, has_children), ...] of the element at a registry path, in file order."""
+        if self.registry is None:
+            return []
+        reg = self.registry
+        node = self._savegame if path == 'savegame' else self._path_node(path)
+        if node == -1:
+            raise KeyError(path)
+        return [(reg.name(child), self._value(child), reg.first_child[child] != -1) for child in reg.children(node)]
+
+    def snapshots(self):
+        """The snapshot store of the loaded save, or None."""
+        if not self.filepath:
+            return None
+        return SnapshotStore.for_save(self.filepath, self.keep_snapshots)
+
+    def _splices(self):
+        reg = self.registry
+        splices = []
+        for node, value in self._edits.items():
+            start = reg.position[node]
+            if reg.length[node] < 0:
+                splices.append((start, start, b' value="' + escape_attr(value, '"').encode('utf-8') + b'"'))
+            else:
+                quote = "'" if node in reg.apos else '"'
+                splices.append((start, start + reg.length[node], escape_attr(value, quote).encode('utf-8')))
+        if self._new_version is not None:
+            start, end, quote = self._version_span
+            splices.append((start, end, escape_attr(self._new_version, quote).encode('utf-8')))
+        splices.sort(key=lambda s: s[0])
+        return splices
+
+    def save_file(self, new_version=None, incremental=True, progress=None):
+        """Writes the edited values into the file in place; returns (success, snapshot id or error message).
+
+        Every save of this model is incremental; the argument is only there
+        for compatibility with TeardownSaveHandler.save_file.
+        """
+        if not self.filepath or self.registry is None:
+            return False, "No file loaded"
+
+        with span("save", file=os.path.basename(self.filepath), model="compact"):
+            try:
+                logging.info("Starting save process...")
+                if self._stat_source(self.filepath) != self._source_stat:
+                    return False, "The save file was changed on disk after it was loaded. Reload it before saving."
+                if new_version:
+                    logging.info(f"Updating version to: {new_version}")
+                    self.set_path_value(ROOT_VERSION_PATH, new_version)
+
+                store = self.snapshots()
+                with span("backup", bytes=self._source_stat[0]):
+                    before = store.ensure(self.filepath)
+                logging.info(f"Backup snapshot: {before['id']}")
+
+                splices = self._splices()
+                total = self._source_stat[0]
+                report = None if progress is None else (lambda done: progress(done, total))
+                lengths = write_spliced(self.filepath, self.filepath, splices, report)
+                with span("index", kind="remap"):
+                    self._after_save(splices, lengths)
+                try:
+                    with span("backup", kind="snapshot"):
+                        store.take(self.filepath, "saved", before,
+                                   [(start, end, n) for (start, end, _), n in zip(splices, lengths)])
+                except Exception as e:
+                    logging.warning(f"Saved, but could not snapshot the new file: {e}")
+
+                logging.info(f"File saved successfully to: {self.filepath} (in place, {len(splices)} spans rewritten)")
+                return True, before['id']
+            except Exception as e:
+                logging.error(f"Save failed: {e}")
+                return False, str(e)
+
+    def _after_save(self, splices, lengths):
+        reg = self.registry
+        # An edited value's own splice starts at its position, so only the splices before it move it
+        reg.shift(splices, lengths)
+        for node, value in self._edits.items():
+            if reg.length[node] < 0:
+                reg.store(node, escape_attr(value, '"').encode('utf-8'), reg.position[node] + len(b' value="'))
+            else:
+                quote = "'" if node in reg.apos else '"'
+                reg.store(node, escape_attr(value, quote).encode('utf-8'), reg.position[node])
+        if self._new_version is not None:
+            # Nothing before the root tag is ever spliced
+            start, _, quote = self._version_span
+            self._version_span = (start, start + len(escape_attr(self._new_version, quote).encode('utf-8')), quote)
+        self._dirty = {}
+        self._edits = {}
+        self._new_version = None
+        self._source_stat = self._stat_source(self.filepath)
@@ -0,0 +1,321 @@
+# MADE BY SKELETON3595
+# Search over every registry path and value of a save, for search-as-you-type.
+#
+# The index is read straight from the file, one section at a time, and grows in
+# segments of SEGMENT_SIZE elements that become searchable as soon as they are
+# done, so the first results show up long before a big save is fully indexed.
+# Each segment keeps its tokens in one sorted list: every token starting with a
+# prefix is a contiguous run found with two bisects, which does the job of a
+# trie at a fraction of its memory. The elements themselves are stored once, as
+# parent pointers, and paths are only spelled out for the results shown.
+import re
+import sys
+import html
+import mmap
+import bisect
+import logging
+import threading
+from array import array
+
+from TDSaveCore import MARKUP_RE, VALUE_ATTR_RE
+
+SEGMENT_SIZE = 64 * 1024
+DEFAULT_LIMIT = 200
+# Short values repeat a lot (0, 1, true...) and are shared instead of stored per element
+SHARED_VALUE_LENGTH = 8
+
+_WORD_RE = re.compile(r'[^\W_]+')
+_LAST_TOKEN = '\U0010ffff'
+
+def _tokens(text, split_words=True):
+    """The lowercased text, followed by its words if it has more than one."""
+    low = text.lower()
+    if low == text:
+        low = text
+    if not split_words:
+        return (low,)
+    words = _WORD_RE.findall(low)
+    if len(words) < 2:
+        return (low,)
+    return (low, *words)
+
+def _value_tokens(value):
+    # Numbers are only found by their start ("0.41"); text is split into words as well
+    return _tokens(value, split_words=not value.replace('.', '', 1).lstrip('-').isdigit())
+
+def _matches(tokens, word):
+    return any(token.startswith(word) for token in tokens)
+
+class _Nodes:
+    """Every indexed element as (parent, name, value), by node id, in file order within a
+    section. ends[n] is the last node of n's subtree, so n's children are n + 1, then
+    ends[child] + 1 after each child up to ends[n]. Node 0 is savegame."""
+    def __init__(self):
+        self.parents = array('i', [-1])
+        self.ends = array('i', [0])
+        self.names = ["savegame"]
+        self.values = [None]
+        # section -> its node; sections indexed again later get new nodes
+        self.sections = {}
+        # Nodes of sections indexed again later stay behind until the next full rebuild
+        self.garbage = 0
+
+    def children(self, node, order):
+        if node == 0:
+            return [self.sections[name] for name in order if name in self.sections]
+        children = []
+        child, last = node + 1, self.ends[node]
+        while child <= last:
+            children.append(child)
+            child = self.ends[child] + 1
+        return children
+
+    def path(self, node):
+        parts = []
+        while node != -1:
+            parts.append(self.names[node])
+            node = self.parents[node]
+        return ".".join(reversed(parts))
+
+class _Segment:
+    """Up to SEGMENT_SIZE elements of one section: sorted tokens, and for token i the ids
+    ids[offsets[i]:offsets[i + 1]]."""
+    __slots__ = ("nodes", "section", "first", "tokens", "offsets", "ids")
+
+    def __init__(self, nodes, section, first, postings):
+        self.nodes = nodes
+        self.section = section
+        self.first = first
+        self.tokens = sorted(postings)
+        self.offsets = array('i', [0])
+        self.ids = array('i')
+        for token in self.tokens:
+            self.ids.extend(postings[token])
+            self.offsets.append(len(self.ids))
+
+    def _range(self, prefix):
+        return bisect.bisect_left(self.tokens, prefix), bisect.bisect_left(self.tokens, prefix + _LAST_TOKEN)
+
+    def estimate(self, prefix):
+        lo, hi = self._range(prefix)
+        return self.offsets[hi] - self.offsets[lo]
+
+    def lookup(self, prefix):
+        lo, hi = self._range(prefix)
+        return set(self.ids[self.offsets[lo]:self.offsets[hi]])
+
+class _Term:
+    """One word of a query. 'mod.steam.score' matches an element whose own name starts with
+    'score' below ones starting with 'steam' and 'mod'; a trailing dot ('savegame.mod.')
+    matches every child. The whole word also matches values, so '0.41' finds 0.4183."""
+    def __init__(self, text):
+        self.text = text
+        self.parts = text.split('.')
+
+    def _cost(self, segments, part):
+        return sum(segment.estimate(part) for segment in segments) if part else float('inf')
+
+    def estimate(self, segments):
+        return min(self._cost(segments, part) for part in self.parts)
+
+    def candidates(self, segments, order):
+        """Nodes that may match, roughly in file order, found from the rarest part of the word.
+
+        When that is not the last part, its matches are anchors and the
+        matching nodes are looked for among their descendants instead.
+        """
+        parts = self.parts
+        costs = [self._cost(segments, part) for part in parts]
+        k = costs.index(min(costs))
+        for segment in segments:
+            nodes = segment.nodes
+            found = segment.lookup(parts[k])
+            if len(parts) > 1:
+                # Values matching the whole word
+                yield from sorted(segment.lookup(self.text))
+            if k == len(parts) - 1:
+                yield from sorted(found)
+                continue
+            for anchor in sorted(found):
+                if not self._check_up(nodes, anchor, k):
+                    continue
+                frontier = [anchor]
+                for part in parts[k + 1:]:
+                    frontier = [child for node in frontier for child in nodes.children(node, order)
+                                if not part or _matches(_tokens(nodes.names[child]), part)]
+                yield from frontier
+
+    def _check_up(self, nodes, node, k):
+        """Whether node matches part k of the word and its ancestors the parts before it."""
+        for part in reversed(self.parts[:k + 1]):
+            if node == -1 or (part and not _matches(_tokens(nodes.names[node]), part)):
+                return False
+            node = nodes.parents[node]
+        return True
+
+    def check(self, nodes, node):
+        value = nodes.values[node]
+        if value is not None and _matches(_value_tokens(value), self.text):
+            return True
+        return self._check_up(nodes, node, len(self.parts) - 1)
+
+class SearchIndex:
+    """Path and value search over one save file.
+
+    refresh() (re)indexes the sections that changed since the last refresh,
+    normally on a worker thread; search() may be called from any thread
+    meanwhile and sees every finished segment.
+    """
+
+    def __init__(self):
+        self._nodes = _Nodes()
+        self._segments = []
+        # section -> hash of the bytes it was indexed from
+        self._hashes = {}
+        self._order = {}
+        self._live = {}
+        self._lock = threading.Lock()
+        self.progress = (0, 0)
+
+    @staticmethod
+    def sources(handler):
+        """refresh()'s (path, sections, hashes) for a loaded handler, read on the thread that owns it."""
+        sections = handler.sections()
+        return (handler.filepath, [(name, start, stop) for name, start, stop, _ in sections],
+                {name: digest for name, _, _, digest in sections})
+
+    @property
+    def size(self):
+        """Elements searchable right now."""
+        return sum(self._live.values())
+
+    def refresh(self, path, sections, hashes, cancel=None):
+        """Indexes the sections of path, [(name, start, stop), ...] as in the handler's layout,
+        whose hash differs from the one they were indexed with; returns whether it finished."""
+        with self._lock:
+            self._order = {name: i for i, (name, _, _) in enumerate(sections)}
+            stale = [(name, start, stop) for name, start, stop in sections
+                     if self._hashes.get(name) != hashes.get(name)]
+            gone = [name for name in self._hashes if name not in self._order]
+            for name in gone + [name for name, _, _ in stale]:
+                self._drop(name)
+            if self._nodes.garbage > self.size:
+                # Mostly leftovers of earlier refreshes: start over
+                self._nodes, self._segments, self._hashes, self._live = _Nodes(), [], {}, {}
+                stale = list(sections)
+            if not stale:
+                return True
+
+            total = sum(stop - start for _, start, stop in stale)
+            done = 0
+            self.progress = (0, total)
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                for name, start, stop in stale:
+                    if not self._index_section(buf, name, start, stop, done, cancel):
+                        logging.info(f"Search indexing stopped at section '{name}'")
+                        return False
+                    self._hashes[name] = hashes.get(name)
+                    done += stop - start
+                    self.progress = (done, total)
+            logging.info(f"Search index ready: {self.size} elements in {len(self._segments)} segments")
+            return True
+
+    def _drop(self, name):
+        self._hashes.pop(name, None)
+        self._nodes.garbage += self._live.pop(name, 0)
+        self._nodes.sections.pop(name, None)
+        self._segments = [s for s in self._segments if s.section != name]
+
+    def _publish(self, segment):
+        segments = self._segments + [segment]
+        segments.sort(key=lambda s: (self._order.get(s.section, len(self._order)), s.first))
+        self._segments = segments
+        self._live[segment.section] = self._live.get(segment.section, 0) + len(segment.nodes.names) - segment.first
+
+    def _index_section(self, buf, name, start, stop, done, cancel):
+        nodes = self._nodes
+        parents, ends, names, values = nodes.parents, nodes.ends, nodes.names, nodes.values
+        tag_tokens = {}
+        shared = {}
+        # savegame itself is searchable from every section
+        postings = {"savegame": [0]}
+        first = len(names)
+        stack = [0]
+        for m in MARKUP_RE.finditer(buf, start, stop):
+            closing, tag, attrs, self_closing = m.groups()
+            if tag is None:
+                continue
+            if closing:
+                ends[stack.pop()] = len(names) - 1
+                continue
+            node = len(names)
+            tokens = tag_tokens.get(tag)
+            if tokens is None:
+                text = sys.intern(tag.decode('utf-8'))
+                tokens = tag_tokens[tag] = (text, tuple(sys.intern(token) for token in _tokens(text)))
+            tag, tokens = tokens
+            value = None
+            if b'value' in attrs:
+                v = VALUE_ATTR_RE.search(attrs)
+                if v is not None:
+                    value = (v.group(1) if v.group(1) is not None else v.group(2)).decode('utf-8')
+                    if '&' in value:
+                        value = html.unescape(value)
+                    if len(value) <= SHARED_VALUE_LENGTH:
+                        value = shared.setdefault(value, value)
+            if len(stack) == 1:
+                nodes.sections[name] = node
+            parents.append(stack[-1])
+            ends.append(node)
+            names.append(tag)
+            values.append(value)
+            for token in tokens if value is None else tokens + _value_tokens(value):
+                ids = postings.get(token)
+                if ids is None:
+                    postings[token] = [node]
+                elif ids[-1] != node:
+                    ids.append(node)
+            if not self_closing:
+                stack.append(node)
+
+            if node + 1 - first >= SEGMENT_SIZE:
+                self._publish(_Segment(nodes, name, first, postings))
+                postings = {}
+                first = node + 1
+                self.progress = (done + m.end() - start, self.progress[1])
+                if cancel is not None and cancel.is_set():
+                    return False
+        if postings:
+            self._publish(_Segment(nodes, name, first, postings))
+        return True
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """[(path, value), ...] of the elements matching every word of query, in file order,
+        and whether there were more than limit."""
+        terms = [_Term(word) for word in query.lower().split() if word.strip('.')]
+        segments = self._segments
+        if not terms or not segments:
+            return [], False
+        nodes = segments[0].nodes
+        order = sorted(nodes.sections, key=lambda name: self._order.get(name, len(self._order)))
+        # The rarest word picks the candidates, the others only filter them
+        estimates = [term.estimate(segments) for term in terms]
+        primary = terms[estimates.index(min(estimates))]
+        found = []
+        seen = set()
+        for node in primary.candidates(segments, order):
+            if node in seen:
+                continue
+            seen.add(node)
+            if all(term.check(nodes, node) for term in terms):
+                found.append(node)
+                if len(found) > limit:
+                    break
+
+        def position(node):
+            section = node
+            while nodes.parents[section] > 0:
+                section = nodes.parents[section]
+            return self._order.get(nodes.names[section], len(self._order)), node
+        found.sort(key=position)
+        return [(nodes.path(node), nodes.values[node]) for node in found[:limit]], len(found) > limit
@@ -0,0 +1,370 @@
+# MADE BY SKELETON3595
+# Versioned backups of a save file, stored as deduplicated, compressed chunks.
+#
+# A file is cut into content-defined chunks: a chunk ends after a line whose
+# crc32 has its low bits clear, once the chunk is at least MIN_CHUNK long
+# (MAX_CHUNK forces a cut). Cuts depend only on the nearby lines, so an edit
+# moves the cuts around it and nothing else. Each snapshot is a manifest of
+# chunk hashes; chunks shared between snapshots are stored once.
+import os
+import mmap
+import time
+import zlib
+import bisect
+import logging
+from operator import not_
+from itertools import accumulate, compress, islice
+
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+ANCHOR_MASK = 0x3FF  # one line in ~1024 can end a chunk, ~50 KB chunks on typical saves
+SCAN_BLOCK = 1024 * 1024
+RESCAN_BLOCK = 64 * 1024
+DEFAULT_KEEP = 20
+COMPRESS_LEVEL = 6
+MANIFEST_EXT = ".snap"
+
+def _cut_points(buf, start, end, scan_from=None, block=SCAN_BLOCK):
+    """Yields the end offset of every chunk of buf[start:end], the last one being end.
+
+    scan_from is where line splitting begins; it must be the start of the
+    line containing start (default: start itself).
+    """
+    chunk_start = start
+    pos = start if scan_from is None else scan_from
+    while pos < end:
+        stop = min(pos + block, end)
+        if stop < end:
+            nl = buf.rfind(b'\n', pos, stop)
+            if nl >= pos:
+                stop = nl + 1
+        lines = buf[pos:stop].split(b'\n')
+        lines.pop()  # whatever follows the last newline belongs to the next block
+        line_ends = islice(accumulate(map((1).__add__, map(len, lines)), initial=pos), 1, None)
+        anchors = compress(line_ends, map(not_, map(ANCHOR_MASK.__and__, map(zlib.crc32, lines))))
+        for a in anchors:
+            while a - chunk_start > MAX_CHUNK:
+                chunk_start += MAX_CHUNK
+                yield chunk_start
+            if a - chunk_start >= MIN_CHUNK:
+                chunk_start = a
+                yield a
+        pos = stop
+        while pos - chunk_start > MAX_CHUNK:
+            chunk_start += MAX_CHUNK
+            yield chunk_start
+    if chunk_start < end:
+        yield end
+
+class _FileView:
+    """The part of the bytes interface the chunking code uses (len, slices,
+    rfind of b'\n'), over an open file read in pieces as it is asked for.
+
+    Reads run forward in SCAN_BLOCK pieces and the view keeps MAX_CHUNK
+    behind the latest request, the most an open chunk can lag behind the
+    scan, so about three blocks are in memory whatever the file size.
+    Requests outside of that window seek and start a new one.
+    """
+
+    def __init__(self, f, size):
+        self.f = f
+        self.size = size
+        self.base = 0
+        self.data = bytearray()
+
+    def __len__(self):
+        return self.size
+
+    def _window(self, start, end):
+        end = min(end, self.size)
+        loaded = self.base + len(self.data)
+        if start < self.base or start > loaded:
+            self.f.seek(start)
+            self.base, self.data, loaded = start, bytearray(), start
+        elif start - MAX_CHUNK - self.base >= SCAN_BLOCK:
+            drop = start - MAX_CHUNK - self.base
+            del self.data[:drop]
+            self.base += drop
+        if end > loaded:
+            self.f.seek(loaded)
+            self.data += self.f.read(max(end - loaded, min(SCAN_BLOCK, self.size - loaded)))
+        return start - self.base, end - self.base
+
+    def __getitem__(self, key):
+        i, j = self._window(key.start, key.stop)
+        return bytes(self.data[i:j])
+
+    def rfind(self, sub, start, end):
+        # Single-byte sub only; a long range is searched backwards one block at a time
+        while end > start:
+            lo = max(start, end - SCAN_BLOCK)
+            i, j = self._window(lo, end)
+            found = self.data.rfind(sub, i, j)
+            if found >= 0:
+                return found + self.base
+            end = lo
+        return -1
+
+def _snapshot_id():
+    t = time.time_ns()
+    return time.strftime("%Y%m%d-%H%M%S", time.localtime(t / 1e9)) + f"-{t // 1000 % 1000000:06d}"
+
+class SnapshotStore:
+    """Snapshots of one save file, kept in <save>.snapshots next to it.
+
+    Manifests are <id>.snap files: one JSON header line (read by list())
+    followed by one "hash length" line per chunk.
+    """
+
+    def __init__(self, directory, keep=DEFAULT_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self.chunk_dir = os.path.join(directory, "chunks")
+
+    @classmethod
+    def for_save(cls, save_path, keep=DEFAULT_KEEP):
+        return cls(os.path.abspath(save_path) + ".snapshots", keep)
+
+    # --- CHUNKS ---
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def _put_chunk(self, data, stats):
+        import hashlib
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self._chunk_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            blob = zlib.compress(data, COMPRESS_LEVEL)
+            with open(path + ".tmp", 'wb') as f:
+                f.write(blob)
+            os.replace(path + ".tmp", path)
+            stats["new_chunks"] += 1
+            stats["stored"] += len(blob)
+        return digest
+
+    def _read_chunk(self, digest, length):
+        with open(self._chunk_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if len(data) != length:
+            raise ValueError(f"Snapshot chunk {digest} is damaged")
+        return data
+
+    # --- MANIFESTS ---
+
+    def _manifest_path(self, snapshot_id):
+        return os.path.join(self.directory, snapshot_id + MANIFEST_EXT)
+
+    def _write_manifest(self, header, chunks):
+        import json
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._manifest_path(header["id"])
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + "\n")
+            f.writelines(f"{digest} {length}\n" for digest, length in chunks)
+        os.replace(path + ".tmp", path)
+
+    def _read_header(self, path):
+        import json
+        with open(path, encoding='utf-8') as f:
+            return json.loads(f.readline())
+
+    def chunks(self, snapshot_id):
+        """[(hash, length), ...] of a snapshot, in file order."""
+        with open(self._manifest_path(snapshot_id), encoding='utf-8') as f:
+            f.readline()
+            return [(digest, int(length)) for digest, length in (line.split() for line in f)]
+
+    def list(self):
+        """Snapshot headers, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(MANIFEST_EXT))
+        return [self._read_header(os.path.join(self.directory, n)) for n in names]
+
+    def latest(self):
+        snapshots = self.list()
+        return snapshots[-1] if snapshots else None
+
+    # --- TAKING SNAPSHOTS ---
+
+    def prepare(self, path):
+        """Chunks and stores path without recording a snapshot yet.
+
+        Meant to run in the background after a load, so the file is read in
+        pieces rather than mapped (see take's copy): ensure() given the result
+        then records the snapshot without reading the file again, as long as
+        it has not changed in between. Chunks of a prepared file that is never
+        snapshotted are deleted with the other unused ones once prune() drops
+        a snapshot.
+        """
+        st = os.stat(path)
+        stats = {"new_chunks": 0, "stored": 0}
+        chunks = self._chunk_file(path, st, stats, copy=True)
+        return {"source": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                "chunks": chunks, "stats": stats}
+
+    def ensure(self, path, label="before save", prepared=None):
+        """Returns a snapshot of path as it is now, reusing the latest one if the file has not changed since."""
+        st = os.stat(path)
+        stat = (st.st_size, st.st_mtime_ns)
+        latest = self.latest()
+        if latest is not None and (latest["size"], latest["mtime_ns"]) == stat:
+            return latest
+        if (prepared is not None and prepared["source"] == os.path.abspath(path)
+                and (prepared["size"], prepared["mtime_ns"]) == stat
+                and all(os.path.exists(self._chunk_path(digest)) for digest, _ in prepared["chunks"])):
+            return self._record(path, st, label, prepared["chunks"], prepared["stats"])
+        return self.take(path, label)
+
+    def take(self, path, label, base=None, splices=None, copy=False):
+        """Snapshots path. With base (a header) and the splices that turned the
+        base file into this one, as (old_start, old_end, new_length), only the
+        chunks around the splices are cut and hashed again.
+
+        copy reads the file in pieces instead of mapping it, for callers
+        that do not own the file meanwhile (see _chunk_file).
+        """
+        st = os.stat(path)
+        stats = {"new_chunks": 0, "stored": 0}
+        chunks = self._chunk_file(path, st, stats, base, splices, copy)
+        return self._record(path, st, label, chunks, stats)
+
+    def _chunk_file(self, path, st, stats, base=None, splices=None, copy=False):
+        with open(path, 'rb') as f:
+            if st.st_size == 0:
+                return []
+            if copy:
+                # A mapped file that another program truncates kills the process (SIGBUS) on the next
+                # access; plain reads cannot, and a file that changed while being read is refused instead.
+                # Chunks stored from such a file are unused and go with the next prune().
+                chunks = self._chunk_buf(_FileView(f, st.st_size), stats, base, splices)
+                now = os.stat(path)
+                if (now.st_size, now.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+                    raise ValueError(f"{path} changed while it was read")
+                return chunks
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return self._chunk_buf(buf, stats, base, splices)
+
+    def _chunk_buf(self, buf, stats, base, splices):
+        if base is not None and splices is not None:
+            chunks = self._rechunk(buf, self.chunks(base["id"]), splices, stats)
+            if chunks is not None:
+                return chunks
+        return self._chunk_all(buf, stats)
+
+    def _record(self, path, st, label, chunks, stats):
+        header = {"id": _snapshot_id(), "label": label, "created": time.time(), "source": os.path.abspath(path),
+                  "size": st.st_size, "mtime_ns": st.st_mtime_ns, "chunks": len(chunks), **stats}
+        self._write_manifest(header, chunks)
+        logging.info(f"Snapshot {header['id']} ({label}): {len(chunks)} chunks, "
+                     f"{stats['new_chunks']} new, {stats['stored'] / 1024:.1f} KB stored")
+        self.prune()
+        return header
+
+    def _chunk_all(self, buf, stats):
+        chunks = []
+        prev = 0
+        for cut in _cut_points(buf, 0, len(buf)):
+            chunks.append((self._put_chunk(buf[prev:cut], stats), cut - prev))
+            prev = cut
+        return chunks
+
+    def _rechunk(self, buf, old, splices, stats):
+        """Chunks of buf reusing the base chunks the splices did not touch; None if that does not add up."""
+        if not old:
+            return None
+        starts = [s for s, _, _ in splices]
+        deltas = [0]
+        for s, e, n in splices:
+            deltas.append(deltas[-1] + n - (e - s))
+
+        def moved(pos):
+            # Where an old chunk boundary lands in the new file; None inside a replaced range
+            i = bisect.bisect_left(starts, pos)
+            if i and splices[i - 1][1] > pos:
+                return None
+            return pos + deltas[i]
+
+        old_ends = list(accumulate(length for _, length in old))
+        synced = {}
+        for j, end in enumerate(old_ends):
+            p = moved(end)
+            if p is not None:
+                synced[p] = j
+
+        chunks = []
+        new_pos = 0
+        old_pos = 0
+        i = k = 0
+        size = len(buf)
+        while i < len(old):
+            digest, length = old[i]
+            o_start, o_end = old_pos, old_pos + length
+            while k < len(splices) and splices[k][1] <= o_start and splices[k][0] < o_start:
+                k += 1
+            touched = k < len(splices) and (splices[k][0] < o_end or (i == len(old) - 1 and splices[k][0] == o_end))
+            if not touched:
+                chunks.append((digest, length))
+                new_pos += length
+                old_pos = o_end
+                i += 1
+                continue
+
+            scan_from = buf.rfind(b'\n', 0, new_pos) + 1
+            prev = new_pos
+            resynced = False
+            for cut in _cut_points(buf, new_pos, size, scan_from, RESCAN_BLOCK):
+                chunks.append((self._put_chunk(buf[prev:cut], stats), cut - prev))
+                prev = cut
+                j = synced.get(cut)
+                if j is not None and j >= i:
+                    i = j + 1
+                    old_pos = old_ends[j]
+                    resynced = True
+                    break
+            new_pos = prev
+            if not resynced:
+                break
+        return chunks if new_pos == size else None
+
+    # --- RESTORE / RETENTION ---
+
+    def restore(self, snapshot_id, dest):
+        """Writes a snapshot to dest, replacing it only once the whole file is written."""
+        tmp = dest + ".restore.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                for digest, length in self.chunks(snapshot_id):
+                    f.write(self._read_chunk(digest, length))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        logging.info(f"Restored snapshot {snapshot_id} to {dest}")
+
+    def prune(self, keep=None):
+        """Keeps the newest `keep` snapshots and deletes chunks no snapshot uses; returns (snapshots, chunks) removed."""
+        keep = self.keep if keep is None else keep
+        snapshots = self.list()
+        doomed = snapshots[:-keep] if keep > 0 else snapshots
+        if not doomed:
+            return 0, 0
+        for header in doomed:
+            os.remove(self._manifest_path(header["id"]))
+
+        live = set()
+        for header in snapshots[len(doomed):]:
+            live.update(digest for digest, _ in self.chunks(header["id"]))
+        removed = 0
+        for sub in os.listdir(self.chunk_dir) if os.path.isdir(self.chunk_dir) else []:
+            folder = os.path.join(self.chunk_dir, sub)
+            for name in os.listdir(folder):
+                if name not in live:
+                    os.remove(os.path.join(folder, name))
+                    removed += 1
+        return len(doomed), removed
@@ -0,0 +1,97 @@
+# MADE BY SKELETON3595
+# A section of the save as a numeric table: one row per item, one column per parameter.
+#
+# Usage:
+#   table = handler.get_table('tool')
+#   table.scale(2, columns=['ammo'])
+#   table.clamp()
+#   table.write_back(handler)   # only the cells that changed, as one undo step
+#
+# Cells that are missing or do not hold a number are masked and never written.
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("Section tables need NumPy (pip install numpy)") from e
+
+from TDSaveCore import TOOL_LIMITS
+
+# Column of the item's own value, for sections whose items have no parameters (valuable, reward...)
+SELF_COLUMN = "value"
+
+def _format(number):
+    number = float(number)
+    return str(int(number)) if number.is_integer() else repr(number)
+
+class SectionTable:
+    """values is a float masked array of len(rows) x len(columns); edit it in place or through
+    the helpers, then write_back() pushes every unmasked cell that differs from the save."""
+
+    def __init__(self, section, rows, columns, data, mask):
+        self.section = section
+        self.rows = rows
+        self.columns = columns
+        self.values = np.ma.MaskedArray(data, mask=mask)
+        # What the save holds, to tell which cells changed
+        self._saved = data.copy()
+
+    @classmethod
+    def from_handler(cls, handler, section, columns=None):
+        if handler.root is None:
+            raise ValueError("No file loaded")
+        items = handler.section_items(section)
+        if columns is None:
+            seen = dict.fromkeys(key for _, params in items.values() for key in params)
+            if section == 'tool':
+                columns = [key for key in TOOL_LIMITS if key in seen] + [key for key in seen if key not in TOOL_LIMITS]
+            else:
+                columns = list(seen) or [SELF_COLUMN]
+        rows = list(items)
+        data = np.zeros((len(rows), len(columns)))
+        mask = np.ones((len(rows), len(columns)), dtype=bool)
+        for i, (item, params) in enumerate(items.values()):
+            for j, key in enumerate(columns):
+                el = item if key == SELF_COLUMN and key not in params else params.get(key)
+                text = None if el is None else el.get('value')
+                if text is None:
+                    continue
+                try:
+                    data[i, j] = float(text)
+                except ValueError:
+                    continue
+                mask[i, j] = False
+        return cls(section, rows, list(columns), data, mask)
+
+    def column(self, name):
+        """A view of one column; writing to it changes the table."""
+        return self.values[:, self.columns.index(name)]
+
+    def _selected(self, columns):
+        return [self.columns.index(name) for name in (self.columns if columns is None else columns)
+                if name in self.columns]
+
+    def scale(self, factor, columns=None, round_to_int=True):
+        """Multiplies the columns (all by default) by factor."""
+        for j in self._selected(columns):
+            scaled = self.values[:, j] * factor
+            self.values[:, j] = np.round(scaled) if round_to_int else scaled
+
+    def clamp(self, limits=None, low=0):
+        """Keeps every column that has a limit (TOOL_LIMITS by default) within low..limit."""
+        limits = TOOL_LIMITS if limits is None else limits
+        for name, high in limits.items():
+            if name in self.columns:
+                j = self.columns.index(name)
+                self.values[:, j] = np.clip(self.values[:, j], low, high)
+
+    def changes(self):
+        """[(item, column, new value), ...] of the unmasked cells that differ from the save."""
+        changed = ~np.ma.getmaskarray(self.values) & (self.values.data != self._saved)
+        return [(self.rows[i], self.columns[j], float(self.values.data[i, j])) for i, j in zip(*np.nonzero(changed))]
+
+    def write_back(self, handler):
+        """Writes the changed cells into the save as one undo step; returns how many values changed."""
+        edits = [(item, 'self' if column == SELF_COLUMN else column, _format(value))
+                 for item, column, value in self.changes()]
+        changed = handler.update_values(self.section, edits) if edits else 0
+        self._saved = self.values.data.copy()
+        return changed
@@ -0,0 +1,51 @@
+# MADE BY SKELETON3595
+# Notices when the game rewrites the loaded save and pulls the changes into the handler.
+import os
+import logging
+
+WATCH_POLL_MS = 1000
+
+class SaveWatcher:
+    """Call poll() every WATCH_POLL_MS or so, and reload() once it says so.
+
+    A poll is one os.stat. A change is only reported once size and mtime
+    have stayed the same for one whole poll, so a file the game is still
+    writing is never read.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.seen = None
+
+    def poll(self):
+        """True when the save changed on disk and has settled, so reload() should run; cheap enough for the Tk thread."""
+        handler = self.handler
+        if handler.root is None:
+            return False
+        try:
+            stat = handler.source_changed()
+        except OSError:
+            return False
+        if stat is None:
+            self.seen = None
+            return False
+        if stat != self.seen:
+            self.seen = stat
+            return False
+        self.seen = None
+        return True
+
+    def reload(self, progress=None):
+        """Returns handler.reload_changed()'s report, or None if the save could not be read yet.
+
+        Meant for a worker thread that owns the handler meanwhile.
+        """
+        handler = self.handler
+        try:
+            if progress is not None:
+                progress(0, os.path.getsize(handler.filepath))
+            return handler.reload_changed()
+        except Exception as e:
+            # Most likely caught mid-write after all; tried again two polls later
+            logging.warning(f"Could not reload the changed save yet: {e}")
+            return None
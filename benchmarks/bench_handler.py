@@ -0,0 +1,181 @@
+# MADE BY SKELETON3595
+# Load/edit/save benchmark for TeardownSaveHandler. Run from the repository root:
+#   python benchmarks/bench_handler.py                      # 1MB and 10MB
+#   python benchmarks/bench_handler.py --sizes 1MB,100MB,1GB --out results.json
+#   python benchmarks/bench_handler.py --update-baseline    # records benchmarks/baseline.json
+#   python benchmarks/bench_handler.py --baseline benchmarks/baseline.json
+# Timings depend on the machine, so baselines are not committed: record your own, on the
+# code you compare against, and the comparison is skipped for another platform or Python.
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from TDSaveCore import TeardownSaveHandler, TOOL_DEFAULTS
+from gen_savegame import generate, parse_size
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = "1MB,10MB"
+UPDATE_BURST = 10000
+# A step only counts as a regression when it is this much slower than the baseline, relatively and absolutely
+TOLERANCE = 0.25
+NOISE_FLOOR_S = 0.005
+
+def _steps(path):
+    """(name, fn) pairs run in order against one fresh copy of the save; later steps use the loaded handler."""
+    handler = TeardownSaveHandler(prepare_backup=True)
+    tools = [(tool, key) for tool, params in TOOL_DEFAULTS.items() for key in params if key != 'enabled']
+
+    def sanitize():
+        with open(path, "r", encoding="utf-8") as f:
+            handler._sanitize_xml(f.read())
+
+    def load():
+        if not handler.load_file(path):
+            raise RuntimeError(handler.last_error)
+
+    def update_burst():
+        for i in range(UPDATE_BURST):
+            tool, key = tools[i % len(tools)]
+            handler.update_value('tool', tool, key, i % 500)
+
+    def unlock():
+        for section in ("valuable", "characters", "reward"):
+            handler.unlock_all(section)
+
+    def save(incremental):
+        success, info = handler.save_file(incremental=incremental)
+        if not success:
+            raise RuntimeError(info)
+
+    return [
+        ("sanitize_xml", sanitize),
+        ("load_file", load),
+        # The editor prepares the backup while the user edits; waiting here keeps it out of the later steps
+        ("backup_prepare", handler.wait_backup),
+        ("get_tools_data", handler.get_tools_data),
+        ("get_node_dict", lambda: [handler.get_node_dict(s) for s in ("valuable", "characters", "reward")]),
+        ("update_burst", update_burst),
+        ("unlock_all", unlock),
+        ("save_incremental", lambda: save(True)),
+        ("save_full", lambda: save(False)),
+        # The snapshot of the saved file, also taken in the background; the next run overwrites the file
+        ("backup_saved", handler.wait_backup),
+    ]
+
+def run_once(source, workdir, trace_memory):
+    path = os.path.join(workdir, "savegame.xml")
+    shutil.copyfile(source, path)
+    results = {}
+    for name, fn in _steps(path):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = peak
+        else:
+            results[name] = elapsed
+    return results
+
+def bench_size(label, size, workdir, repeat, trace_memory):
+    source = os.path.join(workdir, f"source-{label}.xml")
+    actual = generate(source, size)
+    best = {}
+    for _ in range(repeat):
+        for name, seconds in run_once(source, workdir, False).items():
+            best[name] = min(seconds, best.get(name, seconds))
+    peaks = run_once(source, workdir, True) if trace_memory else {}
+    os.remove(source)
+    return {"bytes": actual,
+            "steps": {name: {"seconds": round(seconds, 6),
+                             "peak_mb": round(peaks[name] / 1048576, 3) if name in peaks else None}
+                      for name, seconds in best.items()}}
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Returns the lines describing each step slower than baseline beyond tolerance."""
+    regressions = []
+    for label, entry in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(label)
+        if base is None:
+            continue
+        for name, step in entry["steps"].items():
+            old = base["steps"].get(name, {}).get("seconds")
+            if old is None:
+                continue
+            new = step["seconds"]
+            if new > old * (1 + tolerance) and new - old > NOISE_FLOOR_S:
+                regressions.append(f"{label} {name}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+def print_table(results):
+    print(f"{'size':>8} {'step':<18} {'time':>11} {'peak':>10}")
+    print("-" * 50)
+    for label, entry in results["sizes"].items():
+        for name, step in entry["steps"].items():
+            peak = f"{step['peak_mb']:.1f} MB" if step["peak_mb"] is not None else "-"
+            print(f"{label:>8} {name:<18} {step['seconds'] * 1000:8.1f} ms {peak:>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TeardownSaveHandler on synthetic saves")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per size, best one is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the extra tracemalloc pass")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help=f"baseline JSON to compare against (--update-baseline writes {BASELINE} by default)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"allowed slowdown before a step counts as a regression (default {TOLERANCE})")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--workdir", help="where the generated saves go (default: a temp dir)")
+    args = parser.parse_args(argv)
+
+    results = {"python": platform.python_version(), "platform": platform.platform(),
+               "created": time.strftime("%Y-%m-%d %H:%M:%S"), "sizes": {}}
+    workdir = args.workdir or tempfile.mkdtemp(prefix="tdse-bench-")
+    try:
+        for label in args.sizes.split(","):
+            label = label.strip().upper()
+            print(f"Benchmarking {label}...", flush=True)
+            results["sizes"][label] = bench_size(label, parse_size(label), workdir, args.repeat, not args.no_memory)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        path = args.baseline or BASELINE
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {path}")
+        return 0
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    machine = (baseline.get("platform"), baseline.get("python"))
+    if machine != (results["platform"], results["python"]):
+        print(f"SKIP  baseline was recorded on {machine[0]}, Python {machine[1]}; record one here to compare")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"FAIL  {line}")
+    if not regressions:
+        print("OK    no regressions against baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# MADE BY SKELETON3595
+# Memory held by a loaded save, ElementTree handler vs the compact registry. Run from the repository root:
+#   python benchmarks/bench_memory.py                   # 10MB and 50MB
+#   python benchmarks/bench_memory.py --sizes 100MB,1GB --out memory.json
+# Only Python allocations are traced; the file itself is mapped while loading and not counted.
+# tracemalloc slows every allocation down, so use bench_handler.py for load times.
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from TDSaveCore import TeardownSaveHandler
+from TDSaveRegistry import CompactSaveHandler
+from gen_savegame import generate, parse_size
+
+DEFAULT_SIZES = "10MB,50MB"
+
+# name -> (handler class, load_file arguments); etree_lazy keeps the sections the GUI does not show raw
+MODELS = {
+    "etree": (TeardownSaveHandler, {"lazy": False}),
+    "etree_lazy": (TeardownSaveHandler, {}),
+    "compact": (CompactSaveHandler, {}),
+}
+
+def measure(handler_class, kwargs, path):
+    """(seconds, MB retained after loading, MB at the peak while loading) of one load."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    handler = handler_class()
+    if not handler.load_file(path, **kwargs):
+        raise RuntimeError(handler.last_error)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del handler
+    return elapsed, current / 1048576, peak / 1048576
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the memory of a loaded save across registry models")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--workdir", help="where the generated saves go (default: a temp dir)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    workdir = args.workdir or tempfile.mkdtemp(prefix="tdse-mem-")
+    try:
+        for label in args.sizes.split(","):
+            label = label.strip().upper()
+            print(f"Measuring {label}...", flush=True)
+            path = os.path.join(workdir, f"source-{label}.xml")
+            generate(path, parse_size(label))
+            results[label] = {}
+            for model, (handler_class, kwargs) in MODELS.items():
+                seconds, current, peak = measure(handler_class, kwargs, path)
+                results[label][model] = {"seconds": round(seconds, 3), "retained_mb": round(current, 1),
+                                         "peak_mb": round(peak, 1)}
+            os.remove(path)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'size':>8} {'model':<11} {'load':>9} {'retained':>11} {'peak':>11} {'vs etree':>9}")
+    print("-" * 64)
+    for label, models in results.items():
+        base = models["etree"]["retained_mb"]
+        for model, r in models.items():
+            ratio = f"{base / r['retained_mb']:.1f}x" if r["retained_mb"] else "-"
+            print(f"{label:>8} {model:<11} {r['seconds']:>7.2f} s {r['retained_mb']:>8.1f} MB "
+                  f"{r['peak_mb']:>8.1f} MB {ratio:>9}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# MADE BY SKELETON3595
+# Cold-start budget check. Run from the repository root:
+#   python benchmarks/coldstart.py
+import os
+import sys
+import time
+import compileall
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+# Milliseconds. The headless numbers are cumulative import times reported by -X importtime, with the
+# bytecode already cached as it is after the first start. About two thirds of TDSaveCore's time is the
+# stdlib it cannot do without (re, logging, xml.etree); modules only needed once a save is open are
+# imported where they are used.
+BUDGET_MS = {
+    "import TDSaveCore": 60,
+    "import TDSaveCLI": 90,
+    "first window": 2500,
+}
+GUI_MODULES = ("tkinter", "customtkinter", "webbrowser")
+
+def import_time(module):
+    """Best-of-RUNS cumulative import time of module in ms, plus the set of modules it pulled in."""
+    best = None
+    imported = set()
+    for _ in range(RUNS):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=ROOT, capture_output=True, text=True, check=True)
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if not cumulative.strip().isdigit():
+                continue
+            imported.add(name.strip())
+            if name.strip() == module:
+                ms = int(cumulative) / 1000
+                best = ms if best is None else min(best, ms)
+    return best, imported
+
+def has_display():
+    """Whether Tk can open a window here at all."""
+    proc = subprocess.run([sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"], capture_output=True)
+    return proc.returncode == 0
+
+def first_window_time():
+    """Wall time from process start until the main window has been drawn once, or None without a display.
+
+    Raises RuntimeError if the editor exits with an error."""
+    if not has_display():
+        return None
+    env = dict(os.environ, TDSE_STARTUP_PROBE="1")
+    best = None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "TDSaveEditor.py"], cwd=ROOT, env=env, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            raise RuntimeError(f"exited with code {proc.returncode}: {lines[-1] if lines else 'no output'}")
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    failed = False
+    results = {}
+    # A stale or missing .pyc would time the compiler instead of the import
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+    for module in ("TDSaveCore", "TDSaveCLI"):
+        ms, imported = import_time(module)
+        leaked = sorted(m for m in imported if m.split(".")[0] in GUI_MODULES)
+        if leaked:
+            print(f"FAIL  import {module} pulls in GUI modules: {', '.join(leaked)}")
+            failed = True
+        results[f"import {module}"] = ms
+    try:
+        results["first window"] = first_window_time()
+    except RuntimeError as e:
+        results["first window"] = f"TDSaveEditor.py {e}"
+
+    for name, ms in results.items():
+        budget = BUDGET_MS[name]
+        if isinstance(ms, str):
+            print(f"FAIL  {name:<20} {ms}")
+            failed = True
+            continue
+        if ms is None:
+            print(f"SKIP  {name:<20} (no display)")
+            continue
+        status = "OK  " if ms <= budget else "FAIL"
+        failed |= ms > budget
+        print(f"{status}  {name:<20} {ms:8.1f} ms   budget {budget} ms")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
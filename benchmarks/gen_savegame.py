@@ -0,0 +1,135 @@
+# MADE BY SKELETON3595
+# Synthetic savegame.xml generator for the benchmarks. Run from the repository root:
+#   python benchmarks/gen_savegame.py out.xml --size 100MB
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from TDSaveCore import TOOL_DEFAULTS
+
+REGISTRY_VERSION = "1.6.0"
+FLUSH_BYTES = 1024 * 1024
+
+# Share of the requested size given to each scaled section; mod takes the rest
+SHARES = {"valuable": 0.15, "reward": 0.05}
+
+CHARACTERS = ("lee", "lockelle", "frustrum", "mall", "carib", "quilez", "cullington", "tillaggaryd")
+LEVELS = ("lee", "marina", "mansion", "caveisland", "frustrum", "carib", "factory", "cullington", "hub_carib")
+UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+def parse_size(text):
+    """'512KB' / '10MB' / '1GB' / plain bytes -> int"""
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+class _Writer:
+    def __init__(self, f):
+        self.f = f
+        self.buf = []
+        self.pending = 0
+        self.written = 0
+
+    def line(self, depth, text):
+        s = "\t" * depth + text + "\n"
+        self.buf.append(s)
+        self.pending += len(s)
+        if self.pending >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        self.f.write("".join(self.buf))
+        self.written += self.pending
+        self.buf = []
+        self.pending = 0
+
+    @property
+    def size(self):
+        return self.written + self.pending
+
+def _tools(w):
+    w.line(2, "<tool>")
+    for name, params in TOOL_DEFAULTS.items():
+        w.line(3, f"<{name}>")
+        for key, val in params.items():
+            w.line(4, f'<{key} value="{val}"/>')
+        w.line(3, f"</{name}>")
+    w.line(2, "</tool>")
+
+def _valuables(w, rng, budget):
+    w.line(2, "<valuable>")
+    i = 0
+    stop = w.size + budget
+    while w.size < stop:
+        level = LEVELS[i % len(LEVELS)]
+        w.line(3, f'<{level}_valuable_{i} value="{rng.randint(0, 1)}"/>')
+        i += 1
+    w.line(2, "</valuable>")
+
+def _rewards(w, rng, budget):
+    # Reward ranks are plain numbers, which is what the sanitizer exists for
+    w.line(2, "<reward>")
+    i = 1
+    stop = w.size + budget
+    while w.size < stop:
+        w.line(3, f'<{i} value="{rng.randint(0, 1)}"/>')
+        i += 1
+    w.line(2, "</reward>")
+
+def _mods(w, rng, stop):
+    w.line(2, "<mod>")
+    i = 0
+    while w.size < stop:
+        w.line(3, f"<steam-{2800000000 + i}>")
+        w.line(4, f'<active value="{rng.randint(0, 1)}"/>')
+        w.line(4, f'<score value="{rng.randint(0, 99999)}"/>')
+        w.line(4, f'<name value="Mod #{i} &amp; &quot;friends&quot;"/>')
+        w.line(4, "<options>")
+        for n in range(1, rng.randint(2, 8)):
+            w.line(5, f'<{n} value="{rng.random():.6f}"/>')
+        w.line(4, "</options>")
+        w.line(3, f"</steam-{2800000000 + i}>")
+        i += 1
+    w.line(2, "</mod>")
+
+def generate(path, size, seed=0):
+    """Writes a savegame of roughly `size` bytes to path and returns the exact size."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        w = _Writer(f)
+        w.line(0, '<?xml version="1.0" encoding="UTF-8"?>')
+        w.line(0, f'<registry version="{REGISTRY_VERSION}">')
+        w.line(1, "<savegame>")
+        _tools(w)
+        w.line(2, "<characters>")
+        for name in CHARACTERS:
+            w.line(3, f'<{name} value="{rng.randint(0, 1)}"/>')
+        w.line(2, "</characters>")
+        _valuables(w, rng, int(size * SHARES["valuable"]))
+        _rewards(w, rng, int(size * SHARES["reward"]))
+        w.line(2, "<stats>")
+        for level in LEVELS:
+            w.line(3, f'<{level} value="{rng.randint(0, 3600)}"/>')
+        w.line(2, "</stats>")
+        _mods(w, rng, size - 64)
+        w.line(1, "</savegame>")
+        w.line(0, "</registry>")
+        w.flush()
+    return os.path.getsize(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Teardown savegame.xml")
+    parser.add_argument("path")
+    parser.add_argument("--size", default="10MB", help="target size, e.g. 1MB, 250MB, 1GB (default 10MB)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    written = generate(args.path, parse_size(args.size), args.seed)
+    print(f"Wrote {args.path} ({written / UNITS['MB']:.1f} MB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
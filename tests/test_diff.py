@@ -0,0 +1,87 @@
+# MADE BY SKELETON3595
+# Regression tests for diffs and patches: applying the diff of a to b onto a must give b, byte for byte.
+#   python -m pytest -q tests
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+from TDSaveCore import TeardownSaveHandler
+from TDSaveDiff import diff_files, apply_patch, write_patch, read_patch
+from gen_savegame import generate
+
+SAVE_SIZE = 200_000
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+class DiffApplyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        self.a = os.path.join(self.dir, "a.xml")
+        generate(self.a, SAVE_SIZE)
+
+    def target(self, edit):
+        """b.xml: a copy of a with edit(handler) made and saved."""
+        b = os.path.join(self.dir, "b.xml")
+        shutil.copy(self.a, b)
+        handler = TeardownSaveHandler()
+        self.assertTrue(handler.load_file(b), handler.last_error)
+        edit(handler)
+        ok, result = handler.save_file()
+        self.assertTrue(ok, result)
+        return b
+
+    def assert_patch_gives(self, b, patch):
+        c = os.path.join(self.dir, "c.xml")
+        shutil.copy(self.a, c)
+        handler = TeardownSaveHandler()
+        self.assertTrue(handler.load_file(c), handler.last_error)
+        _, missing = apply_patch(handler, patch)
+        self.assertEqual(missing, [])
+        ok, result = handler.save_file()
+        self.assertTrue(ok, result)
+        self.assertEqual(read(c), read(b))
+
+    def test_identical_files(self):
+        shutil.copy(self.a, os.path.join(self.dir, "b.xml"))
+        diff = diff_files(self.a, os.path.join(self.dir, "b.xml"))
+        self.assertEqual(diff.changes, [])
+        self.assertEqual(diff.ops, [])
+
+    def test_changed_values(self):
+        def edit(handler):
+            handler.update_value('tool', 'rifle', 'ammo', 999)
+            handler.unlock_all('valuable')
+        b = self.target(edit)
+        diff = diff_files(self.a, b)
+        counts = diff.counts()
+        self.assertEqual((counts["added"], counts["removed"]), (0, 0))
+        self.assertIn(('changed', 'savegame.tool.rifle.ammo', '18', '999'), diff.changes)
+        self.assert_patch_gives(b, diff.patch())
+
+    def test_added_and_removed_entries(self):
+        def edit(handler):
+            handler.set_path_value('savegame.mod.tests.active', '1')
+            first = handler.get_children('savegame.reward')[0][0]
+            handler.remove_path('savegame.reward.' + first)
+            handler.update_value('tool', 'rifle', 'ammo', 999)
+        b = self.target(edit)
+        diff = diff_files(self.a, b)
+        self.assertEqual(diff.counts(), {"added": 1, "removed": 1, "changed": 1})
+        self.assert_patch_gives(b, diff.patch())
+
+    def test_patch_file_round_trip(self):
+        b = self.target(lambda handler: handler.unlock_all('valuable'))
+        path = os.path.join(self.dir, "patch.json")
+        write_patch(diff_files(self.a, b), path)
+        self.assert_patch_gives(b, read_patch(path))
+
+if __name__ == '__main__':
+    unittest.main()
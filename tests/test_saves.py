@@ -0,0 +1,189 @@
+# MADE BY SKELETON3595
+# Regression tests for saving, undo/redo and snapshots. Run from the repository root:
+#   python -m pytest -q tests
+import os
+import re
+import sys
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+from TDSaveCore import TeardownSaveHandler
+from gen_savegame import generate
+
+SAVE_SIZE = 200_000
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def canonical(data):
+    """data in XML canonical form, with digit-leading tags made parseable the way the handler does it."""
+    return ET.canonicalize(re.sub(rb'<(/?)(\d)', rb'<\1_\2', data).decode('utf-8'))
+
+class SaveTestCase(unittest.TestCase):
+    """Each test gets a generated save of its own in a temp directory, kept pristine as self.original."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        self.original_path = os.path.join(self.dir, "original.xml")
+        generate(self.original_path, SAVE_SIZE)
+        self.original = read(self.original_path)
+
+    def copy(self, name="savegame.xml"):
+        path = os.path.join(self.dir, name)
+        shutil.copy(self.original_path, path)
+        return path
+
+    def load(self, name="savegame.xml", **kwargs):
+        handler = TeardownSaveHandler(**kwargs)
+        self.assertTrue(handler.load_file(self.copy(name)), handler.last_error)
+        return handler
+
+    def save(self, handler, **kwargs):
+        ok, result = handler.save_file(**kwargs)
+        self.assertTrue(ok, result)
+        return read(handler.filepath)
+
+def edit(handler):
+    """A value edit, a bulk edit, an added entry and a removed one."""
+    handler.update_value('tool', 'rifle', 'ammo', 999)
+    handler.unlock_all('valuable')
+    handler.set_path_value('savegame.mod.tests.active', '1')
+    first = handler.get_children('savegame.reward')[0][0]
+    handler.remove_path('savegame.reward.' + first)
+
+class RoundTripTest(SaveTestCase):
+
+    def test_unchanged_save_keeps_bytes(self):
+        handler = self.load()
+        self.assertEqual(self.save(handler), self.original)
+
+    def test_value_edit_touches_only_its_value(self):
+        handler = self.load()
+        handler.update_value('tool', 'rifle', 'ammo', 999)
+        saved = self.save(handler)
+        old = b'<ammo value="18"/>\n\t\t\t</rifle>'
+        self.assertEqual(self.original.count(old), 1)
+        self.assertEqual(saved, self.original.replace(old, b'<ammo value="999"/>\n\t\t\t</rifle>'))
+
+    def test_incremental_and_full_saves_hold_the_same(self):
+        # A full save is written by ElementTree, which spells empty elements differently
+        saved = {}
+        for incremental in (True, False):
+            handler = self.load(f"{incremental}.xml")
+            handler.update_value('tool', 'rifle', 'ammo', 999)
+            handler.unlock_all('valuable')
+            saved[incremental] = self.save(handler, incremental=incremental)
+        self.assertEqual(canonical(saved[True]), canonical(saved[False]))
+
+    def test_lazy_and_eager_loads_save_the_same(self):
+        saved = {}
+        for lazy in (True, False):
+            handler = TeardownSaveHandler()
+            self.assertTrue(handler.load_file(self.copy(f"{lazy}.xml"), lazy=lazy), handler.last_error)
+            edit(handler)
+            saved[lazy] = self.save(handler)
+        self.assertEqual(saved[True], saved[False])
+
+    def test_saved_edits_load_back(self):
+        handler = self.load()
+        edit(handler)
+        self.save(handler)
+        again = TeardownSaveHandler()
+        self.assertTrue(again.load_file(handler.filepath), again.last_error)
+        self.assertEqual(again.get_tools_data()['rifle']['ammo'], '999')
+        self.assertIn(('active', '1', False), again.get_children('savegame.mod.tests'))
+        # Saving what was loaded changes nothing
+        before = read(handler.filepath)
+        self.assertEqual(self.save(again), before)
+
+    def test_save_refuses_a_file_changed_on_disk(self):
+        handler = self.load()
+        handler.update_value('tool', 'rifle', 'ammo', 999)
+        with open(handler.filepath, 'ab') as f:
+            f.write(b'\n')
+        ok, _ = handler.save_file()
+        self.assertFalse(ok)
+
+class UndoAcrossSavesTest(SaveTestCase):
+
+    def test_undo_and_redo_after_saving(self):
+        handler = self.load()
+        with handler.transaction("value edits"):
+            handler.update_value('tool', 'rifle', 'ammo', 999)
+            handler.unlock_all('valuable')
+        edited = self.save(handler)
+        self.assertNotEqual(edited, self.original)
+
+        self.assertEqual(handler.undo()[0], "value edits")
+        self.assertEqual(self.save(handler), self.original)
+        self.assertEqual(handler.redo()[0], "value edits")
+        self.assertEqual(self.save(handler), edited)
+
+    def test_steps_undo_one_at_a_time(self):
+        handler = self.load()
+        handler.update_value('tool', 'rifle', 'ammo', 999)
+        first = self.save(handler)
+        handler.unlock_all('valuable')
+        self.save(handler)
+
+        handler.undo()
+        self.assertEqual(self.save(handler), first)
+        handler.undo()
+        self.assertEqual(self.save(handler), self.original)
+        self.assertIsNone(handler.undo())
+
+    def test_reload_keeps_steps_of_other_sections(self):
+        handler = self.load()
+        handler.unlock_all('valuable')
+        handler.update_value('tool', 'rifle', 'ammo', 999)
+        self.save(handler)
+
+        # The game rewrites the tool section only
+        game = TeardownSaveHandler()
+        self.assertTrue(game.load_file(handler.filepath), game.last_error)
+        game.update_value('tool', 'gun', 'damage', 7)
+        self.save(game)
+        # Same size, so make sure the change shows in the mtime however coarse the clock is
+        os.utime(handler.filepath, ns=(0, 0))
+
+        report = handler.reload_changed()
+        self.assertEqual(report["reloaded"], ['tool'])
+        self.assertEqual(report["history_dropped"], 1)
+        label, sections = handler.undo()
+        self.assertEqual(sections, {'valuable'})
+        self.assertIsNone(handler.undo())
+
+class SnapshotRestoreTest(SaveTestCase):
+
+    def test_restore_every_generation(self):
+        handler = self.load(prepare_backup=True)
+        handler.unlock_all('valuable')
+        first = self.save(handler)
+        handler.update_value('tool', 'rifle', 'ammo', 999)
+        second = self.save(handler)
+        handler.wait_backup()
+
+        snapshots = handler.snapshots().list()
+        self.assertEqual(len(snapshots), 3)
+        restored = os.path.join(self.dir, "restored.xml")
+        for snapshot, expected in zip(snapshots, (self.original, first, second)):
+            handler.snapshots().restore(snapshot['id'], restored)
+            self.assertEqual(read(restored), expected, snapshot['label'])
+
+    def test_save_returns_the_snapshot_of_the_previous_file(self):
+        handler = self.load()
+        handler.update_value('tool', 'rifle', 'ammo', 999)
+        ok, before = handler.save_file()
+        self.assertTrue(ok, before)
+        restored = os.path.join(self.dir, "restored.xml")
+        handler.snapshots().restore(before, restored)
+        self.assertEqual(read(restored), self.original)
+
+if __name__ == '__main__':
+    unittest.main()